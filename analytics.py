@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+Analytics - Attempt history as memory-mapped NumPy columns with incrementally updated summaries:
+accuracy by level, response-time percentiles, hardest words and the improvement curve
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+
+import numpy as np
+
+from word_manager import LEVEL_NAMES
+
+# Bump when the column or summary layout changes; older files are rebuilt from the history
+FORMAT_VERSION = 1
+
+# One append-only file per column, row i of every file being attempt i
+COLUMNS = (
+    ('attempt_id', '<i8'),
+    ('session_id', '<i8'),
+    ('at', '<f8'),
+    ('word_id', '<u4'),
+    ('correct', 'u1'),
+    ('response_time', '<f4'),
+    ('hint_used', 'u1'),
+    ('level', 'u1'),
+)
+
+# Response times are counted in log-spaced bins from 0.1 s to 2 minutes, so
+# percentiles come from a histogram that a new batch simply adds to
+RESPONSE_TIME_EDGES = np.geomspace(0.1, 120.0, 97)
+
+LEVEL_SLOTS = len(LEVEL_NAMES) + 1  # Indexed by level number 1-5
+TREND_WINDOW = 10  # Sessions per point of the improvement curve
+HARDEST_WORDS = 10
+HARDEST_MIN_ATTEMPTS = 2
+REBUILD_CHUNK = 1 << 20
+# The saved totals only spare a recompute at startup; sync rewrites them at most this often (seconds)
+SUMMARY_SAVE_INTERVAL = 60.0
+
+SELECT_NEW_ATTEMPTS = ("SELECT id, session_id, at, word, correct, response_time, hint_used, level "
+                       "FROM attempts WHERE id > ? ORDER BY id")
+
+
+def grow(array, size):
+    """array zero-padded to at least size entries (amortized doubling)"""
+    if len(array) >= size:
+        return array
+    grown = np.zeros(max(size, 2 * len(array)), dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+def write_atomic(path, write):
+    """Call write(file) on a temporary file and move it over path"""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as f:
+        write(f)
+    os.replace(temp_path, path)
+
+
+def histogram_percentile(histogram, fraction):
+    """Response time at a percentile of the binned histogram (geometric bin centre)"""
+    total = histogram.sum()
+    if not total:
+        return 0.0
+    index = int(np.searchsorted(np.cumsum(histogram), fraction * total, side='left'))
+    index = min(index, len(histogram) - 1)
+    return float(np.sqrt(RESPONSE_TIME_EDGES[index] * RESPONSE_TIME_EDGES[index + 1]))
+
+
+class Summary:
+    """Running totals from which every report figure is derived, indexed by level, word and session"""
+
+    ARRAYS = ('level_attempts', 'level_correct', 'level_time', 'response_times',
+              'word_attempts', 'word_misses', 'session_attempts', 'session_correct')
+
+    def __init__(self):
+        self.rows = 0
+        self.level_attempts = np.zeros(LEVEL_SLOTS, dtype=np.int64)
+        self.level_correct = np.zeros(LEVEL_SLOTS, dtype=np.int64)
+        self.level_time = np.zeros(LEVEL_SLOTS, dtype=np.float64)
+        self.response_times = np.zeros(len(RESPONSE_TIME_EDGES) - 1, dtype=np.int64)
+        self.word_attempts = np.zeros(0, dtype=np.int64)
+        self.word_misses = np.zeros(0, dtype=np.int64)
+        self.session_attempts = np.zeros(0, dtype=np.int64)
+        self.session_correct = np.zeros(0, dtype=np.int64)
+
+    def add(self, columns):
+        """Add a batch of rows ({column name: array}) to the totals"""
+        level = np.minimum(columns['level'], LEVEL_SLOTS - 1).astype(np.intp)
+        correct = columns['correct'].astype(np.int64)
+        response_time = columns['response_time'].astype(np.float64)
+        word_id = columns['word_id'].astype(np.intp)
+        session_id = columns['session_id'].astype(np.intp)
+
+        self.level_attempts += np.bincount(level, minlength=LEVEL_SLOTS)
+        self.level_correct += np.bincount(level, weights=correct, minlength=LEVEL_SLOTS).astype(np.int64)
+        self.level_time += np.bincount(level, weights=response_time, minlength=LEVEL_SLOTS)
+
+        bins = np.clip(np.searchsorted(RESPONSE_TIME_EDGES, response_time, side='right') - 1,
+                       0, len(self.response_times) - 1)
+        self.response_times += np.bincount(bins, minlength=len(self.response_times))
+
+        if len(word_id):
+            size = int(word_id.max()) + 1
+            self.word_attempts = grow(self.word_attempts, size)
+            self.word_misses = grow(self.word_misses, size)
+            self.word_attempts[:size] += np.bincount(word_id, minlength=size)
+            self.word_misses[:size] += np.bincount(word_id, weights=1 - correct, minlength=size).astype(np.int64)
+
+            size = int(session_id.max()) + 1
+            self.session_attempts = grow(self.session_attempts, size)
+            self.session_correct = grow(self.session_correct, size)
+            self.session_attempts[:size] += np.bincount(session_id, minlength=size)
+            self.session_correct[:size] += np.bincount(session_id, weights=correct, minlength=size).astype(np.int64)
+
+        self.rows += len(level)
+
+    def save(self, path):
+        arrays = {name: getattr(self, name) for name in self.ARRAYS}
+        write_atomic(path, lambda f: np.savez(f, version=FORMAT_VERSION, rows=self.rows, **arrays))
+
+    @classmethod
+    def load(cls, path):
+        """Saved totals, or None if missing or from another format version"""
+        try:
+            with np.load(path) as data:
+                if int(data['version']) != FORMAT_VERSION:
+                    return None
+                summary = cls()
+                summary.rows = int(data['rows'])
+                for name in cls.ARRAYS:
+                    setattr(summary, name, data[name])
+                return summary
+        except (OSError, KeyError, ValueError):
+            return None
+
+
+class AttemptAnalytics:
+    """Columnar copy of the attempt history and the report derived from it.
+
+    sync() appends attempts added to the SQLite history since the last call
+    and folds them into the running Summary, so its cost depends on the new
+    rows only.  The columns are memory-mapped when a full pass is needed
+    (rebuild_summary()).  Each sync publishes a fresh report dict; readers
+    on another thread just take self.report, which is replaced, never
+    modified in place.  The totals are saved at most every
+    SUMMARY_SAVE_INTERVAL seconds by sync, and by save_summary().
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.loaded = False
+        self.rows = 0
+        self.last_attempt_id = 0
+        self.words = []
+        self.word_ids = {}
+        self.summary = Summary()
+        self.summary_saved_at = 0.0
+        self.report = None
+        self.version = 0  # Incremented whenever a new report is published
+
+    def get_path(self, name):
+        return os.path.join(self.directory, name)
+
+    def get_column_path(self, name):
+        return self.get_path(f"{name}.bin")
+
+    def load(self):
+        """Read the column metadata, vocabulary and saved totals"""
+        try:
+            with open(self.get_path('meta.json')) as f:
+                meta = json.load(f)
+            if meta.get('version') != FORMAT_VERSION:
+                meta = {}
+        except (OSError, ValueError):
+            meta = {}
+        self.rows = meta.get('rows', 0)
+        self.last_attempt_id = meta.get('last_attempt_id', 0)
+
+        # Rows or words written after the last metadata update belong to an interrupted sync
+        for name, dtype in COLUMNS:
+            path = self.get_column_path(name)
+            size = self.rows * np.dtype(dtype).itemsize
+            if not os.path.exists(path) or os.path.getsize(path) < size:
+                self.rows, self.last_attempt_id = 0, 0
+                break
+        for name, dtype in COLUMNS:
+            path = self.get_column_path(name)
+            with open(path, 'ab') as f:
+                f.truncate(self.rows * np.dtype(dtype).itemsize)
+
+        word_count = meta.get('word_count', 0) if self.rows else 0
+        try:
+            with open(self.get_path('words.txt'), encoding='utf-8') as f:
+                self.words = f.read().split('\n')[:word_count]
+        except OSError:
+            self.words = []
+        if len(self.words) < word_count:
+            self.words, self.rows, self.last_attempt_id = [], 0, 0
+            for name, _ in COLUMNS:
+                open(self.get_column_path(name), 'wb').close()
+        with open(self.get_path('words.txt'), 'w', encoding='utf-8') as f:
+            f.write(''.join(word + '\n' for word in self.words))
+        self.word_ids = {word: index for index, word in enumerate(self.words)}
+
+        summary = Summary.load(self.get_path('summary.npz'))
+        if summary is not None and summary.rows == self.rows:
+            self.summary = summary
+        else:
+            self.rebuild_summary()
+        self.loaded = True
+
+    def get_column(self, name):
+        """A column as a read-only memory-mapped array"""
+        dtype = dict(COLUMNS)[name]
+        if not self.rows:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(self.get_column_path(name), dtype=dtype, mode='r', shape=(self.rows,))
+
+    def rebuild_summary(self):
+        """Recompute the running totals from the columns, a chunk at a time"""
+        summary = Summary()
+        columns = {name: self.get_column(name) for name, _ in COLUMNS}
+        for first in range(0, self.rows, REBUILD_CHUNK):
+            summary.add({name: column[first:first + REBUILD_CHUNK] for name, column in columns.items()})
+        self.summary = summary
+        self.save_summary()
+
+    def sync(self, connection):
+        """Append attempts added to the history database since the last sync"""
+        if not self.loaded:
+            os.makedirs(self.directory, exist_ok=True)
+            self.load()
+        rows = connection.execute(SELECT_NEW_ATTEMPTS, (self.last_attempt_id,)).fetchall()
+        if rows:
+            self.append(rows)
+            if time.monotonic() - self.summary_saved_at >= SUMMARY_SAVE_INTERVAL:
+                self.save_summary()
+        if rows or self.report is None:
+            self.publish()
+        return len(rows)
+
+    def append(self, rows):
+        """Add (attempt id, session id, at, word, correct, response time, hint used, level) rows"""
+        attempt_id, session_id, at, words, correct, response_time, hint_used, level = zip(*rows)
+
+        new_words = []
+        word_id = np.empty(len(words), dtype=np.uint32)
+        for index, word in enumerate(words):
+            known = self.word_ids.get(word)
+            if known is None:
+                known = self.word_ids[word] = len(self.words)
+                self.words.append(word)
+                new_words.append(word)
+            word_id[index] = known
+
+        columns = {
+            'attempt_id': np.array(attempt_id, dtype='<i8'),
+            'session_id': np.array(session_id, dtype='<i8'),
+            'at': np.array(at, dtype='<f8'),
+            'word_id': word_id,
+            'correct': np.array(correct, dtype='u1'),
+            'response_time': np.array(response_time, dtype='<f4'),
+            'hint_used': np.array(hint_used, dtype='u1'),
+            'level': np.array(level, dtype='u1'),
+        }
+        for name, dtype in COLUMNS:
+            with open(self.get_column_path(name), 'ab') as f:
+                f.write(columns[name].astype(dtype, copy=False).tobytes())
+        if new_words:
+            with open(self.get_path('words.txt'), 'a', encoding='utf-8') as f:
+                f.write(''.join(word + '\n' for word in new_words))
+
+        # The metadata is written last: it is what makes the appended rows count
+        self.rows += len(rows)
+        self.last_attempt_id = int(attempt_id[-1])
+        meta = {'version': FORMAT_VERSION, 'rows': self.rows, 'last_attempt_id': self.last_attempt_id,
+                'word_count': len(self.words)}
+        write_atomic(self.get_path('meta.json'), lambda f: f.write(json.dumps(meta).encode('utf-8')))
+
+        self.summary.add(columns)
+
+    def save_summary(self):
+        """Write the running totals, so the next start does not recompute them"""
+        self.summary.save(self.get_path('summary.npz'))
+        self.summary_saved_at = time.monotonic()
+
+    def publish(self):
+        """Replace the report with one built from the current totals"""
+        self.report = self.build_report()
+        self.version += 1
+
+    def build_report(self):
+        """Everything the game over screen and exported report show, as plain Python values"""
+        summary = self.summary
+        attempts = int(summary.level_attempts.sum())
+        correct = int(summary.level_correct.sum())
+
+        levels = []
+        for number, name in enumerate(LEVEL_NAMES, start=1):
+            count = int(summary.level_attempts[number])
+            if count:
+                levels.append({'level': number, 'name': name, 'attempts': count,
+                               'accuracy': summary.level_correct[number] / count * 100,
+                               'mean_response_time': summary.level_time[number] / count})
+
+        # Hardest words: highest miss rate, smoothed so one unlucky miss does not top the list
+        word_attempts, word_misses = summary.word_attempts, summary.word_misses
+        candidates = np.flatnonzero((word_attempts >= HARDEST_MIN_ATTEMPTS) & (word_misses > 0))
+        miss_rate = (word_misses[candidates] + 1) / (word_attempts[candidates] + 2)
+        if len(candidates) > HARDEST_WORDS:
+            top = np.argpartition(-miss_rate, HARDEST_WORDS)[:HARDEST_WORDS]
+        else:
+            top = np.arange(len(candidates))
+        top = top[np.argsort(-miss_rate[top], kind='stable')]
+        hardest = [{'word': self.words[candidates[i]], 'attempts': int(word_attempts[candidates[i]]),
+                    'misses': int(word_misses[candidates[i]])} for i in top]
+
+        # Improvement curve: accuracy over consecutive windows of TREND_WINDOW sessions
+        played = np.flatnonzero(summary.session_attempts)
+        session_attempts = summary.session_attempts[played]
+        session_correct = summary.session_correct[played]
+        windows = np.arange(0, len(played), TREND_WINDOW)
+        curve = []
+        if len(played):
+            curve = (np.add.reduceat(session_correct, windows) /
+                     np.add.reduceat(session_attempts, windows) * 100).tolist()
+
+        def window_accuracy(start, stop):
+            total = session_attempts[start:stop].sum()
+            return float(session_correct[start:stop].sum() / total * 100) if total else None
+
+        return {
+            'attempts': attempts,
+            'correct': correct,
+            'accuracy': correct / attempts * 100 if attempts else 0.0,
+            'sessions': len(played),
+            'words': int(np.count_nonzero(word_attempts)),
+            'levels': levels,
+            'response_time_p50': histogram_percentile(summary.response_times, 0.50),
+            'response_time_p90': histogram_percentile(summary.response_times, 0.90),
+            'hardest_words': hardest,
+            'recent_accuracy': window_accuracy(max(0, len(played) - TREND_WINDOW), len(played)),
+            'previous_accuracy': window_accuracy(max(0, len(played) - 2 * TREND_WINDOW),
+                                                 max(0, len(played) - TREND_WINDOW)),
+            'curve_window': TREND_WINDOW,
+            'curve': curve,
+        }
+
+
+def format_report(report):
+    """The report as readable text"""
+    lines = [f"{report['attempts']:,} attempts over {report['sessions']:,} sessions and "
+             f"{report['words']:,} words: {report['accuracy']:.1f}% correct",
+             f"Response time: median {report['response_time_p50']:.1f}s, "
+             f"90th percentile {report['response_time_p90']:.1f}s",
+             "",
+             "Accuracy by level:"]
+    for level in report['levels']:
+        lines.append(f"  {level['name']:<14}{level['attempts']:>10,}  {level['accuracy']:5.1f}%  "
+                     f"{level['mean_response_time']:5.1f}s")
+    lines += ["", "Hardest words:"]
+    for word in report['hardest_words']:
+        lines.append(f"  {word['word']:<20}{word['misses']:>6} missed of {word['attempts']}")
+    lines += ["", f"Improvement (accuracy per {report['curve_window']} sessions):"]
+    lines.append("  " + " ".join(f"{value:.0f}%" for value in report['curve']))
+    return "\n".join(lines)
+
+
+def main():
+    from app_paths import get_data_dir
+    parser = argparse.ArgumentParser(description="Report on the attempt history")
+    parser.add_argument('--history', help="history database (default: the game's data directory)")
+    parser.add_argument('--columns', help="analytics column directory (default: the game's data directory)")
+    parser.add_argument('--rebuild', action='store_true', help="recompute the summary from the columns")
+    parser.add_argument('--output', help="write the report to this file (.json for JSON, otherwise text)")
+    args = parser.parse_args()
+
+    history_path = args.history or os.path.join(get_data_dir(), 'history.sqlite3')
+    if not os.path.exists(history_path):
+        print(f"No attempt history at {history_path}", file=sys.stderr)
+        sys.exit(1)
+    analytics = AttemptAnalytics(args.columns or get_data_dir('analytics'))
+
+    start = time.perf_counter()
+    connection = sqlite3.connect(history_path)
+    try:
+        added = analytics.sync(connection)
+    finally:
+        connection.close()
+    if args.rebuild:
+        analytics.rebuild_summary()
+        analytics.publish()
+    print(f"{added:,} new attempts synced, {analytics.rows:,} in total "
+          f"({(time.perf_counter() - start) * 1000:.0f} ms)", file=sys.stderr)
+
+    report = analytics.report
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            if args.output.endswith('.json'):
+                json.dump(report, f, indent=2)
+            else:
+                f.write(format_report(report) + "\n")
+    else:
+        print(format_report(report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""
+App Paths - Locations of on-disk caches and saved player data
+"""
+
+import os
+
+APP_NAME = "spelling_bee"
+
+
+def get_cache_dir(*parts):
+    """Return (and create) a directory for regenerable cache files"""
+    base = os.environ.get('SPELLING_BEE_CACHE_DIR')
+    if not base:
+        xdg_cache = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        base = os.path.join(xdg_cache, APP_NAME)
+    path = os.path.join(base, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def get_data_dir(*parts):
+    """Return (and create) a directory for player data that must be kept"""
+    base = os.environ.get('SPELLING_BEE_DATA_DIR')
+    if not base:
+        xdg_data = os.environ.get('XDG_DATA_HOME') or os.path.join(os.path.expanduser('~'), '.local', 'share')
+        base = os.path.join(xdg_data, APP_NAME)
+    path = os.path.join(base, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
@@ -0,0 +1,251 @@
+"""
+Attempt Store - Every answered word saved to a local SQLite database by a background writer,
+so the game loop never waits on the disk
+"""
+
+import sqlite3
+import threading
+import time
+from collections import deque
+from itertools import groupby
+from operator import itemgetter
+
+SCHEMA_VERSION = 1
+
+# Times in a row a batch may fail to commit (retried at each wakeup) before it is dropped
+MAX_WRITE_FAILURES = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    started_at REAL NOT NULL,
+    ended_at REAL,
+    score REAL,
+    words_attempted INTEGER,
+    words_correct INTEGER
+);
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY,
+    session_id INTEGER NOT NULL,
+    at REAL NOT NULL,
+    word TEXT NOT NULL,
+    input TEXT NOT NULL,
+    correct INTEGER NOT NULL,
+    response_time REAL NOT NULL,
+    hint_used INTEGER NOT NULL,
+    level INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS attempts_session ON attempts (session_id);
+"""
+
+INSERT_SESSION = "INSERT INTO sessions (id, started_at) VALUES (?, ?)"
+END_SESSION = ("UPDATE sessions SET ended_at = ?, score = ?, words_attempted = ?, words_correct = ? "
+               "WHERE id = ?")
+INSERT_ATTEMPT = ("INSERT INTO attempts (session_id, at, word, input, correct, response_time, hint_used, level) "
+                  "VALUES (?, ?, ?, ?, ?, ?, ?, ?)")
+
+
+def connect(path):
+    """Open the database in WAL mode, so readers never block the writer"""
+    connection = sqlite3.connect(path, timeout=5.0)
+    connection.execute("PRAGMA journal_mode=WAL")
+    # In WAL mode NORMAL only risks the last transactions on power loss, never corruption
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+class AttemptStore:
+    """Sessions and attempts buffered in memory and written in batches by a daemon thread.
+
+    The recording methods only append a row to a deque, so they cost about a
+    microsecond on the calling thread.  The writer wakes every
+    flush_interval seconds, or as soon as batch_size rows are waiting, and
+    commits everything pending in one transaction.  A batch that fails to
+    commit goes back to the front of the queue; after MAX_WRITE_FAILURES
+    failures in a row it is dropped and counted in get_stats().  Session ids are handed
+    out here rather than by SQLite, so attempts can refer to their session
+    before it has been written.
+
+    on_commit, if given, is called on the writer thread with its connection
+    to keep e.g. analytics in step: once at startup, once a finished session
+    has been written (but no sooner than min_notify_gap seconds after the
+    previous call), and otherwise at most every notify_interval seconds, so
+    its work stays off the writer's per-batch path.
+    """
+
+    def __init__(self, path, batch_size=256, flush_interval=1.0, on_commit=None, notify_interval=30.0,
+                 min_notify_gap=5.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_commit = on_commit
+        self.notify_interval = notify_interval
+        self.min_notify_gap = min_notify_gap
+
+        connection = connect(path)
+        try:
+            with connection:
+                connection.executescript(SCHEMA)
+                connection.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+            self.next_session_id = connection.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM sessions").fetchone()[0]
+        finally:
+            connection.close()
+        self.session_id = None
+
+        # (statement, row) pairs waiting for the writer; deque appends and pops are thread-safe
+        self.pending = deque()
+        self.queued = 0
+        self.written = 0
+        self.batches = 0
+        self.write_seconds = 0.0
+        self.errors = 0
+        self.failures = 0  # Failed commits in a row of the batch at the head of pending
+        self.dropped = 0
+        self.closing = False
+        # Rows queued up to the end of the last finished session, and rows written at the last on_commit
+        self.notify_target = 0
+        self.notified_through = 0
+        self.last_notify = 0.0
+        self.wakeup = threading.Event()
+        self.progress = threading.Condition()
+
+        self.thread = threading.Thread(target=self.writer_loop, name="attempt-store", daemon=True)
+        self.thread.start()
+
+    # Recording (called from the game loop)
+
+    def begin_session(self):
+        """Start a new session; attempts recorded from now on belong to it"""
+        self.session_id = self.next_session_id
+        self.next_session_id += 1
+        self.enqueue(INSERT_SESSION, (self.session_id, time.time()))
+
+    def end_session(self, score, words_attempted, words_correct):
+        """Store the final counters of the current session"""
+        if self.session_id is None:
+            return
+        self.enqueue(END_SESSION, (time.time(), score, words_attempted, words_correct, self.session_id))
+        self.session_id = None
+        # Write the finished session now, so it shows up in the analytics on the game over screen
+        self.notify_target = self.queued
+        self.wakeup.set()
+
+    def record_attempt(self, word, user_input, correct, response_time, hint_used, level):
+        """Store one answered (or timed out) word"""
+        if self.session_id is None:
+            self.begin_session()
+        self.enqueue(INSERT_ATTEMPT, (self.session_id, time.time(), word, user_input, int(correct),
+                                      response_time, int(hint_used), level))
+
+    def enqueue(self, statement, row):
+        self.pending.append((statement, row))
+        self.queued += 1
+        if len(self.pending) >= self.batch_size:
+            self.wakeup.set()
+
+    # Writer thread
+
+    def writer_loop(self):
+        connection = connect(self.path)
+        try:
+            self.notify_commit(connection)
+            while True:
+                self.wakeup.wait(self.flush_interval)
+                self.wakeup.clear()
+                self.write_pending(connection)
+                if self.closing and not self.pending:
+                    break
+            if self.notified_through < self.written:
+                self.notify_commit(connection)
+        finally:
+            connection.close()
+
+    def write_pending(self, connection):
+        """Commit every pending row in one transaction, then call on_commit if it is due"""
+        batch = []
+        while self.pending:
+            batch.append(self.pending.popleft())
+        if not batch:
+            self.notify_if_due(connection, self.written)
+            return
+
+        start = time.perf_counter()
+        try:
+            with connection:
+                # Consecutive rows for the same statement go through one executemany call
+                for statement, rows in groupby(batch, key=itemgetter(0)):
+                    connection.executemany(statement, [row for _, row in rows])
+        except sqlite3.Error as e:
+            self.errors += 1
+            self.failures += 1
+            elapsed = time.perf_counter() - start
+            with self.progress:
+                self.write_seconds += elapsed
+                if self.failures < MAX_WRITE_FAILURES:
+                    # Ahead of anything recorded meanwhile, to be retried at the next wakeup
+                    print(f"Could not save attempt history, will retry: {e}")
+                    self.pending.extendleft(reversed(batch))
+                else:
+                    print(f"Could not save attempt history, dropping {len(batch)} rows: {e}")
+                    self.failures = 0
+                    self.dropped += len(batch)
+                self.progress.notify_all()
+            return
+        elapsed = time.perf_counter() - start
+        self.failures = 0
+        self.notify_if_due(connection, self.written + len(batch))
+
+        with self.progress:
+            self.batches += 1
+            self.write_seconds += elapsed
+            self.written += len(batch)
+            self.progress.notify_all()
+
+    def notify_if_due(self, connection, written):
+        """Call on_commit for a finished session, or for rows left unreported for notify_interval"""
+        if self.notified_through >= written:
+            return
+        since = time.monotonic() - self.last_notify
+        if ((self.notified_through < self.notify_target <= written and since >= self.min_notify_gap)
+                or since >= self.notify_interval):
+            self.notify_commit(connection, written)
+
+    def notify_commit(self, connection, written=None):
+        self.notified_through = self.written if written is None else written
+        self.last_notify = time.monotonic()
+        if self.on_commit is None:
+            return
+        try:
+            self.on_commit(connection)
+        except (OSError, ValueError, sqlite3.Error) as e:
+            print(f"Attempt history listener failed: {e}")
+
+    # Shutdown
+
+    def flush(self, timeout=None):
+        """Wait until everything recorded so far has been written; False on timeout or if some of it was dropped"""
+        target = self.queued
+        dropped = self.dropped
+        self.wakeup.set()
+        with self.progress:
+            self.progress.wait_for(lambda: self.written + self.dropped >= target or not self.thread.is_alive(),
+                                   timeout)
+            return self.written + dropped >= target
+
+    def close(self, timeout=5.0):
+        """Write what is left and stop the writer thread"""
+        self.closing = True
+        self.wakeup.set()
+        self.thread.join(timeout)
+
+    def get_stats(self):
+        """Rows queued and written, and how long the writer spent in transactions"""
+        return {
+            'queued': self.queued,
+            'written': self.written,
+            'pending': len(self.pending),
+            'batches': self.batches,
+            'write_ms': self.write_seconds * 1000,
+            'errors': self.errors,
+            'dropped': self.dropped,
+        }
@@ -6,22 +6,44 @@ import pygame
 import os
 import random
 from pygame import mixer
-import numpy as np
+from synth import ToneBank
+from speech_worker import SpeechWorker
+from pronunciation_cache import PronunciationCache
+from app_paths import get_cache_dir
+
+# Posted by the speech worker when speaking a word fails; the main loop plays
+# the letter-tone fallback for event.word, since the mixer is driven from there
+FALLBACK_PRONUNCIATION = pygame.event.custom_type()
 
 class AudioController:
     def __init__(self):
         # Check if audio is available
         self.audio_available = pygame.mixer.get_init() is not None
         
+        # Volume settings
+        self.sfx_volume = 0.7
+        self.voice_volume = 0.8
+        self.tone_volume = 0.3
+        
+        # Generated tones are cached so each one is synthesized only once
+        self.tone_bank = ToneBank() if self.audio_available else None
+        
+        # Word pronunciations get a reserved mixer channel so effects never
+        # steal it and a new word simply replaces the one playing
+        self.voice_channel = None
+        if self.audio_available:
+            pygame.mixer.set_reserved(1)
+            self.voice_channel = pygame.mixer.Channel(0)
+            
+        # Fallback letter-tone pronunciation timing (seconds)
+        self.fallback_note_duration = 0.08
+        self.fallback_note_gap = 0.02
+        
         # Sound effects
         self.sounds = {}
         if self.audio_available:
             self.load_sound_effects()
         
-        # Volume settings
-        self.sfx_volume = 0.7
-        self.voice_volume = 0.8
-        
         # TTS voice settings for word pronunciation
         self.setup_tts()
         
@@ -52,7 +74,6 @@ class AudioController:
             return None
             
         # Create a simple tone based on sound type
-        sample_rate = 22050
         duration = 0.3
         
         if sound_type == 'correct':
@@ -66,75 +87,140 @@ class AudioController:
             frequency = 100
             duration = 0.8
         
-        try:    
-            frames = int(duration * sample_rate)
-            arr = []
-            for i in range(frames):
-                time = float(i) / sample_rate
-                wave = 4096 * (0.5 * (1 + pygame.math.Vector2(1, 0).rotate(360 * frequency * time).x))
-                arr.append([int(wave), int(wave)])
-                
-            sound = pygame.sndarray.make_sound(np.array(arr, dtype=np.int16))
-            sound.set_volume(self.sfx_volume)
-            return sound
-        except:
+        try:
+            return self.tone_bank.get(frequency, duration, 'sine', self.sfx_volume)
+        except pygame.error as e:
+            print(f"Could not create placeholder sound {sound_type}: {e}")
             return None
         
     def setup_tts(self):
         """Setup text-to-speech for word pronunciation"""
+        self.speech_worker = None
+        self.pronunciation_cache = None
         try:
             # Try to import pyttsx3 for offline TTS
             import pyttsx3
-            self.tts_engine = pyttsx3.init()
-            self.tts_engine.setProperty('rate', 120)  # Slower speech rate
-            self.tts_engine.setProperty('volume', self.voice_volume)
-            self.has_tts = True
-        except (ImportError, RuntimeError) as e:
+        except ImportError as e:
             print(f"TTS not available: {e}")
             print("Using visual-only mode")
             self.has_tts = False
+            return
+            
+        # Rendered words are cached on disk and as decoded Sounds in memory
+        if self.audio_available:
+            self.pronunciation_cache = PronunciationCache(get_cache_dir('pronunciations'))
+            
+        # The engine lives on its own thread so speaking never stalls the frame loop
+        self.speech_worker = SpeechWorker(self.create_tts_engine,
+                                          on_error=self.request_fallback_pronunciation,
+                                          cache=self.pronunciation_cache,
+                                          channel=self.voice_channel)
+        self.has_tts = self.speech_worker.start()
+        if not self.has_tts:
+            print("Using visual-only mode")
+            
+    def create_tts_engine(self):
+        """Create and configure the TTS engine (runs on the speech worker thread)"""
+        import pyttsx3
+        engine = pyttsx3.init()
+        engine.setProperty('rate', 120)  # Slower speech rate
+        engine.setProperty('volume', self.voice_volume)
+        return engine
             
     def play_word_pronunciation(self, word):
-        """Play pronunciation of given word"""
+        """Play pronunciation of given word without blocking the caller"""
         if self.has_tts:
-            try:
-                # Use TTS engine to speak the word
-                self.tts_engine.say(word)
-                self.tts_engine.runAndWait()
-            except Exception as e:
-                print(f"TTS error: {e}")
-                self.play_fallback_pronunciation(word)
+            # A new request supersedes whatever is still being spoken
+            self.speech_worker.replace_current(word)
         else:
             self.play_fallback_pronunciation(word)
             
+    def prefetch_pronunciations(self, words):
+        """Synthesize upcoming words in the background so they play instantly later"""
+        if self.has_tts:
+            for word in words:
+                self.speech_worker.prefetch(word)
+        else:
+            for word in words:
+                self.get_fallback_sound(word)
+            
+    def stop_pronunciation(self):
+        """Cancel current and queued pronunciations"""
+        if self.has_tts:
+            self.speech_worker.cancel()
+        if self.voice_channel:
+            self.voice_channel.stop()
+            
+    def get_pronunciation_cache_stats(self):
+        """Hit/miss/eviction counters for the pronunciation cache"""
+        if not self.pronunciation_cache:
+            return {}
+        return self.pronunciation_cache.get_stats()
+        
+    def get_speech_latency_stats(self):
+        """Per-utterance latency summary from the speech worker"""
+        if not self.speech_worker:
+            return {}
+        return self.speech_worker.get_latency_stats()
+        
+    def shutdown(self):
+        """Stop background audio work and report speech latency"""
+        if not self.speech_worker:
+            return
+        stats = self.speech_worker.get_latency_stats()
+        if stats.get('utterances'):
+            total = stats['total_latency']
+            start = stats['queue_latency']
+            print(f"Speech latency over {stats['utterances']} utterances: "
+                  f"start avg {start['avg'] * 1000:.0f}ms / p95 {start['p95'] * 1000:.0f}ms, "
+                  f"total avg {total['avg'] * 1000:.0f}ms / max {total['max'] * 1000:.0f}ms "
+                  f"({stats['cancelled']} cancelled)")
+        cache_stats = self.get_pronunciation_cache_stats()
+        if cache_stats:
+            print(f"Pronunciation cache: {cache_stats['hits']} hits, {cache_stats['disk_hits']} disk hits, "
+                  f"{cache_stats['misses']} misses, {cache_stats['evictions']} evictions")
+        self.speech_worker.stop()
+            
+    def request_fallback_pronunciation(self, word):
+        """Ask the main loop to play the fallback for word (called on the speech worker thread)"""
+        try:
+            pygame.event.post(pygame.event.Event(FALLBACK_PRONUNCIATION, word=word))
+        except pygame.error as e:
+            print(f"Could not queue fallback pronunciation: {e}")
+            
     def play_fallback_pronunciation(self, word):
         """Fallback pronunciation using simple audio cues"""
-        # Create a simple audio pattern based on word length and characteristics
-        for i, char in enumerate(word.lower()):
-            if char.isalpha():
-                # Create different tones for different letters
-                frequency = 400 + (ord(char) - ord('a')) * 20
-                self.play_tone(frequency, 0.1)
-                pygame.time.wait(50)
-                
+        sound = self.get_fallback_sound(word)
+        if sound is not None:
+            # Playing on the voice channel replaces any pronunciation in progress
+            self.voice_channel.play(sound)
+            
+    def get_fallback_sound(self, word):
+        """Render the letter-tone pattern for a word as one cached Sound"""
+        if not self.audio_available:
+            return None
+            
+        # Create different tones for different letters
+        frequencies = [400 + (ord(char) - ord('a')) * 20
+                       for char in word.lower() if 'a' <= char <= 'z']
+        if not frequencies:
+            return None
+            
+        try:
+            return self.tone_bank.get_sequence(frequencies, self.fallback_note_duration,
+                                               self.fallback_note_gap, 'sine', self.tone_volume)
+        except pygame.error as e:
+            print(f"Could not create fallback pronunciation: {e}")
+            return None
+            
     def play_tone(self, frequency, duration):
         """Play a tone at specified frequency and duration"""
         if not self.audio_available:
             return
             
         try:
-            sample_rate = 22050
-            frames = int(duration * sample_rate)
-            arr = []
-            for i in range(frames):
-                time = float(i) / sample_rate
-                wave = 2048 * (0.5 * (1 + pygame.math.Vector2(1, 0).rotate(360 * frequency * time).x))
-                arr.append([int(wave), int(wave)])
-                
-            sound = pygame.sndarray.make_sound(np.array(arr, dtype=np.int16))
-            sound.set_volume(0.3)
-            sound.play()
-        except:
+            self.tone_bank.get(frequency, duration, 'sine', self.tone_volume).play()
+        except pygame.error:
             pass
         
     def play_correct_sound(self):
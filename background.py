@@ -2,11 +2,19 @@
 Parallax Background - 2.5D scrolling background with multiple layers
 """
 
-import pygame
+import hashlib
 import math
+import os
+from fractions import Fraction
+import pygame
+import numpy as np
+from app_paths import get_cache_dir
+
+# Bump whenever the generated artwork changes so stale disk caches are ignored
+BACKGROUND_CACHE_VERSION = 2
 
 class ParallaxBackground:
-    def __init__(self, screen):
+    def __init__(self, screen, use_cache=True):
         self.screen = screen
         self.screen_width = screen.get_width()
         self.screen_height = screen.get_height()
@@ -14,63 +22,172 @@ class ParallaxBackground:
         # Background layers with different scroll speeds
         self.layers = []
         self.scroll_speeds = [0.5, 1.0, 1.5]  # Sky, mountains, ground
-        self.scroll_offset = 0
+        self.scroll_rate = 30.0  # Pixels per second at speed 1.0
+        self.scroll_offset = 0.0
+        
+        # Scroll position at the previous simulation step and the interpolated
+        # position the next draw uses
+        self.previous_scroll_offset = 0.0
+        self.render_offset = 0.0
+        
+        # Every layer lines up with its start again after this much scrolling,
+        # so wrapping here is seamless
+        denominators = [Fraction(speed).limit_denominator(100).denominator for speed in self.scroll_speeds]
+        self.scroll_period = self.screen_width * 2 * math.lcm(*denominators)
+        
+        # When False the backdrop holds still, which keeps dirty-rect frames small
+        self.animated = True
+        self.drawn_positions = None
         
         # Colors for generated backgrounds
         self.sky_color = (135, 206, 250)  # Sky blue
         self.mountain_color = (139, 69, 19)  # Saddle brown
         self.ground_color = (34, 139, 34)  # Forest green
         
-        # Initialize background layers
-        self.create_background_layers()
+        # Initialize background layers, reusing pixels generated by an earlier run
+        self.use_cache = use_cache
+        self.loaded_from_cache = False
+        if not (use_cache and self.load_cached_layers()):
+            self.create_background_layers()
+            if use_cache:
+                self.save_cached_layers()
         
     def create_background_layers(self):
-        """Create parallax background layers"""
-        # Sky layer (gradient)
-        sky_surface = pygame.Surface((self.screen_width * 2, self.screen_height))
-        self.create_sky_gradient(sky_surface)
-        self.layers.append({
-            'surface': sky_surface,
-            'speed': self.scroll_speeds[0],
-            'y': 0
-        })
+        """Create parallax background layers as tiles cropped to their content"""
+        tile_width = self.screen_width * 2
+        
+        # The sky gradient only varies vertically, so it is a static screen-sized
+        # base; just the clouds scroll
+        self.sky_surface = pygame.Surface((self.screen_width, self.screen_height))
+        self.create_sky_gradient(self.sky_surface)
+        self.sky_surface = self.convert_surface(self.sky_surface)
+        
+        clouds_surface = pygame.Surface((tile_width, self.screen_height))
+        self.add_clouds(clouds_surface)
+        self.add_layer(clouds_surface, self.scroll_speeds[0])
+        
+        # Everything under the top of the opaque ground strip is always covered
+        ground_top = int(self.screen_height * 0.8)
         
         # Mountains layer
-        mountain_surface = pygame.Surface((self.screen_width * 2, self.screen_height))
-        mountain_surface.set_colorkey((0, 0, 0))  # Make black transparent
+        mountain_surface = pygame.Surface((tile_width, self.screen_height))
         self.create_mountains(mountain_surface)
-        self.layers.append({
-            'surface': mountain_surface,
-            'speed': self.scroll_speeds[1],
-            'y': 0
-        })
+        self.add_layer(mountain_surface, self.scroll_speeds[1], bottom=ground_top)
         
         # Ground layer
-        ground_surface = pygame.Surface((self.screen_width * 2, self.screen_height))
-        ground_surface.set_colorkey((0, 0, 0))  # Make black transparent
+        ground_surface = pygame.Surface((tile_width, self.screen_height))
         self.create_ground(ground_surface)
+        self.add_layer(ground_surface, self.scroll_speeds[2])
+        
+    def add_layer(self, surface, speed, bottom=None):
+        """Crop a full-height layer to the band of rows it draws on and store it as a tile"""
+        # Rows holding anything other than the transparent black
+        pixels = pygame.surfarray.pixels2d(surface)
+        rows = np.flatnonzero((pixels != surface.map_rgb((0, 0, 0))).any(axis=0))
+        del pixels  # Release the surface lock
+        
+        top = int(rows[0]) if len(rows) else 0
+        end = int(rows[-1]) + 1 if len(rows) else 0
+        if bottom is not None:
+            end = min(end, bottom)
+        band = pygame.Rect(0, top, surface.get_width(), max(0, end - top))
+        
+        tile = surface.subsurface(band).copy()
+        tile.set_colorkey((0, 0, 0), pygame.RLEACCEL)
         self.layers.append({
-            'surface': ground_surface,
-            'speed': self.scroll_speeds[2],
-            'y': 0
+            'surface': self.convert_surface(tile),
+            'speed': speed,
+            'y': band.y
         })
         
-    def create_sky_gradient(self, surface):
-        """Create sky gradient background"""
-        width, height = surface.get_size()
+    def get_cache_path(self):
+        """Cache file for the layers of this screen size and palette"""
+        key = (BACKGROUND_CACHE_VERSION, self.screen_width, self.screen_height,
+               self.sky_color, self.mountain_color, self.ground_color)
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()[:16]
+        return os.path.join(get_cache_dir('backgrounds'), f"background-{digest}.npz")
         
-        # Create vertical gradient from light blue to white
-        for y in range(height):
-            ratio = y / height
-            # Interpolate between sky blue and white
-            r = int(self.sky_color[0] + (255 - self.sky_color[0]) * ratio * 0.3)
-            g = int(self.sky_color[1] + (255 - self.sky_color[1]) * ratio * 0.3)
-            b = int(self.sky_color[2] + (255 - self.sky_color[2]) * ratio * 0.3)
+    def save_cached_layers(self):
+        """Write the generated layers' pixels to the disk cache"""
+        arrays = {}
+        for name, surface, y, speed in self.get_cacheable_surfaces():
+            # Raw row-major pixels reload with a zero-copy frombuffer()
+            arrays[name] = np.frombuffer(pygame.image.tobytes(surface, 'RGBX'), dtype=np.uint8)
+            arrays[f'{name}_meta'] = np.array([surface.get_width(), surface.get_height(), y, speed])
+            
+        path = self.get_cache_path()
+        temp_path = f"{path}.{os.getpid()}.tmp.npz"
+        try:
+            np.savez(temp_path, **arrays)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Could not cache background: {e}")
+            
+    def get_cacheable_surfaces(self):
+        """(name, surface, y, speed) of the sky base and every layer tile"""
+        surfaces = [('sky', self.sky_surface, 0, 0)]
+        for index, layer in enumerate(self.layers):
+            surfaces.append((f'layer{index}', layer['surface'], layer['y'], layer['speed']))
+        return surfaces
+        
+    def load_cached_layers(self):
+        """Restore layers from the disk cache; returns False if there is no usable cache"""
+        path = self.get_cache_path()
+        if not os.path.exists(path):
+            return False
+            
+        def load_surface(data, name):
+            width, height, y, speed = data[f'{name}_meta']
+            surface = pygame.image.frombuffer(data[name], (int(width), int(height)), 'RGBX')
+            return self.convert_surface(surface), int(y), float(speed)
             
-            pygame.draw.line(surface, (r, g, b), (0, y), (width, y))
+        try:
+            with np.load(path) as data:
+                sky_surface = load_surface(data, 'sky')[0]
+                layers = []
+                index = 0
+                while f'layer{index}' in data:
+                    tile, y, speed = load_surface(data, f'layer{index}')
+                    tile.set_colorkey((0, 0, 0), pygame.RLEACCEL)
+                    layers.append({
+                        'surface': tile,
+                        'speed': speed,
+                        'y': y
+                    })
+                    index += 1
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Ignoring unreadable background cache: {e}")
+            return False
             
-        # Add some clouds
-        self.add_clouds(surface)
+        self.sky_surface = sky_surface
+        self.layers = layers
+        self.loaded_from_cache = True
+        return True
+        
+    def convert_surface(self, surface):
+        """Convert a surface to the display pixel format when a display exists"""
+        if pygame.display.get_surface() is None:
+            return surface
+        return surface.convert()
+        
+    def get_memory_usage(self):
+        """Bytes of pixel data held by the background"""
+        surfaces = [self.sky_surface] + [layer['surface'] for layer in self.layers]
+        return sum(surface.get_width() * surface.get_height() * surface.get_bytesize()
+                   for surface in surfaces)
+        
+    def create_sky_gradient(self, surface):
+        """Create sky gradient background"""
+        height = surface.get_height()
+        
+        # Create vertical gradient from light blue to white, one color per row
+        ratio = np.arange(height) / height
+        sky = np.array(self.sky_color, dtype=np.float64)
+        colors = (sky + (255 - sky) * ratio[:, np.newaxis] * 0.3).astype(np.uint8)
+        
+        pixels = pygame.surfarray.pixels2d(surface)
+        pixels[:] = pygame.surfarray.map_array(surface, colors)[np.newaxis, :]
+        del pixels  # Release the surface lock
         
     def add_clouds(self, surface):
         """Add simple cloud shapes to sky"""
@@ -95,27 +212,36 @@ class ParallaxBackground:
                 pygame.draw.circle(surface, (255, 255, 255), 
                                  (int(x + offset_x), int(y + offset_y)), radius)
                                  
+    def fill_below_profile(self, surface, profile, color):
+        """Fill each column x from row profile[x] down to the bottom; NaN leaves a column untouched"""
+        columns = np.flatnonzero(~np.isnan(profile))
+        if not len(columns):
+            return
+            
+        # Only the bounding box of the filled area is touched
+        left, right = columns[0], columns[-1] + 1
+        top = max(0, int(np.nanmin(profile)))
+        rows = np.arange(top, surface.get_height(), dtype=np.float32)
+        mask = rows[np.newaxis, :] >= profile[left:right].astype(np.float32)[:, np.newaxis]  # NaN compares False
+        
+        pixels = pygame.surfarray.pixels2d(surface)
+        np.copyto(pixels[left:right, top:], surface.map_rgb(color), where=mask, casting='unsafe')
+        del pixels  # Release the surface lock
+        
     def create_mountains(self, surface):
         """Create mountain silhouettes"""
         width, height = surface.get_size()
+        columns = np.arange(width)
         
-        # Mountain peaks
-        mountain_points = []
-        
-        # Generate mountain profile
-        for x in range(0, width, 10):
-            # Create mountain-like profile using sine waves
-            base_height = height * 0.7
-            peak_height = height * 0.3 + 50 * math.sin(x * 0.003) + 30 * math.sin(x * 0.007)
-            y = base_height - peak_height
-            mountain_points.append((x, max(int(y), height // 3)))
-            
-        # Close the polygon
-        mountain_points.append((width, height))
-        mountain_points.append((0, height))
+        # Mountain-like profile from sine waves, sampled every 10px like a polygon outline
+        xs = np.arange(0, width, 10)
+        base_height = height * 0.7
+        peak_height = height * 0.3 + 50 * np.sin(xs * 0.003) + 30 * np.sin(xs * 0.007)
+        ys = np.maximum((base_height - peak_height).astype(int), height // 3)
         
-        # Draw mountains
-        pygame.draw.polygon(surface, self.mountain_color, mountain_points)
+        # The outline closes down to the bottom right corner
+        profile = np.interp(columns, np.append(xs, width), np.append(ys, height))
+        self.fill_below_profile(surface, profile, self.mountain_color)
         
         # Add mountain details with darker color
         dark_mountain = (
@@ -127,18 +253,19 @@ class ParallaxBackground:
         # Draw some peaks in darker color for depth
         for i in range(3):
             offset = width * (0.3 + i * 0.3)
-            peak_points = []
-            for x in range(int(offset), int(offset + width * 0.4), 15):
-                if x < width:
-                    base_height = height * 0.8
-                    peak_height = height * 0.2 + 30 * math.sin((x - offset) * 0.01)
-                    y = base_height - peak_height
-                    peak_points.append((x, max(int(y), height // 2)))
-                    
-            if len(peak_points) > 2:
-                peak_points.append((peak_points[-1][0], height))
-                peak_points.append((peak_points[0][0], height))
-                pygame.draw.polygon(surface, dark_mountain, peak_points)
+            xs = np.arange(int(offset), int(offset + width * 0.4), 15)
+            xs = xs[xs < width]
+            if len(xs) <= 2:
+                continue
+                
+            base_height = height * 0.8
+            peak_height = height * 0.2 + 30 * np.sin((xs - offset) * 0.01)
+            ys = np.maximum((base_height - peak_height).astype(int), height // 2)
+            
+            profile = np.full(width, np.nan)
+            span = slice(xs[0], xs[-1] + 1)
+            profile[span] = np.interp(columns[span], xs, ys)
+            self.fill_below_profile(surface, profile, dark_mountain)
                 
     def create_ground(self, surface):
         """Create ground layer with hills"""
@@ -149,19 +276,13 @@ class ParallaxBackground:
         pygame.draw.rect(surface, self.ground_color, 
                         (0, int(ground_y), width, int(height - ground_y)))
         
-        # Add rolling hills
-        hill_points = [(0, int(ground_y))]
-        
-        for x in range(0, width, 20):
-            hill_height = 30 * math.sin(x * 0.01) + 20 * math.sin(x * 0.02)
-            y = ground_y - hill_height
-            hill_points.append((x, int(y)))
-            
-        hill_points.append((width, int(ground_y)))
-        hill_points.append((width, height))
-        hill_points.append((0, height))
+        # Add rolling hills, sampled every 20px like a polygon outline
+        xs = np.arange(0, width, 20)
+        hill_height = 30 * np.sin(xs * 0.01) + 20 * np.sin(xs * 0.02)
+        ys = (ground_y - hill_height).astype(int)
         
-        pygame.draw.polygon(surface, self.ground_color, hill_points)
+        profile = np.interp(np.arange(width), np.append(xs, width), np.append(ys, int(ground_y)))
+        self.fill_below_profile(surface, profile, self.ground_color)
         
         # Add some trees/vegetation
         self.add_vegetation(surface, ground_y)
@@ -194,22 +315,47 @@ class ParallaxBackground:
                                  (int(tree_x), int(ground_y - trunk_height - 10)),
                                  foliage_radius)
                                  
-    def update(self):
-        """Update background animation"""
-        self.scroll_offset += 0.5  # Slow scroll speed
-        
-        # Reset offset when it gets too large
-        if self.scroll_offset > self.screen_width:
-            self.scroll_offset = 0
+    def update(self, dt=1.0 / 60):
+        """Advance background animation by dt seconds"""
+        self.previous_scroll_offset = self.scroll_offset
+        if self.animated:
+            self.scroll_offset += self.scroll_rate * dt
             
+            # Wrap once every layer has come full circle
+            if self.scroll_offset >= self.scroll_period:
+                self.scroll_offset -= self.scroll_period
+                self.previous_scroll_offset -= self.scroll_period
+                
+        # Without interpolate() the next draw shows the latest step
+        self.render_offset = self.scroll_offset
+            
+    def interpolate(self, alpha):
+        """Place the next draw alpha (0..1) of the way from the previous step to the current one"""
+        self.render_offset = (self.previous_scroll_offset
+                              + (self.scroll_offset - self.previous_scroll_offset) * alpha)
+        
+    def get_layer_positions(self):
+        """Whole-pixel scroll position of every layer"""
+        return tuple(int((self.render_offset * layer['speed']) % layer['surface'].get_width())
+                     for layer in self.layers)
+        
+    def get_dirty_rects(self):
+        """The whole screen if any layer moved since it was last drawn, otherwise nothing"""
+        if self.get_layer_positions() == self.drawn_positions:
+            return []
+        return [self.screen.get_rect()]
+        
     def draw(self):
         """Draw all background layers with parallax effect"""
-        for layer in self.layers:
-            # Calculate layer offset based on scroll speed
-            layer_offset = (self.scroll_offset * layer['speed']) % layer['surface'].get_width()
+        self.drawn_positions = self.get_layer_positions()
+        self.screen.blit(self.sky_surface, (0, 0))
+        
+        for layer, layer_offset in zip(self.layers, self.drawn_positions):
+            tile = layer['surface']
+            tile_width, tile_height = tile.get_size()
             
-            # Draw layer twice to create seamless scrolling
-            self.screen.blit(layer['surface'], 
-                           (-layer_offset, layer['y']))
-            self.screen.blit(layer['surface'], 
-                           (layer['surface'].get_width() - layer_offset, layer['y']))
+            # Blit only the visible part of the tile, wrapping around its end
+            visible = min(self.screen_width, tile_width - layer_offset)
+            self.screen.blit(tile, (0, layer['y']), (layer_offset, 0, visible, tile_height))
+            if visible < self.screen_width:
+                self.screen.blit(tile, (visible, layer['y']), (0, 0, self.screen_width - visible, tile_height))
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Analytics Benchmark - Builds a synthetic history of millions of attempts and times the work
+behind the game over screen (one session's incremental sync and report, done on the history
+writer thread) against a full recompute
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from analytics import AttemptAnalytics
+from attempt_store import AttemptStore, connect
+
+INSERT_ROW = ("INSERT INTO attempts (id, session_id, at, word, input, correct, response_time, hint_used, level) "
+              "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)")
+
+
+def synthetic_rows(rng, vocabulary, first_id, count, sessions, start_session=1):
+    """(id, session, at, word, correct, response time, hint used, level) rows spread over sessions"""
+    rows = []
+    per_session = max(1, count // sessions)
+    for index in range(count):
+        level = rng.randint(1, 5)
+        word = vocabulary[rng.randrange(len(vocabulary))]
+        rows.append((first_id + index, start_session + index // per_session, 1.7e9 + index,
+                     word, int(rng.random() < 0.95 - level * 0.07), rng.lognormvariate(1.0, 0.5),
+                     int(rng.random() < 0.1), level))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--attempts', type=int, default=2_000_000, help="attempts in the synthetic history")
+    parser.add_argument('--words', type=int, default=50_000, help="distinct words attempted")
+    parser.add_argument('--session-length', type=int, default=25, help="attempts per session")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', action='store_true', help="print results as JSON")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = [f"word{index}" for index in range(args.words)]
+    sessions = max(1, args.attempts // args.session_length)
+
+    with tempfile.TemporaryDirectory() as directory:
+        analytics = AttemptAnalytics(os.path.join(directory, 'analytics'))
+        os.makedirs(analytics.directory)
+        analytics.load()
+
+        # Bulk history, appended in large batches as a long-time player's sync would have
+        start = time.perf_counter()
+        batch = 100_000
+        for first in range(0, args.attempts, batch):
+            count = min(batch, args.attempts - first)
+            analytics.append(synthetic_rows(rng, vocabulary, first + 1, count, count // args.session_length,
+                                            first // args.session_length + 1))
+        analytics.save_summary()
+        build_s = time.perf_counter() - start
+
+        # Game over: the last session's attempts arrive through the history database
+        history_path = os.path.join(directory, 'history.sqlite3')
+        AttemptStore(history_path).close()
+        connection = connect(history_path)
+        with connection:
+            for row in synthetic_rows(rng, vocabulary, args.attempts + 1, args.session_length, 1, sessions + 1):
+                # The typed input is not analysed; store the word itself
+                connection.execute(INSERT_ROW, row[:4] + (row[3],) + row[4:])
+        start = time.perf_counter()
+        synced = analytics.sync(connection)
+        sync_ms = (time.perf_counter() - start) * 1000
+        connection.close()
+
+        start = time.perf_counter()
+        analytics.publish()
+        report_ms = (time.perf_counter() - start) * 1000
+
+        # Cold start: the summary saved when the game closed is loaded rather than recomputed
+        analytics.save_summary()
+        start = time.perf_counter()
+        reopened = AttemptAnalytics(analytics.directory)
+        reopened.load()
+        reopened.publish()
+        reopen_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        analytics.rebuild_summary()
+        rebuild_ms = (time.perf_counter() - start) * 1000
+
+        columns_mb = sum(os.path.getsize(os.path.join(analytics.directory, name))
+                         for name in os.listdir(analytics.directory)) / (1024 * 1024)
+
+    results = {
+        'attempts': analytics.rows,
+        'sessions': analytics.report['sessions'],
+        'history_build_s': build_s,
+        'game_over_sync_ms': sync_ms,
+        'game_over_rows': synced,
+        'report_ms': report_ms,
+        'reopen_ms': reopen_ms,
+        'full_rebuild_ms': rebuild_ms,
+        'on_disk_mb': columns_mb,
+        'same_totals_after_rebuild': reopened.report['attempts'] == analytics.build_report()['attempts'],
+    }
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{results['attempts']:,} attempts, {results['sessions']:,} sessions, "
+              f"{columns_mb:.1f} MB of columns (built in {build_s:.1f} s)")
+        print(f"  game over sync of {synced} new attempts: {sync_ms:8.2f} ms")
+        print(f"  report from running totals:       {report_ms:8.2f} ms")
+        print(f"  reopen with saved summary:        {reopen_ms:8.2f} ms")
+        print(f"  full recompute from the columns:  {rebuild_ms:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Background Benchmark - Compares memory and blit cost of the tiled parallax background
+against the original full-surface implementation, and fails if a still (--no-scroll)
+background keeps reporting dirty rects
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import pygame
+
+from background import ParallaxBackground
+from legacy_background import ParallaxBackground as LegacyParallaxBackground
+
+
+def surface_bytes(surfaces):
+    """Bytes of pixel data held by a list of surfaces"""
+    return sum(s.get_width() * s.get_height() * s.get_bytesize() for s in surfaces)
+
+
+def measure(background_class, screen, frames):
+    """Build time, pixel memory and per-frame draw time of a background implementation"""
+    start = time.perf_counter()
+    background = background_class(screen)
+    build_seconds = time.perf_counter() - start
+
+    surfaces = [layer['surface'] for layer in background.layers]
+    if hasattr(background, 'sky_surface'):
+        surfaces.append(background.sky_surface)
+
+    draw_times = []
+    for _ in range(frames):
+        background.update()
+        start = time.perf_counter()
+        background.draw()
+        draw_times.append(time.perf_counter() - start)
+    draw_times.sort()
+
+    return {
+        'build_ms': build_seconds * 1000,
+        'memory_mb': surface_bytes(surfaces) / (1024 * 1024),
+        'draw_ms_p50': draw_times[len(draw_times) // 2] * 1000,
+        'draw_ms_p95': draw_times[int(len(draw_times) * 0.95)] * 1000,
+    }
+
+
+def count_still_dirty_frames(screen, frames):
+    """Frames after the first draw in which a background that does not scroll still reports dirty rects"""
+    background = ParallaxBackground(screen)
+    background.animated = False
+    background.update()
+    background.draw()
+    dirty_frames = 0
+    for _ in range(frames):
+        background.update()
+        if background.get_dirty_rects():
+            dirty_frames += 1
+        background.draw()
+    return dirty_frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--frames', type=int, default=600, help="frames to draw per implementation")
+    parser.add_argument('--json', action='store_true', help="print results as JSON")
+    args = parser.parse_args()
+
+    pygame.init()
+    screen = pygame.display.set_mode((1024, 768))
+
+    results = {
+        'legacy': measure(LegacyParallaxBackground, screen, args.frames),
+        'tiled': measure(ParallaxBackground, screen, args.frames),
+    }
+    still_dirty_frames = count_still_dirty_frames(screen, args.frames)
+    pygame.quit()
+
+    if args.json:
+        print(json.dumps(dict(results, still_dirty_frames=still_dirty_frames), indent=2))
+    else:
+        print(f"{'':8} {'build ms':>10} {'memory MB':>10} {'draw p50 ms':>12} {'draw p95 ms':>12}")
+        for name, r in results.items():
+            print(f"{name:8} {r['build_ms']:10.1f} {r['memory_mb']:10.1f} {r['draw_ms_p50']:12.3f} {r['draw_ms_p95']:12.3f}")
+        print(f"still background: {still_dirty_frames} of {args.frames} frames dirty")
+
+    if still_dirty_frames:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
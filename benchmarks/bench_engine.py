@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Engine Benchmark - Simulates whole game sessions on the pygame-free GameEngine with a
+manual clock and reports how much faster than real time they run
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from engine import GameEngine, ManualClock
+from word_manager import WordManager
+
+
+def misspell(word, rng):
+    """Replace one letter of word with a different one"""
+    index = rng.randrange(len(word))
+    letter = rng.choice([c for c in 'abcdefghijklmnopqrstuvwxyz' if c != word[index]])
+    return word[:index] + letter + word[index + 1:]
+
+
+def simulate_session(rng, accuracy, mean_response_ms, hint_rate, max_words=500):
+    """Play one game with a simulated player; returns (engine, simulated milliseconds)"""
+    clock = ManualClock()
+    engine = GameEngine(WordManager(lookahead=3, seed=rng.getrandbits(32)), clock)
+    engine.next_word()
+    engine.start()
+
+    while engine.state == "playing" and engine.words_attempted < max_words:
+        if engine.word_revealed:
+            # Jump straight to the next scheduled transition
+            clock.advance(engine.time_until_next_transition() or 0)
+            engine.update()
+            engine.drain_effects()
+            continue
+
+        if rng.random() < hint_rate:
+            engine.request_hint()
+        clock.advance(int(rng.expovariate(1.0 / mean_response_ms)))
+        engine.update()
+        if not engine.word_revealed:
+            word = engine.current_word
+            engine.type_text(word if rng.random() < accuracy else misspell(word, rng))
+            engine.submit()
+        engine.drain_effects()
+    return engine, clock()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--sessions', type=int, default=2000, help="games to simulate")
+    parser.add_argument('--accuracy', type=float, default=0.85, help="chance the player spells a word right")
+    parser.add_argument('--response-ms', type=float, default=6000, help="mean time the player takes per word")
+    parser.add_argument('--hint-rate', type=float, default=0.1, help="chance the player asks for a hint")
+    parser.add_argument('--seed', type=int, default=1, help="random seed for the simulated player and word order")
+    parser.add_argument('--json', action='store_true', help="print results as JSON")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+
+    scores, words, simulated_ms = [], [], 0
+    start = time.perf_counter()
+    for _ in range(args.sessions):
+        engine, elapsed_ms = simulate_session(rng, args.accuracy, args.response_ms, args.hint_rate)
+        scores.append(engine.score)
+        words.append(engine.words_attempted)
+        simulated_ms += elapsed_ms
+    wall_seconds = time.perf_counter() - start
+
+    results = {
+        'sessions': args.sessions,
+        'wall_seconds': wall_seconds,
+        'sessions_per_second': args.sessions / wall_seconds,
+        'simulated_hours': simulated_ms / 3_600_000,
+        'speedup_vs_real_time': (simulated_ms / 1000) / wall_seconds,
+        'mean_score': sum(scores) / len(scores),
+        'mean_words_per_session': sum(words) / len(words),
+        'pygame_imported': 'pygame' in sys.modules,
+    }
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{args.sessions} sessions ({results['simulated_hours']:.1f} h of play) in {wall_seconds:.2f} s: "
+              f"{results['sessions_per_second']:.0f} sessions/s, "
+              f"{results['speedup_vs_real_time']:,.0f}x real time")
+        print(f"mean score {results['mean_score']:.1f}, "
+              f"mean words per session {results['mean_words_per_session']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Error Analysis Benchmark - Times per-answer misspelling analysis (alignment, confusion matrix and
+pattern counters) on realistic typos of the built-in words, against a plain full-matrix DP
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from error_analysis import ErrorAnalyzer, align
+from words import WORD_LISTS
+
+LETTERS = 'abcdefghijklmnopqrstuvwxyz'
+
+
+def typo(word, rng):
+    """One to three random substitutions, deletions, insertions or swaps"""
+    letters = list(word)
+    for _ in range(rng.randint(1, 3)):
+        index = rng.randrange(len(letters))
+        kind = rng.random()
+        if kind < 0.3:
+            letters[index] = rng.choice(LETTERS)
+        elif kind < 0.55 and len(letters) > 1:
+            del letters[index]
+        elif kind < 0.8:
+            letters.insert(index, rng.choice(LETTERS))
+        elif index < len(letters) - 1:
+            letters[index], letters[index + 1] = letters[index + 1], letters[index]
+    return ''.join(letters)
+
+
+def edit_distance(a, b):
+    """Levenshtein distance with Myers' bit-parallel algorithm (one pass over a, O(len(a)) big-int ops)"""
+    if len(a) < len(b):
+        a, b = b, a
+    m = len(b)
+    if not m:
+        return len(a)
+    peq = {}
+    for index, char in enumerate(b):
+        peq[char] = peq.get(char, 0) | (1 << index)
+    full = (1 << m) - 1
+    last = 1 << (m - 1)
+    pv, mv, score = full, 0, m
+    for char in a:
+        eq = peq.get(char, 0)
+        xv = eq | mv
+        xh = ((((eq & pv) + pv) & full) ^ pv) | eq
+        ph = mv | (~(xh | pv) & full)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = ((ph << 1) | 1) & full
+        mh = (mh << 1) & full
+        pv = mh | (~(xv | ph) & full)
+        mv = ph & xv
+    return score
+
+
+def full_dp_distance(a, b):
+    """Textbook O(len(a) * len(b)) Levenshtein distance over the whole words"""
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, start=1):
+        row = [i]
+        for j, char_b in enumerate(b, start=1):
+            row.append(min(previous[j] + 1, row[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = row
+    return previous[-1]
+
+
+def time_calls(function, pairs):
+    """(mean, p99, max) microseconds of function(target, typed) over the pairs"""
+    samples = []
+    for target, typed in pairs:
+        start = time.perf_counter()
+        function(target, typed)
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return sum(samples) / len(samples), samples[int(len(samples) * 0.99)], samples[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--answers', type=int, default=50_000, help="wrong answers to analyze")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', action='store_true', help="print results as JSON")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    words = [word for words in WORD_LISTS.values() for word in words]
+    pairs = []
+    while len(pairs) < args.answers:
+        word = rng.choice(words)
+        typed = typo(word, rng)
+        if typed != word:
+            pairs.append((word, typed))
+
+    analyzer = ErrorAnalyzer()
+    results = {}
+    for name, function in (('analyze', analyzer.analyze), ('align', align),
+                           ('edit_distance', edit_distance), ('full_dp_distance', full_dp_distance)):
+        mean, p99, worst = time_calls(function, pairs)
+        results[name] = {'mean_us': mean, 'p99_us': p99, 'max_us': worst}
+    results['answers'] = len(pairs)
+    results['edit_counts'] = analyzer.edit_counts
+    results['pattern_miss_rates'] = {name: analyzer.get_miss_rate(name) for name in analyzer.pattern_seen}
+    results['top_confusions'] = analyzer.get_top_confusions()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{len(pairs):,} misspelled answers of the built-in words")
+        for name in ('analyze', 'align', 'edit_distance', 'full_dp_distance'):
+            stats = results[name]
+            print(f"  {name:<18}{stats['mean_us']:8.1f} us mean  {stats['p99_us']:8.1f} us p99  "
+                  f"{stats['max_us']:8.0f} us max")
+        print("  edits: " + ", ".join(f"{kind} {count:,}" for kind, count in analyzer.edit_counts.items()))
+        print("  pattern miss rates: " + ", ".join(f"{name} {rate:.0%}"
+                                                  for name, rate in results['pattern_miss_rates'].items()))
+
+
+if __name__ == "__main__":
+    main()
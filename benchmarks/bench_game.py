@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Game Benchmark - Plays a scripted session of SpellingBeeGame headlessly and reports
+frame rate, per-component render cost, text cache hits, startup time, word selection cost and
+peak memory, optionally gated against a stored baseline; text rendered while nothing on screen
+changes always fails it
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(HERE, '..')
+DEFAULT_BASELINE = os.path.join(HERE, 'baselines', 'bench_game.json')
+
+# Metrics compared against the baseline and whether a larger value is better
+GATED_METRICS = {
+    'startup_ms': False,
+    'fps': True,
+    'frame_p50_ms': False,
+    'frame_p95_ms': False,
+    'background_p50_ms': False,
+    'ui_p50_ms': False,
+    'keyboard_p50_ms': False,
+    'present_p50_ms': False,
+    'select_word_us': False,
+    'peak_rss_mb': False,
+}
+
+# The session: start from the menu, answer correctly (with a hint and a replay),
+# then answer wrongly until the game ends, and restart
+SCRIPT = [
+    ('key', 'space'),
+    ('type_word', None), ('key', 'return'), ('wait', 400),
+    ('key', 'h'), ('key', 'space'), ('type_word', None), ('key', 'return'), ('wait', 400),
+    ('type', 'qzx'), ('key', 'backspace'), ('key', 'return'), ('wait', 400),
+    ('type', 'qzx'), ('key', 'return'), ('wait', 400),
+    ('type', 'qzx'), ('key', 'return'), ('wait', 400),
+    ('key', 'space'), ('type_word', None), ('wait', 200),
+]
+
+# Shorter transition delays than the game's, so the session spends its time drawing
+NEXT_WORD_DELAY_MS = 200
+
+# Frames drawn after each scripted keystroke
+FRAMES_PER_KEY = 2
+
+# Frames drawn without input after the session; every label they show is already cached
+STEADY_FRAMES = 60
+
+
+def post_key(pygame, key_name, unicode=''):
+    """Queue a KEYDOWN event the way SDL would deliver it"""
+    key = pygame.key.key_code(key_name)
+    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key, unicode=unicode, mod=0, scancode=0))
+
+
+def play_session(game, pygame):
+    """Run the scripted session, drawing frames as fast as possible; returns (frames, seconds)"""
+    frames = 0
+    previous_time = time.perf_counter()
+    start = previous_time
+
+    def step(count):
+        nonlocal frames, previous_time
+        for _ in range(count):
+            now = time.perf_counter()
+            game.advance_frame(min(now - previous_time, game.MAX_FRAME_TIME))
+            previous_time = now
+            frames += 1
+
+    for action, value in SCRIPT:
+        if action == 'key':
+            post_key(pygame, value, ' ' if value == 'space' else '')
+            step(FRAMES_PER_KEY)
+        elif action in ('type', 'type_word'):
+            text = game.engine.current_word if action == 'type_word' else value
+            for char in text:
+                post_key(pygame, char, char)
+                step(FRAMES_PER_KEY)
+        elif action == 'wait':
+            until = time.perf_counter() + value / 1000.0
+            while time.perf_counter() < until:
+                step(1)
+    return frames, time.perf_counter() - start
+
+
+def time_word_selection(word_manager, calls=2000):
+    """Median microseconds per select_word over every level"""
+    samples = []
+    for index in range(calls):
+        level = index % 5 + 1
+        start = time.perf_counter()
+        word_manager.select_word(level)
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB, or None where it cannot be read"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_child():
+    """One benchmark run, in this (fresh) process; prints its metrics as JSON"""
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    sys.path.insert(0, HERE)
+    sys.path.insert(0, ROOT)
+
+    import stub_tts
+    stub_tts.install()
+
+    import pygame
+    pygame.init()
+    try:
+        pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
+    except pygame.error:
+        pass
+    from game import SpellingBeeGame
+
+    start = time.perf_counter()
+    game = SpellingBeeGame()
+    startup_ms = (time.perf_counter() - start) * 1000
+
+    game.engine.NEXT_WORD_DELAY_CORRECT_MS = NEXT_WORD_DELAY_MS
+    game.engine.NEXT_WORD_DELAY_WRONG_MS = NEXT_WORD_DELAY_MS
+    game.profiler.history_size = 1_000_000
+    game.profiler.enabled = True
+
+    frames, seconds = play_session(game, pygame)
+    stats = game.profiler.get_stats()
+    text_stats = game.ui_manager.text_cache.get_stats()
+    for _ in range(STEADY_FRAMES):
+        game.advance_frame(1.0 / 60)
+    steady_text_misses = game.ui_manager.text_cache.get_stats()['misses'] - text_stats['misses']
+
+    results = {
+        'startup_ms': startup_ms,
+        'frames': frames,
+        'fps': frames / seconds,
+        'frame_p50_ms': stats['total']['p50'],
+        'frame_p95_ms': stats['total']['p95'],
+        'frame_p99_ms': stats['total']['p99'],
+        'frame_max_ms': stats['total']['max'],
+        'long_calls': len(game.profiler.long_calls),
+        'text_cache_hit_rate': text_stats['hit_rate'],
+        'steady_text_misses': steady_text_misses,
+        'final_state': game.game_state,
+    }
+    for name in ('events', 'update', 'background', 'ui', 'keyboard', 'present'):
+        if name in stats:
+            results[f'{name}_p50_ms'] = stats[name]['p50']
+            results[f'{name}_p95_ms'] = stats[name]['p95']
+
+    speech = game.audio_controller.get_speech_latency_stats() or {}
+    results['utterances'] = speech.get('utterances', 0)
+    if 'queue_latency' in speech:
+        results['speech_queue_p95_ms'] = speech['queue_latency']['p95'] * 1000
+
+    results['select_word_us'] = time_word_selection(game.word_manager)
+    game.audio_controller.shutdown()
+    results['peak_rss_mb'] = peak_rss_mb()
+    print(json.dumps(results))
+
+
+def run_once():
+    """Run one session in a subprocess with empty caches and history and return its metrics"""
+    with tempfile.TemporaryDirectory() as cache_dir, tempfile.TemporaryDirectory() as data_dir:
+        env = dict(os.environ, SDL_VIDEODRIVER='dummy', SDL_AUDIODRIVER='dummy',
+                   SPELLING_BEE_CACHE_DIR=cache_dir, SPELLING_BEE_DATA_DIR=data_dir)
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), '--child'],
+                                env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def median_results(runs):
+    """Per-metric median over several runs (non-numeric values come from the first run)"""
+    results = {}
+    for name, value in runs[0].items():
+        values = sorted(run[name] for run in runs if isinstance(run.get(name), (int, float)))
+        if isinstance(value, bool) or not values:
+            results[name] = value
+        else:
+            results[name] = values[len(values) // 2]
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Return (metric, baseline, current, change) rows and the metrics that regressed beyond tolerance"""
+    rows, regressions = [], []
+    for name, higher_is_better in GATED_METRICS.items():
+        old, new = baseline.get(name), results.get(name)
+        if not old or new is None:
+            continue
+        change = (new - old) / old
+        rows.append((name, old, new, change))
+        worse = -change if higher_is_better else change
+        if worse > tolerance:
+            regressions.append(name)
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--runs', type=int, default=3, help="sessions to run; metrics are medians")
+    parser.add_argument('--json', action='store_true', help="print results as JSON")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                        help="baseline JSON to compare against (default: benchmarks/baselines/bench_game.json)")
+    parser.add_argument('--save-baseline', action='store_true', help="write these results as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="allowed relative regression per gated metric before failing (default: 0.25)")
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child()
+        return
+
+    results = median_results([run_once() for _ in range(args.runs)])
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+            f.write('\n')
+
+    rows, regressions = [], []
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            rows, regressions = compare(results, json.load(f), args.tolerance)
+    if results['steady_text_misses']:
+        regressions.append('steady_text_misses')
+
+    if args.json:
+        print(json.dumps({'results': results,
+                          'comparison': {name: {'baseline': old, 'current': new, 'change': change}
+                                         for name, old, new, change in rows},
+                          'regressions': regressions}, indent=2))
+    else:
+        print(f"Scripted session (median of {args.runs}): {results['frames']} frames, "
+              f"{results['fps']:.0f} fps, startup {results['startup_ms']:.1f} ms")
+        for name, value in results.items():
+            if isinstance(value, float):
+                print(f"  {name:<22}{value:>10.3f}")
+        flag = "  REGRESSION" if 'steady_text_misses' in regressions else ""
+        print(f"  {'steady_text_misses':<22}{results['steady_text_misses']:>10}{flag}")
+        if rows:
+            print(f"Against {os.path.relpath(args.baseline)}:")
+            for name, old, new, change in rows:
+                flag = "  REGRESSION" if name in regressions else ""
+                print(f"  {name:<22}{old:>10.3f} -> {new:>10.3f}  {change:+7.1%}{flag}")
+
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+History Benchmark - Answers a word every frame of a headless SpellingBeeGame with the attempt
+history on and off, and compares frame times to show the background writer keeps disk I/O
+out of the game loop
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.join(HERE, '..'))
+
+# Every n-th answer is wrong, so lives run out and sessions restart now and then
+WRONG_EVERY = 7
+
+
+def post_key(pygame, key, unicode=''):
+    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key, unicode=unicode, mod=0, scancode=0))
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def rapid_fire(game, pygame, frames, answer_index=0):
+    """Type and submit one answer per frame; returns (frame times in ms, answers given)"""
+    samples = []
+    answers = answer_index
+    previous_time = time.perf_counter()
+    for _ in range(frames):
+        engine = game.engine
+        if engine.state == "game_over":
+            post_key(pygame, pygame.K_SPACE, ' ')
+        elif engine.state == "playing":
+            if engine.word_revealed:
+                # Skip the reveal delay so every frame carries an answer
+                engine.advance_to_next_word()
+            answers += 1
+            text = "qzx" if answers % WRONG_EVERY == 0 else engine.current_word
+            for char in text:
+                post_key(pygame, ord(char), char)
+            post_key(pygame, pygame.K_RETURN, '\r')
+
+        start = time.perf_counter()
+        game.advance_frame(min(start - previous_time, game.MAX_FRAME_TIME))
+        previous_time = time.perf_counter()
+        samples.append((previous_time - start) * 1000)
+    return samples, answers
+
+
+def time_inline_commits(path, count=200):
+    """Mean milliseconds to insert and commit one attempt directly, as a game loop without the writer would"""
+    from attempt_store import AttemptStore, INSERT_ATTEMPT, connect
+    AttemptStore(path).close()
+    connection = connect(path)
+    start = time.perf_counter()
+    for _ in range(count):
+        with connection:
+            connection.execute(INSERT_ATTEMPT, (0, time.time(), "word", "word", 1, 1.0, 0, 1))
+    elapsed = time.perf_counter() - start
+    connection.close()
+    return elapsed / count * 1000
+
+
+def summarize(samples):
+    return {
+        'frames': len(samples),
+        'mean_ms': sum(samples) / len(samples),
+        'p50_ms': percentile(samples, 0.50),
+        'p99_ms': percentile(samples, 0.99),
+        'max_ms': max(samples),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--frames', type=int, default=600, help="frames per round")
+    parser.add_argument('--rounds', type=int, default=4, help="alternating off/on rounds")
+    parser.add_argument('--json', action='store_true', help="print results as JSON")
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix='bench_history_')
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    os.environ['SPELLING_BEE_CACHE_DIR'] = data_dir
+    os.environ['SPELLING_BEE_DATA_DIR'] = data_dir
+
+    import stub_tts
+    stub_tts.install()
+    import pygame
+    pygame.init()
+    from game import SpellingBeeGame
+
+    game = SpellingBeeGame()
+    store = game.attempt_store
+    game.engine.start()
+    game.apply_effects()
+    rapid_fire(game, pygame, 60)  # Warm up caches
+
+    samples = {'off': [], 'on': []}
+    answers = {'off': 0, 'on': 0}
+    answer_index = 0
+    start_rows = store.queued
+    for _ in range(args.rounds):
+        for mode in ('off', 'on'):
+            game.attempt_store = store if mode == 'on' else None
+            round_samples, total = rapid_fire(game, pygame, args.frames, answer_index)
+            samples[mode] += round_samples
+            answers[mode] += total - answer_index
+            answer_index = total
+
+    game.attempt_store = store
+    flush_start = time.perf_counter()
+    store.flush()
+    flush_ms = (time.perf_counter() - flush_start) * 1000
+    writer = store.get_stats()
+    store.close()
+    game.audio_controller.shutdown()
+
+    connection = sqlite3.connect(store.path)
+    stored = connection.execute("SELECT COUNT(*) FROM attempts").fetchone()[0]
+    connection.close()
+
+    off, on = summarize(samples['off']), summarize(samples['on'])
+    results = {
+        'history_off': off,
+        'history_on': on,
+        'p50_change_ms': on['p50_ms'] - off['p50_ms'],
+        'p99_change_ms': on['p99_ms'] - off['p99_ms'],
+        'answers_recorded': answers['on'],
+        'answers_per_second': answers['on'] / (sum(samples['on']) / 1000),
+        'rows_queued': writer['queued'] - start_rows,
+        'attempts_stored': stored,
+        'writer_batches': writer['batches'],
+        'writer_ms': writer['write_ms'],
+        'final_flush_ms': flush_ms,
+        'inline_commit_ms': time_inline_commits(os.path.join(data_dir, 'inline.sqlite3')),
+    }
+    shutil.rmtree(data_dir, ignore_errors=True)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{answers['on']} answers recorded at {results['answers_per_second']:.0f}/s "
+              f"({args.rounds} x {args.frames} frames per mode)")
+        for name, stats in (('history off', off), ('history on', on)):
+            print(f"  {name:<12} frame mean {stats['mean_ms']:6.3f} ms  p50 {stats['p50_ms']:6.3f}  "
+                  f"p99 {stats['p99_ms']:6.3f}  max {stats['max_ms']:6.2f}")
+        print(f"  change       p50 {results['p50_change_ms']:+.3f} ms, p99 {results['p99_change_ms']:+.3f} ms")
+        print(f"  writer: {stored} attempts in {writer['batches']} batches, {writer['write_ms']:.1f} ms "
+              f"off the game loop; committing each answer inline would cost "
+              f"{results['inline_commit_ms']:.2f} ms per answer")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark - Times SpellingBeeGame.__init__ on a cold start (empty caches)
+and on a warm start (caches filled by the previous run)
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Runs in a fresh interpreter so imports and caches are measured as a real launch sees them
+CHILD_SCRIPT = """
+import json, os, sys, time
+sys.path.insert(0, {root!r})
+import pygame
+pygame.init()
+try:
+    pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
+except pygame.error:
+    pass
+from game import SpellingBeeGame
+start = time.perf_counter()
+game = SpellingBeeGame()
+init_seconds = time.perf_counter() - start
+game.audio_controller.shutdown()
+# A cold start builds the word index on a thread; let it finish (and print) before the result line
+index_built = game.word_index_thread is not None
+if index_built:
+    game.word_index_thread.join()
+print(json.dumps({{'init_ms': init_seconds * 1000,
+                  'background_from_cache': game.background.loaded_from_cache,
+                  'word_index_built': index_built}}))
+"""
+
+
+def run_once(cache_dir):
+    """Launch one game start in a subprocess and return its timing"""
+    env = dict(os.environ, SDL_VIDEODRIVER='dummy', SDL_AUDIODRIVER='dummy',
+               SPELLING_BEE_CACHE_DIR=cache_dir, SPELLING_BEE_DATA_DIR=cache_dir)
+    output = subprocess.run([sys.executable, '-c', CHILD_SCRIPT.format(root=ROOT)],
+                            env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--runs', type=int, default=5, help="cold/warm pairs to average")
+    parser.add_argument('--json', action='store_true', help="print results as JSON")
+    args = parser.parse_args()
+
+    cold, warm = [], []
+    for _ in range(args.runs):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cold.append(run_once(cache_dir)['init_ms'])
+            result = run_once(cache_dir)
+            if not result['background_from_cache']:
+                print("warning: warm start did not use the background cache", file=sys.stderr)
+            if result['word_index_built']:
+                print("warning: warm start rebuilt the word index", file=sys.stderr)
+            warm.append(result['init_ms'])
+
+    results = {
+        'cold_init_ms': sorted(cold)[len(cold) // 2],
+        'warm_init_ms': sorted(warm)[len(warm) // 2],
+    }
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"SpellingBeeGame.__init__ (median of {args.runs}): "
+              f"cold {results['cold_init_ms']:.1f} ms, warm {results['warm_init_ms']:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
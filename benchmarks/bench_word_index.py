@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Word Index Benchmark - Builds the trie index over a large synthetic word list and times opening
+it from disk, the per-keystroke prefix queries and the nearest-word search behind wrong-answer
+feedback, with a linear scan for comparison
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from word_index import WordIndex
+
+LETTERS = 'abcdefghijklmnopqrstuvwxyz'
+
+
+def synthetic_words(rng, count):
+    """Pronounceable-ish words of 4 to 14 letters sharing realistic prefixes"""
+    syllables = [a + b for a in 'bcdfghlmnprstv' for b in 'aeiou'] + ['tion', 'sion', 'ing', 'ness', 'ly']
+    words = set()
+    while len(words) < count:
+        word = ''.join(rng.choice(syllables) for _ in range(rng.randint(2, 6)))
+        if 4 <= len(word) <= 14:
+            words.add(word)
+    return sorted(words)
+
+
+def time_calls(function, arguments):
+    """(mean, p99) microseconds of function(argument) over the arguments"""
+    samples = []
+    for argument in arguments:
+        start = time.perf_counter()
+        function(argument)
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return sum(samples) / len(samples), samples[int(len(samples) * 0.99)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--words', type=int, default=200_000, help="words in the synthetic list")
+    parser.add_argument('--queries', type=int, default=2_000, help="prefix queries to time")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', action='store_true', help="print results as JSON")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    words = synthetic_words(rng, args.words)
+    prefixes = [word[:rng.randint(1, len(word))] for word in rng.choices(words, k=args.queries)]
+    typos = []
+    for word in rng.choices(words, k=max(1, args.queries // 10)):
+        index = rng.randrange(len(word))
+        typos.append(word[:index] + rng.choice(LETTERS) + word[index + 1:])
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'index.bin')
+        start = time.perf_counter()
+        WordIndex.save(path, words)
+        build_s = time.perf_counter() - start
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+
+        start = time.perf_counter()
+        index = WordIndex(path)
+        open_ms = (time.perf_counter() - start) * 1000
+
+        results = {'words': len(index), 'nodes': index.node_count, 'build_s': build_s,
+                   'file_mb': size_mb, 'open_ms': open_ms}
+        timings = {
+            'count_prefix': time_calls(index.count_prefix, prefixes),
+            'contains': time_calls(index.__contains__, prefixes),
+            'nearest': time_calls(index.nearest, typos),
+            'nearest_feedback': time_calls(lambda typed: index.nearest(typed, limit=3, max_nodes=5000), typos),
+            'scan_count_prefix': time_calls(lambda prefix: sum(word.startswith(prefix) for word in words),
+                                            prefixes[:20]),
+        }
+        for name, (mean, p99) in timings.items():
+            results[name] = {'mean_us': mean, 'p99_us': p99}
+        index.close()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{results['words']:,} words, {results['nodes']:,} nodes, {size_mb:.1f} MB "
+              f"(built in {build_s:.2f} s, opened in {open_ms:.2f} ms)")
+        for name in timings:
+            stats = results[name]
+            print(f"  {name:<18}{stats['mean_us']:10.1f} us mean  {stats['p99_us']:10.1f} us p99")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Word Selection Benchmark - Compares per-word cost of the shuffled-deck WordManager against
+the original list-scan selection on large generated levels, and times spaced-repetition
+turns with a whole level's worth of words under review
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from word_manager import WordManager, LEVEL_NAMES
+from spaced_repetition import LeitnerScheduler
+
+
+class LegacySelector:
+    """The original selection: rebuild the unused list on every call, reset all levels when one runs out"""
+
+    def __init__(self, word_lists):
+        self.word_lists = word_lists
+        self.used_words = set()
+
+    def select_word(self, level):
+        word_list = self.word_lists[LEVEL_NAMES[level - 1]]
+        available_words = [word for word in word_list if word not in self.used_words]
+        if not available_words:
+            self.used_words = set()
+            available_words = word_list
+        word = random.choice(available_words)
+        self.used_words.add(word)
+        return word
+
+
+def make_word_lists(words_per_level, seed):
+    """Random lowercase pseudo-words, distinct across all levels"""
+    rng = random.Random(seed)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    word_lists = {}
+    seen = set()
+    for level, name in enumerate(LEVEL_NAMES, start=1):
+        words = []
+        while len(words) < words_per_level:
+            word = ''.join(rng.choice(letters) for _ in range(rng.randint(3 + level, 6 + 2 * level)))
+            if word not in seen:
+                seen.add(word)
+                words.append(word)
+        word_lists[name] = words
+    return word_lists
+
+
+def time_draws(select, draws, level=3):
+    """Mean and worst microseconds per call of select(level)"""
+    worst = 0.0
+    start = time.perf_counter()
+    for _ in range(draws):
+        call_start = time.perf_counter()
+        select(level)
+        worst = max(worst, time.perf_counter() - call_start)
+    return (time.perf_counter() - start) / draws * 1e6, worst * 1e6
+
+
+def make_review_manager(word_lists, seed, level=3):
+    """WordManager whose review scheduler already holds every word of the level, spread over the boxes"""
+    rng = random.Random(seed)
+    scheduler = LeitnerScheduler()
+    for word in word_lists[LEVEL_NAMES[level - 1]]:
+        # A first miss enrolls the word; quick correct answers then move it up a box
+        # and the occasional miss sends it back
+        scheduler.record_attempt(word, False, rng.uniform(1.0, 12.0), level)
+        for _ in range(rng.randint(0, len(scheduler.intervals) - 2)):
+            scheduler.record_attempt(word, rng.random() < 0.8, rng.uniform(1.0, 12.0))
+    manager = WordManager(seed=seed, word_lists=word_lists, review_scheduler=scheduler)
+    return manager, rng
+
+
+def time_review_turns(manager, rng, turns, level=3):
+    """Mean and worst microseconds per turn of select_word plus record_attempt"""
+    def turn(level):
+        word = manager.select_word(level)
+        manager.record_attempt(word, rng.random() < 0.8, rng.uniform(1.0, 12.0))
+    return time_draws(turn, turns, level)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--words', type=int, default=100_000, help="words per level")
+    parser.add_argument('--draws', type=int, default=200_000, help="draws timed for the deck")
+    parser.add_argument('--legacy-draws', type=int, default=200,
+                        help="draws timed for the original implementation (each scans the whole level)")
+    parser.add_argument('--seed', type=int, default=1, help="seed for word generation and selection")
+    parser.add_argument('--json', action='store_true', help="print results as JSON")
+    args = parser.parse_args()
+
+    word_lists = make_word_lists(args.words, args.seed)
+
+    manager = WordManager(seed=args.seed, word_lists=word_lists)
+    start = time.perf_counter()
+    manager.select_word(3)  # First draw builds the level's deck
+    deck_build_ms = (time.perf_counter() - start) * 1000
+    deck_mean_us, deck_worst_us = time_draws(manager.select_word, args.draws)
+
+    start = time.perf_counter()
+    review_manager, review_rng = make_review_manager(word_lists, args.seed)
+    review_build_s = time.perf_counter() - start
+    review_mean_us, review_worst_us = time_review_turns(review_manager, review_rng, args.draws)
+
+    random.seed(args.seed)
+    legacy = LegacySelector(word_lists)
+    legacy_mean_us, legacy_worst_us = time_draws(legacy.select_word, args.legacy_draws)
+
+    results = {
+        'words_per_level': args.words,
+        'deck_build_ms': deck_build_ms,
+        'deck_mean_us': deck_mean_us,
+        'deck_worst_us': deck_worst_us,
+        'deck_cycles': manager.get_deck(3).cycles,
+        'review_records': len(review_manager.review_scheduler),
+        'review_build_s': review_build_s,
+        'review_turn_mean_us': review_mean_us,
+        'review_turn_worst_us': review_worst_us,
+        'legacy_mean_us': legacy_mean_us,
+        'legacy_worst_us': legacy_worst_us,
+        'speedup': legacy_mean_us / deck_mean_us,
+    }
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{args.words:,} words per level")
+        print(f"  shuffled deck:  {deck_mean_us:8.2f} us/word (worst {deck_worst_us:.0f} us, "
+              f"{args.draws:,} draws, deck built in {deck_build_ms:.1f} ms)")
+        print(f"  review turn:    {review_mean_us:8.2f} us/word (worst {review_worst_us:.0f} us, "
+              f"{len(review_manager.review_scheduler):,} words under review)")
+        print(f"  original scan:  {legacy_mean_us:8.2f} us/word (worst {legacy_worst_us:.0f} us, "
+              f"{args.legacy_draws:,} draws)")
+        print(f"  speedup:        {results['speedup']:8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Stub TTS - Stand-in for pyttsx3 so benchmarks exercise the speech path without a real voice
+"""
+
+import sys
+import time
+import types
+import wave
+
+
+class StubEngine:
+    """Implements the parts of the pyttsx3 engine API the game uses.
+
+    save_to_file() writes a short silent WAV so the pronunciation cache and
+    mixer playback run for real; speaking and rendering take a fixed,
+    configurable amount of time instead of depending on a speech synthesizer.
+    """
+
+    def __init__(self, speak_seconds=0.05, render_seconds=0.02, clip_seconds=0.3, sample_rate=22050):
+        self.speak_seconds = speak_seconds
+        self.render_seconds = render_seconds
+        self.clip_seconds = clip_seconds
+        self.sample_rate = sample_rate
+        self.properties = {'voice': 'stub', 'rate': 200, 'volume': 1.0}
+        self.callbacks = {}
+        self._pending = []
+
+    def setProperty(self, name, value):
+        self.properties[name] = value
+
+    def getProperty(self, name):
+        return self.properties[name]
+
+    def connect(self, topic, callback):
+        self.callbacks.setdefault(topic, []).append(callback)
+        return (topic, callback)
+
+    def say(self, text):
+        self._pending.append(('say', text, None))
+
+    def save_to_file(self, text, path):
+        self._pending.append(('save', text, path))
+
+    def runAndWait(self):
+        pending, self._pending = self._pending, []
+        for command, text, path in pending:
+            for callback in self.callbacks.get('started-word', ()):
+                callback(text, 0, len(text))
+            if command == 'save':
+                time.sleep(self.render_seconds)
+                self._write_silence(path)
+            else:
+                time.sleep(self.speak_seconds)
+
+    def stop(self):
+        self._pending = []
+
+    def _write_silence(self, path):
+        frames = int(self.clip_seconds * self.sample_rate)
+        with wave.open(path, 'wb') as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(self.sample_rate)
+            f.writeframes(b'\x00\x00' * frames)
+
+
+def install(**engine_options):
+    """Register a fake pyttsx3 module whose init() returns a StubEngine"""
+    module = types.ModuleType('pyttsx3')
+    module.init = lambda *args, **kwargs: StubEngine(**engine_options)
+    sys.modules['pyttsx3'] = module
+    return module
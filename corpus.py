@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Corpus - Packed, memory-mapped word lists per difficulty level, and the command that builds them
+
+File layout (little-endian):
+    8 bytes   magic b"SBCORPUS"
+    4 bytes   uint32 format version
+    4 bytes   uint32 length of the JSON header
+    ...       JSON header: levels as [name, first word, word count], offsets dtype and section positions
+    ...       offsets: word_count + 1 unsigned ints into the blob (8-byte aligned)
+    ...       blob: every word as UTF-8, back to back, grouped by level
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+
+import numpy as np
+
+import difficulty
+from words import WORD_LISTS
+from word_manager import LEVEL_NAMES, WordManager
+
+# Level for words whose difficulty is assigned automatically after building
+UNSORTED_LEVEL = "unsorted"
+
+MAGIC = b"SBCORPUS"
+FORMAT_VERSION = 1
+PREAMBLE = struct.Struct("<8sII")
+
+
+class CorpusLevel:
+    """Read-only sequence of one level's words, decoded from the blob on access.
+
+    indices are global word indices: a range for a level stored contiguously
+    in the file, or an integer array for levels assigned after building.
+    """
+
+    def __init__(self, corpus, name, indices):
+        self.corpus = corpus
+        self.name = name
+        self.indices = indices
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, index):
+        return self.corpus.get_word(int(self.indices[index]))
+
+    def __iter__(self):
+        for index in self.indices:
+            yield self.corpus.get_word(int(index))
+
+
+class Corpus:
+    """A built corpus file, memory-mapped so only the words actually used are read.
+
+    Behaves like the WORD_LISTS dict for WordManager: corpus["easy"] is a
+    CorpusLevel sequence.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, header_size = PREAMBLE.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a word corpus")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{path} has corpus format {version}, expected {FORMAT_VERSION}")
+        self.header = json.loads(self._map[PREAMBLE.size:PREAMBLE.size + header_size].decode('utf-8'))
+
+        self.word_count = self.header['word_count']
+        self.locale = self.header.get('locale')
+        self.offsets = np.frombuffer(self._map, dtype=np.dtype(self.header['offsets_dtype']),
+                                     count=self.word_count + 1, offset=self.header['offsets_start'])
+        self.blob_start = self.header['blob_start']
+        self.stored_levels = {name: range(first, first + count) for name, first, count in self.header['levels']}
+        self.levels = {name: CorpusLevel(self, name, indices) for name, indices in self.stored_levels.items()}
+
+    def get_blob(self):
+        """The packed UTF-8 words as a uint8 array (a view of the mapped file)"""
+        return np.frombuffer(self._map, dtype=np.uint8, count=int(self.offsets[-1]), offset=self.blob_start)
+
+    def set_levels(self, levels):
+        """Replace the playable levels with {name: array of global word indices}"""
+        self.levels = {name: CorpusLevel(self, name, indices) for name, indices in levels.items()}
+
+    def get_word(self, index):
+        """Decode the word at a global index"""
+        start = self.blob_start + int(self.offsets[index])
+        end = self.blob_start + int(self.offsets[index + 1])
+        return self._map[start:end].decode('utf-8')
+
+    def __getitem__(self, name):
+        return self.levels[name]
+
+    def __contains__(self, name):
+        return name in self.levels
+
+    def keys(self):
+        return self.levels.keys()
+
+    def items(self):
+        return self.levels.items()
+
+    def close(self):
+        """Release the memory map (the level sequences stop working)"""
+        self.offsets = None
+        self._map.close()
+
+
+def normalize_word(text):
+    """Lowercase and trim a word; returns "" for blank lines and comments"""
+    word = text.strip().lower()
+    if not word or word.startswith('#'):
+        return ""
+    return word
+
+
+def parse_level(value):
+    """Level name from a name, a 1-5 level number or "auto" (scored by difficulty.py)"""
+    value = value.strip().lower()
+    if value == 'auto':
+        return UNSORTED_LEVEL
+    if value.isdigit():
+        number = int(value)
+        if not 1 <= number <= len(LEVEL_NAMES):
+            raise ValueError(f"Level number out of range: {value}")
+        return LEVEL_NAMES[number - 1]
+    return value
+
+
+def read_entries(path, default_level=None, word_column='word', level_column='level'):
+    """Yield (word, level) pairs from a .csv file with a header row, or a text file of one word per line"""
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.endswith('.csv'):
+            for row in csv.DictReader(f):
+                word = normalize_word(row.get(word_column) or "")
+                level = row.get(level_column) or default_level
+                if word:
+                    if not level:
+                        raise ValueError(f"{path}: no level for {word!r} (add a {level_column} column or --level)")
+                    yield word, parse_level(level)
+        else:
+            if default_level is None:
+                raise ValueError(f"{path}: plain text input needs --level")
+            level = parse_level(default_level)
+            for line in f:
+                word = normalize_word(line)
+                if word:
+                    yield word, level
+
+
+class CorpusBuilder:
+    """Streams words into per-level spool files, then writes the packed corpus.
+
+    Only the offsets (a few bytes per word) and a 64-bit hash per word for
+    de-duplication are kept in memory; the word text goes straight to disk.
+    """
+
+    def __init__(self, locale=None):
+        self.locale = locale
+        self.spools = {}  # level -> (spool file, array of word end offsets)
+        self.seen = {}    # level -> set of word hashes
+        self.duplicates = 0
+
+    def add(self, word, level):
+        """Add a word to a level, skipping words the level already has"""
+        digest = int.from_bytes(hashlib.blake2b(word.encode('utf-8'), digest_size=8).digest(), 'little')
+        seen = self.seen.setdefault(level, set())
+        if digest in seen:
+            self.duplicates += 1
+            return
+        seen.add(digest)
+
+        spool = self.spools.get(level)
+        if spool is None:
+            spool = self.spools[level] = (tempfile.TemporaryFile(), array('Q'))
+        data = word.encode('utf-8')
+        spool[0].write(data)
+        ends = spool[1]
+        ends.append((ends[-1] if ends else 0) + len(data))
+
+    def add_word_lists(self, word_lists):
+        """Add every word of a {level: [words]} dict such as WORD_LISTS"""
+        for level, words in word_lists.items():
+            for word in words:
+                word = normalize_word(word)
+                if word:
+                    self.add(word, level)
+
+    def ordered_levels(self):
+        """Built-in level names first, in difficulty order, then any others alphabetically"""
+        known = [name for name in LEVEL_NAMES if name in self.spools]
+        return known + sorted(name for name in self.spools if name not in LEVEL_NAMES)
+
+    def write(self, path):
+        """Write the corpus file atomically; returns {level: word count}"""
+        levels = self.ordered_levels()
+        word_count = sum(len(self.spools[name][1]) for name in levels)
+        blob_size = sum(self.spools[name][1][-1] for name in levels if self.spools[name][1])
+        offsets_dtype = '<u4' if blob_size < 2 ** 32 else '<u8'
+
+        level_table, first = [], 0
+        for name in levels:
+            count = len(self.spools[name][1])
+            level_table.append([name, first, count])
+            first += count
+
+        # Section positions depend on the header length, so lay the header out until it is stable
+        header = {'word_count': word_count, 'locale': self.locale, 'levels': level_table,
+                  'offsets_dtype': offsets_dtype, 'offsets_start': 0, 'blob_start': 0}
+        offsets_bytes = (word_count + 1) * np.dtype(offsets_dtype).itemsize
+        while True:
+            header_bytes = json.dumps(header).encode('utf-8')
+            offsets_start = align(PREAMBLE.size + len(header_bytes), 8)
+            blob_start = offsets_start + offsets_bytes
+            if header['offsets_start'] == offsets_start and header['blob_start'] == blob_start:
+                break
+            header['offsets_start'], header['blob_start'] = offsets_start, blob_start
+
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'wb') as out:
+            out.write(PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header_bytes)))
+            out.write(header_bytes)
+            out.write(b'\0' * (offsets_start - PREAMBLE.size - len(header_bytes)))
+
+            # Global offsets: each level's end offsets shifted by the bytes of the levels before it
+            out.write(np.zeros(1, dtype=offsets_dtype).tobytes())
+            base = 0
+            for name in levels:
+                ends = np.frombuffer(self.spools[name][1], dtype=np.uint64)
+                out.write((ends + np.uint64(base)).astype(offsets_dtype).tobytes())
+                if len(ends):
+                    base += int(ends[-1])
+
+            for name in levels:
+                spool = self.spools[name][0]
+                spool.seek(0)
+                shutil.copyfileobj(spool, out, 1024 * 1024)
+        os.replace(temp_path, path)
+        return {name: count for name, _, count in level_table}
+
+    def close(self):
+        """Delete the spool files"""
+        for spool, _ in self.spools.values():
+            spool.close()
+        self.spools.clear()
+
+
+def align(value, boundary):
+    """Round value up to a multiple of boundary"""
+    return (value + boundary - 1) // boundary * boundary
+
+
+def load_word_lists(path=None):
+    """The word lists to play with: a corpus file when path is given, else the built-in WORD_LISTS"""
+    if path is None:
+        return WORD_LISTS
+    corpus = Corpus(path)
+    if UNSORTED_LEVEL in corpus.stored_levels:
+        # Scores come from the sidecar cache; they are computed here only if it is missing or stale
+        difficulty.apply_difficulty(corpus)
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or inspect a packed word corpus")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help="build a corpus from text or CSV word lists")
+    build.add_argument('output', help="corpus file to write")
+    build.add_argument('inputs', nargs='*',
+                       help="word lists: .csv with word and level columns, or text with one word per line")
+    build.add_argument('--level', help="level (name, 1-5, or 'auto' to score difficulty automatically) "
+                                       "for text inputs and CSV rows without one")
+    build.add_argument('--locale', help="locale recorded in the corpus, e.g. en_US")
+    build.add_argument('--include-builtin', action='store_true', help="also include the built-in word lists")
+    build.add_argument('--word-column', default='word', help="CSV column holding the word")
+    build.add_argument('--level-column', default='level', help="CSV column holding the level")
+
+    info = commands.add_parser('info', help="show the levels in a corpus")
+    info.add_argument('path')
+
+    args = parser.parse_args()
+
+    if args.command == 'info':
+        corpus = Corpus(args.path)
+        print(f"{args.path}: {corpus.word_count} words, locale {corpus.locale or 'unspecified'}")
+        for name, level in corpus.items():
+            sample = ', '.join(level[i] for i in range(min(5, len(level))))
+            print(f"  {name:<14}{len(level):>10}  {sample}")
+        return
+
+    if not args.inputs and not args.include_builtin:
+        parser.error("no inputs (give word list files and/or --include-builtin)")
+    builder = CorpusBuilder(locale=args.locale)
+    try:
+        if args.include_builtin:
+            builder.add_word_lists(WORD_LISTS)
+        for path in args.inputs:
+            for word, level in read_entries(path, args.level, args.word_column, args.level_column):
+                builder.add(word, level)
+        counts = builder.write(args.output)
+    except (OSError, ValueError) as e:
+        print(f"Could not build corpus: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        builder.close()
+
+    print(f"Wrote {args.output}: {sum(counts.values())} words ({builder.duplicates} duplicates skipped)")
+    for name, count in counts.items():
+        print(f"  {name:<14}{count:>10}")
+
+    if UNSORTED_LEVEL in counts:
+        # Score now so the game never has to at startup
+        corpus = Corpus(args.output)
+        difficulty.apply_difficulty(corpus)
+        print("Assigned levels for auto words:")
+        for name in LEVEL_NAMES:
+            print(f"  {name:<14}{len(corpus[name]) if name in corpus else 'built-in':>10}")
+
+    # Build the word index now too, so the first game with this corpus opens it from the cache
+    from word_index import load_word_index
+    load_word_index(WordManager(word_lists=load_word_lists(args.output)))
+
+
+if __name__ == "__main__":
+    main()
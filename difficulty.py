@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Difficulty - Vectorized spelling-difficulty scores for a whole corpus, bucketed into the five
+game levels and cached in a sidecar file next to the corpus
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+from word_manager import LEVEL_NAMES
+
+# Bump when features, weights or the sidecar layout change, so stale caches are rebuilt
+SCORING_VERSION = 1
+SIDECAR_SUFFIX = '.difficulty.npz'
+
+# Words are scored over their first MAX_LETTERS bytes, CHUNK_WORDS words at a time
+MAX_LETTERS = 32
+CHUNK_WORDS = 65536
+
+# Letter codes: 0 padding, 1-26 a-z, 27 anything else (accents, apostrophes, hyphens)
+OTHER = 27
+CODES = 28
+VOWELS = 'aeiouy'
+
+# Letter pairs that usually hide a silent letter: at the start, anywhere, or at the end of a word
+SILENT_START = ('kn', 'gn', 'wr', 'ps', 'pn')
+SILENT_ANY = ('gh', 'bt', 'lk', 'lm', 'rh', 'sc')
+SILENT_END = ('mb', 'mn', 'gn')
+
+FEATURES = ('length', 'letter_rarity', 'bigram_rarity', 'silent_letters', 'double_letters', 'syllables')
+# Weight of each feature (z-scored over the corpus) in the combined score
+WEIGHTS = np.array([1.0, 0.6, 0.8, 0.7, 0.3, 0.8], dtype=np.float32)
+
+
+def build_code_table():
+    """Byte value -> letter code lookup"""
+    table = np.full(256, OTHER, dtype=np.uint8)
+    for index, letter in enumerate('abcdefghijklmnopqrstuvwxyz', start=1):
+        table[ord(letter)] = index
+        table[ord(letter.upper())] = index
+    return table
+
+
+CODE_TABLE = build_code_table()
+
+
+def letter_code(letter):
+    return int(CODE_TABLE[ord(letter)])
+
+
+def iter_chunks(corpus):
+    """Yield (first word index, N x MAX_LETTERS letter-code matrix, byte lengths) over the corpus"""
+    blob = corpus.get_blob()
+    offsets = corpus.offsets.astype(np.int64)
+    columns = np.arange(MAX_LETTERS, dtype=np.int64)
+    for first in range(0, corpus.word_count, CHUNK_WORDS):
+        end = min(first + CHUNK_WORDS, corpus.word_count)
+        starts = offsets[first:end]
+        lengths = offsets[first + 1:end + 1] - starts
+        positions = starts[:, None] + columns
+        inside = columns < lengths[:, None]
+        codes = np.where(inside, CODE_TABLE[blob[np.minimum(positions, len(blob) - 1)]], 0).astype(np.uint8)
+        yield first, codes, lengths
+
+
+def count_frequencies(corpus):
+    """Letter and letter-pair counts over the whole corpus"""
+    letters = np.zeros(CODES, dtype=np.int64)
+    bigrams = np.zeros(CODES * CODES, dtype=np.int64)
+    for _, codes, _ in iter_chunks(corpus):
+        letters += np.bincount(codes.ravel(), minlength=CODES)
+        pairs = codes[:, :-1].astype(np.int32) * CODES + codes[:, 1:]
+        valid = (codes[:, :-1] > 0) & (codes[:, 1:] > 0)
+        bigrams += np.bincount(pairs[valid], minlength=CODES * CODES)
+    letters[0] = 0
+    return letters, bigrams
+
+
+def surprisal(counts):
+    """-log2 of add-one smoothed frequencies"""
+    counts = counts.astype(np.float64) + 1.0
+    return (-np.log2(counts / counts.sum())).astype(np.float32)
+
+
+def pattern_hits(codes, lengths, pairs, anchor):
+    """Per word, how many of the letter pairs occur at the given anchor ('start', 'any' or 'end')"""
+    hits = np.zeros(len(codes), dtype=np.int32)
+    rows = np.arange(len(codes))
+    last = np.clip(lengths, 2, MAX_LETTERS) - 1
+    for pair in pairs:
+        a, b = letter_code(pair[0]), letter_code(pair[1])
+        if anchor == 'start':
+            hits += (codes[:, 0] == a) & (codes[:, 1] == b)
+        elif anchor == 'end':
+            hits += (codes[rows, last - 1] == a) & (codes[rows, last] == b)
+        else:
+            hits += ((codes[:, :-1] == a) & (codes[:, 1:] == b)).sum(axis=1)
+    return hits
+
+
+def chunk_features(codes, lengths, letter_cost, bigram_cost):
+    """Raw feature matrix (words x FEATURES) for one chunk"""
+    letters = codes > 0
+    letter_count = np.maximum(letters.sum(axis=1), 1)
+
+    letter_rarity = letter_cost[codes].sum(axis=1, where=letters) / letter_count
+
+    pairs = codes[:, :-1].astype(np.int32) * CODES + codes[:, 1:]
+    pair_valid = letters[:, :-1] & letters[:, 1:]
+    pair_count = np.maximum(pair_valid.sum(axis=1), 1)
+    bigram_rarity = bigram_cost[pairs].sum(axis=1, where=pair_valid) / pair_count
+
+    silent = (pattern_hits(codes, lengths, SILENT_START, 'start') +
+              pattern_hits(codes, lengths, SILENT_ANY, 'any') +
+              pattern_hits(codes, lengths, SILENT_END, 'end'))
+
+    double = ((codes[:, 1:] == codes[:, :-1]) & letters[:, 1:]).sum(axis=1)
+
+    # Syllables: runs of vowels, not counting a final silent "e" (but keeping "-le")
+    vowel_codes = np.zeros(CODES, dtype=bool)
+    vowel_codes[[letter_code(v) for v in VOWELS]] = True
+    is_vowel = vowel_codes[codes]
+    runs = is_vowel[:, 0].astype(np.int32) + (is_vowel[:, 1:] & ~is_vowel[:, :-1]).sum(axis=1)
+    rows = np.arange(len(codes))
+    last = np.clip(lengths, 1, MAX_LETTERS) - 1
+    final_e = (codes[rows, last] == letter_code('e')) & (codes[rows, np.maximum(last - 1, 0)] != letter_code('l'))
+    syllables = np.maximum(runs - (final_e & (runs > 1)), 1)
+
+    return np.column_stack([lengths, letter_rarity, bigram_rarity, silent, double, syllables]).astype(np.float32)
+
+
+def score_corpus(corpus):
+    """Feature matrix and combined difficulty score for every word in the corpus"""
+    letters, bigrams = count_frequencies(corpus)
+    letter_cost = surprisal(letters)
+    bigram_cost = surprisal(bigrams)
+
+    features = np.empty((corpus.word_count, len(FEATURES)), dtype=np.float32)
+    for first, codes, lengths in iter_chunks(corpus):
+        features[first:first + len(codes)] = chunk_features(codes, lengths, letter_cost, bigram_cost)
+
+    mean = features.mean(axis=0)
+    std = features.std(axis=0)
+    std[std == 0] = 1.0
+    scores = ((features - mean) / std) @ WEIGHTS
+    return features, scores.astype(np.float32)
+
+
+def assign_levels(scores, count=len(LEVEL_NAMES)):
+    """Level index (0 = easiest) per word, splitting the scores into equal-sized quantile bands"""
+    thresholds = np.quantile(scores, np.linspace(0, 1, count + 1)[1:-1]) if len(scores) else []
+    return np.searchsorted(thresholds, scores, side='right').astype(np.uint8)
+
+
+def get_sidecar_path(corpus_path):
+    return corpus_path + SIDECAR_SUFFIX
+
+
+def get_fingerprint(corpus_path):
+    """Identifies the corpus file the sidecar was computed from"""
+    stat = os.stat(corpus_path)
+    return np.array([SCORING_VERSION, stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+
+
+def load_sidecar(corpus_path):
+    """Cached (scores, level ids), or None when missing or computed for a different corpus file"""
+    path = get_sidecar_path(corpus_path)
+    try:
+        with np.load(path) as data:
+            if not np.array_equal(data['fingerprint'], get_fingerprint(corpus_path)):
+                return None
+            return data['scores'], data['levels']
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def save_sidecar(corpus_path, scores, levels):
+    """Write the scores next to the corpus (atomically)"""
+    path = get_sidecar_path(corpus_path)
+    temp_path = f"{path}.tmp.npz"
+    np.savez(temp_path, fingerprint=get_fingerprint(corpus_path), scores=scores, levels=levels)
+    os.replace(temp_path, path)
+
+
+def get_difficulty(corpus, use_cache=True):
+    """(scores, level ids) for every word, from the sidecar when it is current"""
+    if use_cache:
+        cached = load_sidecar(corpus.path)
+        if cached is not None:
+            return cached
+
+    start = time.perf_counter()
+    _, scores = score_corpus(corpus)
+    levels = assign_levels(scores)
+    print(f"Scored difficulty of {corpus.word_count} words in {time.perf_counter() - start:.2f}s")
+    if use_cache:
+        try:
+            save_sidecar(corpus.path, scores, levels)
+        except OSError as e:
+            print(f"Could not save difficulty cache: {e}")
+    return scores, levels
+
+
+def apply_difficulty(corpus, use_cache=True):
+    """Add the corpus's "unsorted" words to the five game levels by their difficulty score.
+
+    Words stored under a game level keep it; only unsorted words are moved.
+    Scores are computed over the whole corpus so letter statistics use every word.
+    Levels left without words are omitted, so they fall back to the built-in lists.
+    """
+    from corpus import UNSORTED_LEVEL
+    unsorted = corpus.stored_levels.get(UNSORTED_LEVEL)
+    if unsorted is None:
+        return
+    _, level_ids = get_difficulty(corpus, use_cache)
+
+    unsorted_ids = level_ids[unsorted.start:unsorted.stop]
+    levels = {}
+    for level, name in enumerate(LEVEL_NAMES):
+        stored = corpus.stored_levels.get(name, range(0))
+        scored = np.flatnonzero(unsorted_ids == level).astype(np.int64) + unsorted.start
+        indices = np.concatenate([np.arange(stored.start, stored.stop, dtype=np.int64), scored])
+        if len(indices):
+            levels[name] = indices
+    for name, indices in corpus.stored_levels.items():
+        if name not in levels and name not in LEVEL_NAMES and name != UNSORTED_LEVEL:
+            levels[name] = indices
+    corpus.set_levels(levels)
+
+
+def main():
+    from corpus import Corpus
+    parser = argparse.ArgumentParser(description="Score the spelling difficulty of every word in a corpus")
+    parser.add_argument('corpus', help="corpus file built with corpus.py")
+    parser.add_argument('--force', action='store_true', help="rescore even if the sidecar cache is current")
+    parser.add_argument('--show', type=int, default=5, help="example words to print per level")
+    args = parser.parse_args()
+
+    try:
+        corpus = Corpus(args.corpus)
+    except (OSError, ValueError) as e:
+        print(f"Could not open corpus: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.force or load_sidecar(args.corpus) is None:
+        _, scores = score_corpus(corpus)
+        save_sidecar(args.corpus, scores, assign_levels(scores))
+    scores, level_ids = get_difficulty(corpus)
+
+    print(f"{corpus.word_count} words, difficulty cached in {get_sidecar_path(args.corpus)}")
+    for level, name in enumerate(LEVEL_NAMES):
+        indices = np.flatnonzero(level_ids == level)
+        order = indices[np.argsort(scores[indices])]
+        examples = [corpus.get_word(int(i)) for i in order[::max(1, len(order) // args.show)][:args.show]]
+        print(f"  {name:<14}{len(indices):>10}  {', '.join(examples)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,360 @@
+"""
+Game Engine - Spelling Bee rules as a pygame-free state machine driven by an injectable clock
+"""
+
+from error_analysis import ErrorAnalyzer, PATTERN_HINTS, describe_edits
+from scheduler import Scheduler
+
+# Effects the engine asks its host to carry out, as (kind, payload) tuples
+EFFECT_PRONOUNCE = "pronounce"  # payload: word to speak
+EFFECT_PREFETCH = "prefetch"    # payload: list of upcoming words to prepare
+EFFECT_SOUND = "sound"          # payload: "correct", "incorrect" or "death"
+EFFECT_SESSION_START = "session_start"  # payload: None
+EFFECT_SESSION_END = "session_end"      # payload: get_session_stats() when the game ends
+EFFECT_ATTEMPT = "attempt"      # payload: (word, input, correct, response seconds, hint used, level)
+
+# Kinds of feedback message; the host decides how each one looks
+FEEDBACK_EXCELLENT = "excellent"
+FEEDBACK_CORRECT = "correct"
+FEEDBACK_WRONG = "wrong"
+FEEDBACK_TIMEOUT = "timeout"
+
+# How the typed text compares with the current word, for feedback while typing
+INPUT_EMPTY = "empty"
+INPUT_ON_TRACK = "on_track"      # Every letter so far is right
+INPUT_OTHER_WORD = "other_word"  # Off the word, but some indexed word starts this way
+INPUT_OFF_TRACK = "off_track"    # Off the word, and no indexed word starts this way (or no index)
+
+
+class ManualClock:
+    """Millisecond clock that only moves when advanced, for simulated sessions"""
+
+    def __init__(self, start_ms=0):
+        self.now = start_ms
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, ms):
+        """Move time forward by ms milliseconds"""
+        self.now += ms
+
+
+class GameEngine:
+    """Scoring, lives, timers, hints and word progression for one player.
+
+    Inputs are plain method calls (start, type_text, backspace, submit,
+    request_hint, replay, restart) plus update(), which fires due
+    transitions and checks the word timer.  Times come from clock(), a
+    callable returning milliseconds; pass pygame.time.get_ticks for the
+    real game or a ManualClock to simulate a session as fast as it can run.
+    Anything outside the rules (audio, drawing) is queued as an effect
+    and collected by the host with drain_effects().
+    """
+
+    def __init__(self, word_manager, clock, time_limit=30, starting_lives=3, max_input_length=20,
+                 error_analyzer=None, word_index=None):
+        self.word_manager = word_manager
+        self.clock = clock
+        # Classifies wrong answers for feedback and remembers which spelling patterns and
+        # letters trip the player up; words with the weak letters are dealt more often
+        self.error_analyzer = error_analyzer if error_analyzer is not None else ErrorAnalyzer()
+        self.update_practice_letters()
+        # Optional word_index.WordIndex over the playable words, for prefix feedback, hints and naming the word a wrong answer spells
+        self.word_index = word_index
+        self.scheduler = Scheduler(clock)
+        self.effects = []
+
+        # Rules
+        self.time_limit = time_limit  # Seconds per word
+        self.starting_lives = starting_lives
+        self.max_input_length = max_input_length
+        self.HINT_PENALTY = 5
+        self.CORRECT_POINTS = 10
+        self.QUICK_BONUS = 5
+        self.QUICK_ANSWER_SECONDS = 5
+        self.MAX_HINT_SHARE = 0.5  # Repeated hints reveal at most this share of the word
+        self.FEEDBACK_NEAREST_NODES = 5000  # Trie nodes searched for words near a wrong answer
+        self.FEEDBACK_DURATION_MS = 3000
+        self.NEXT_WORD_DELAY_CORRECT_MS = 1500
+        self.NEXT_WORD_DELAY_WRONG_MS = 2000
+
+        self.state = "menu"  # menu, playing, game_over
+
+        # Current word
+        self.score = 0
+        self.lives = starting_lives
+        self.current_word = ""
+        self.user_input = ""
+        self.word_revealed = False
+        self.word_start_time = 0
+        self.time_remaining = time_limit
+        self.hint_used = False
+        self.hints_given = 0
+        self.hint_letters = 0  # Letters of the word the hints have revealed
+        self.hint_text = ""
+        self.input_status = (0, INPUT_EMPTY)  # (letters matching the word, INPUT_* kind)
+        self.feedback_message = ""
+        self.feedback_kind = None
+
+        # Statistics tracking
+        self.words_attempted = 0
+        self.words_correct = 0
+        self.total_response_time = 0
+        self.session_start_time = clock()
+
+    def drain_effects(self):
+        """Return the effects queued since the last call and clear them"""
+        effects, self.effects = self.effects, []
+        return effects
+
+    def emit(self, kind, payload=None):
+        """Queue an effect for the host"""
+        self.effects.append((kind, payload))
+
+    # Inputs
+
+    def start(self):
+        """Leave the menu and start playing"""
+        if self.state == "menu":
+            self.state = "playing"
+            self.emit(EFFECT_SESSION_START)
+
+    def type_text(self, text):
+        """Append typed characters to the answer"""
+        if self.state != "playing":
+            return
+        for char in text:
+            if char.isprintable() and len(self.user_input) < self.max_input_length:
+                self.user_input += char.lower()
+        self.update_input_status()
+
+    def backspace(self):
+        """Delete the last typed character"""
+        if self.state == "playing":
+            self.user_input = self.user_input[:-1]
+            self.update_input_status()
+
+    def replay(self):
+        """Speak the current word again"""
+        if self.state == "playing":
+            self.emit(EFFECT_PRONOUNCE, self.current_word)
+
+    def request_hint(self):
+        """Reveal more of the word with each request, for a score penalty each time.
+
+        The first hint shows the first letter and length, plus any pattern or
+        letter in the word the player often misses; later ones reveal one letter past
+        what is already shown or correctly typed, up to MAX_HINT_SHARE of it.
+        """
+        if self.state != "playing" or self.word_revealed:
+            return
+        word = self.current_word
+        if not self.hints_given:
+            shown = 1
+            text = f"Hint: {word[0].upper()}{'_' * (len(word) - 1)} ({len(word)} letters)"
+            weak_pattern = self.error_analyzer.get_weak_pattern(word)
+            weak_letter = self.error_analyzer.get_weak_letter(word.lower())
+            if weak_pattern is not None:
+                text += f" - watch the {PATTERN_HINTS[weak_pattern]}"
+            elif weak_letter is not None:
+                letter, typed_instead = weak_letter
+                text += f" - watch the '{letter}'"
+                if typed_instead is not None:
+                    text += f", often typed as '{typed_instead}'"
+        else:
+            most = max(1, int(len(word) * self.MAX_HINT_SHARE))
+            shown = min(max(self.hint_letters, self.input_status[0]) + 1, most)
+            if shown <= self.hint_letters:
+                return
+            text = f"Hint: {word[:shown].upper()}{'_' * (len(word) - shown)} ({len(word)} letters"
+            if self.word_index is not None:
+                others = self.word_index.count_prefix(word[:shown].lower()) - (word.lower() in self.word_index)
+                text += f", {others} other words start this way" if others > 0 else ", no other word starts this way"
+            text += ")"
+        self.hint_text = text
+        self.hint_letters = shown
+        self.hints_given += 1
+        self.hint_used = True
+        self.score = max(0, self.score - self.HINT_PENALTY)
+
+    def submit(self):
+        """Check the typed answer against the current word"""
+        if self.state != "playing" or self.word_revealed:
+            return
+        response_time = (self.clock() - self.word_start_time) / 1000.0
+        self.words_attempted += 1
+        answer = self.user_input.lower().strip()
+        correct = answer == self.current_word.lower()
+        edits = self.error_analyzer.analyze(self.current_word.lower(), answer)
+        if edits:
+            self.update_practice_letters()
+        self.record_attempt(correct, response_time)
+
+        if correct:
+            self.words_correct += 1
+            self.total_response_time += response_time
+            points = self.CORRECT_POINTS * self.word_manager.get_difficulty_multiplier(self.score)
+
+            # Bonus for fast answers
+            if response_time < self.QUICK_ANSWER_SECONDS:
+                points += self.QUICK_BONUS
+                self.show_feedback("Excellent! Quick and correct!", FEEDBACK_EXCELLENT)
+            else:
+                self.show_feedback("Correct!", FEEDBACK_CORRECT)
+
+            self.score += points
+
+            # The new score may cross a level threshold; re-queue and prefetch
+            # during the feedback delay so the next word is ready to play
+            self.prefetch_upcoming_words()
+            self.emit(EFFECT_SOUND, "correct")
+            self.word_revealed = True
+            self.schedule_next_word(self.NEXT_WORD_DELAY_CORRECT_MS)
+        else:
+            mistakes = describe_edits(edits)
+            message = f"Wrong! The word was: {self.current_word}"
+            self.show_feedback(f"{message} ({mistakes})" if mistakes else message, FEEDBACK_WRONG)
+            # The hint line is free once the word is revealed; use it to name the word typed instead
+            confusion = self.describe_confusion(answer, len(edits))
+            if confusion:
+                self.hint_text = confusion
+            self.lose_life()
+
+    def restart(self):
+        """Start a new game from the game over screen"""
+        self.score = 0
+        self.lives = self.starting_lives
+        self.state = "playing"
+        self.word_manager.reset()
+
+        # Reset statistics
+        self.words_attempted = 0
+        self.words_correct = 0
+        self.total_response_time = 0
+        self.session_start_time = self.clock()
+
+        self.emit(EFFECT_SESSION_START)
+        self.next_word()
+
+    def update(self):
+        """Run due transitions and count down the current word's timer"""
+        self.scheduler.run_due()
+
+        if self.state == "playing" and not self.word_revealed:
+            elapsed_time = (self.clock() - self.word_start_time) / 1000.0
+            self.time_remaining = max(0, self.time_limit - elapsed_time)
+
+            if self.time_remaining <= 0:
+                self.record_attempt(False, self.time_limit)
+                self.show_feedback(f"Time's up! The word was: {self.current_word}", FEEDBACK_TIMEOUT)
+                self.lose_life()
+
+    # Transitions
+
+    def next_word(self):
+        """Move to the next word and ask for it to be spoken"""
+        self.scheduler.cancel("next_word")
+        self.current_word = self.word_manager.get_next_word(self.score)
+        self.user_input = ""
+        self.word_revealed = False
+        self.word_start_time = self.clock()
+        self.time_remaining = self.time_limit
+        self.hint_used = False
+        self.hints_given = 0
+        self.hint_letters = 0
+        self.hint_text = ""
+        self.input_status = (0, INPUT_EMPTY)
+
+        self.emit(EFFECT_PRONOUNCE, self.current_word)
+        self.prefetch_upcoming_words()
+
+    def record_attempt(self, correct, response_time):
+        """Report an answer to the word manager and the host"""
+        self.word_manager.record_attempt(self.current_word, correct, response_time)
+        self.emit(EFFECT_ATTEMPT, (self.current_word, self.user_input, correct, response_time,
+                                   self.hint_used, self.word_manager.difficulty_level))
+
+    def update_practice_letters(self):
+        """Have the word manager favor words with the letters the player gets wrong most"""
+        self.word_manager.practice_letters = frozenset(self.error_analyzer.get_weak_letters())
+
+    def describe_confusion(self, answer, distance):
+        """Point out when a wrong answer, distance edits from the word, spells or comes closer to another word"""
+        if self.word_index is None or not answer:
+            return ""
+        if answer in self.word_index:
+            return f"'{answer}' is a different word"
+        if distance <= 1:
+            return ""
+        nearest = self.word_index.nearest(answer, max_distance=min(distance - 1, 2), limit=1,
+                                          max_nodes=self.FEEDBACK_NEAREST_NODES)
+        return f"Your answer is closer to '{nearest[0][1]}'" if nearest else ""
+
+    def update_input_status(self):
+        """Compare the typed text with the current word after each keystroke"""
+        typed, word = self.user_input, self.current_word.lower()
+        matched, limit = 0, min(len(typed), len(word))
+        while matched < limit and typed[matched] == word[matched]:
+            matched += 1
+        if not typed:
+            kind = INPUT_EMPTY
+        elif matched == len(typed):
+            kind = INPUT_ON_TRACK
+        elif self.word_index is not None and self.word_index.count_prefix(typed):
+            kind = INPUT_OTHER_WORD
+        else:
+            kind = INPUT_OFF_TRACK
+        self.input_status = (matched, kind)
+
+    def prefetch_upcoming_words(self):
+        """Re-queue upcoming words for the current score and ask for them to be prepared"""
+        self.word_manager.refresh_upcoming(self.score)
+        self.emit(EFFECT_PREFETCH, self.word_manager.peek_upcoming())
+
+    def lose_life(self):
+        """Reveal the word after a miss and end the game when no lives are left"""
+        self.lives -= 1
+        self.emit(EFFECT_SOUND, "incorrect")
+        self.word_revealed = True
+
+        if self.lives <= 0:
+            self.state = "game_over"
+            self.emit(EFFECT_SOUND, "death")
+            self.emit(EFFECT_SESSION_END, self.get_session_stats())
+        else:
+            self.schedule_next_word(self.NEXT_WORD_DELAY_WRONG_MS)
+
+    def show_feedback(self, message, kind):
+        """Show a feedback message until FEEDBACK_DURATION_MS passes"""
+        self.feedback_message = message
+        self.feedback_kind = kind
+        self.scheduler.schedule("clear_feedback", self.FEEDBACK_DURATION_MS, self.clear_feedback)
+
+    def clear_feedback(self):
+        """Remove the feedback message"""
+        self.feedback_message = ""
+        self.feedback_kind = None
+
+    def schedule_next_word(self, delay_ms):
+        """Move on to the next word after delay_ms, while still playing"""
+        self.scheduler.schedule("next_word", delay_ms, self.advance_to_next_word)
+
+    def advance_to_next_word(self):
+        """Scheduled transition to the next word"""
+        if self.state == "playing":
+            self.next_word()
+
+    # Queries
+
+    def time_until_next_transition(self):
+        """Milliseconds until the next scheduled transition, or None"""
+        return self.scheduler.time_until_next()
+
+    def get_session_stats(self):
+        """(score, attempted, correct, accuracy %, average response seconds, session seconds)"""
+        accuracy = (self.words_correct / max(1, self.words_attempted)) * 100
+        avg_response_time = self.total_response_time / self.words_correct if self.words_correct > 0 else 0
+        session_time = (self.clock() - self.session_start_time) / 1000.0
+        return (self.score, self.words_attempted, self.words_correct,
+                accuracy, avg_response_time, session_time)
@@ -0,0 +1,294 @@
+"""
+Error Analysis - Aligns a wrong answer against the word to classify each mistake, and keeps
+running letter-confusion and spelling-pattern statistics that feed feedback and hints
+"""
+
+import os
+
+import numpy as np
+
+from difficulty import SILENT_START, SILENT_ANY, SILENT_END
+
+ALPHABET = 'abcdefghijklmnopqrstuvwxyz'
+LETTER_INDEX = {letter: index for index, letter in enumerate(ALPHABET)}
+
+EDIT_KINDS = ('substitute', 'insert', 'delete', 'transpose')
+
+# Spelling patterns tracked per word, and how a hint refers to each
+PATTERNS = ('double', 'silent', 'tion', 'sion')
+PATTERN_HINTS = {
+    'double': "double letter",
+    'silent': "silent letter",
+    'tion': "-tion",
+    'sion': "-sion",
+}
+
+# A pattern is pointed out in hints once the player has missed it this often, at this rate
+WEAK_PATTERN_MIN_MISSES = 2
+WEAK_PATTERN_MIN_RATE = 0.25
+# A letter counts as weak once the player has got it wrong this often
+WEAK_LETTER_MIN_MISSES = 3
+# Half-width of the first band align() tries around the diagonal; most answers are within this many edits
+ALIGN_MIN_BAND = 4
+
+
+def osa_table(a, b, band):
+    """dist[i][j]: edits turning a[:i] into b[:j], filled only where |i - j| <= band"""
+    n, m = len(a), len(b)
+    outside = n + m + 1  # More than any real distance, so the traceback never follows it
+    dist = [[j if j <= band else outside for j in range(m + 1)]]
+    for i in range(1, n + 1):
+        row = [outside] * (m + 1)
+        if i <= band:
+            row[0] = i
+        above = dist[i - 1]
+        for j in range(max(1, i - band), min(m, i + band) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            best = min(above[j] + 1, row[j - 1] + 1, above[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1] and cost:
+                best = min(best, dist[i - 2][j - 2] + 1)
+            row[j] = best
+        dist.append(row)
+    return dist
+
+
+def align(target, typed):
+    """Edits turning target into typed, as (kind, target position, expected, typed) tuples.
+
+    Uses optimal string alignment (Levenshtein plus adjacent transpositions).
+    The common prefix and suffix are stripped first, so the DP only runs over
+    the few letters around the mistakes, and only near the diagonal of its
+    table unless the answer is far off.  An insert at position i means an
+    extra letter typed before target[i].
+    """
+    start = 0
+    shortest = min(len(target), len(typed))
+    while start < shortest and target[start] == typed[start]:
+        start += 1
+    target_end, typed_end = len(target), len(typed)
+    while target_end > start and typed_end > start and target[target_end - 1] == typed[typed_end - 1]:
+        target_end -= 1
+        typed_end -= 1
+    a = target[start:target_end]
+    b = typed[start:typed_end]
+    n, m = len(a), len(b)
+    if not n:
+        return [('insert', start, '', char) for char in b]
+    if not m:
+        return [('delete', start + i, char, '') for i, char in enumerate(a)]
+
+    # An alignment with d edits never strays more than d cells from the
+    # diagonal, so fill only a band around it, widening it until the distance
+    # fits inside; once it spans the whole table the result is exact anyway
+    band = max(abs(n - m), ALIGN_MIN_BAND)
+    while True:
+        dist = osa_table(a, b, band)
+        if dist[n][m] <= band or band >= max(n, m):
+            break
+        band *= 2
+
+    edits = []
+    i, j = n, m
+    while i or j:
+        here = dist[i][j]
+        if i and j and a[i - 1] == b[j - 1] and here == dist[i - 1][j - 1]:
+            i, j = i - 1, j - 1
+        elif (i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]
+              and here == dist[i - 2][j - 2] + 1):
+            edits.append(('transpose', start + i - 2, a[i - 2:i], b[j - 2:j]))
+            i, j = i - 2, j - 2
+        elif i and j and here == dist[i - 1][j - 1] + 1:
+            edits.append(('substitute', start + i - 1, a[i - 1], b[j - 1]))
+            i, j = i - 1, j - 1
+        elif i and here == dist[i - 1][j] + 1:
+            edits.append(('delete', start + i - 1, a[i - 1], ''))
+            i -= 1
+        else:
+            edits.append(('insert', start + i, '', b[j - 1]))
+            j -= 1
+    edits.reverse()
+    return edits
+
+
+def find_patterns(word):
+    """(pattern, start, end) spans of the tracked spelling patterns in a word"""
+    spans = []
+    for i in range(len(word) - 1):
+        pair = word[i:i + 2]
+        if pair[0] == pair[1] and pair[0] in LETTER_INDEX:
+            spans.append(('double', i, i + 2))
+        if (pair in SILENT_ANY or (i == 0 and pair in SILENT_START)
+                or (i == len(word) - 2 and pair in SILENT_END)):
+            spans.append(('silent', i, i + 2))
+        if word.startswith('tion', i) or word.startswith('sion', i):
+            spans.append((word[i:i + 4], i, i + 4))
+    return spans
+
+
+def edit_touches(edit, start, end):
+    """Whether an edit changes any letter of target[start:end]"""
+    kind, position = edit[0], edit[1]
+    if kind == 'insert':
+        return start < position < end
+    width = 2 if kind == 'transpose' else 1
+    return position < end and position + width > start
+
+
+def describe_edits(edits):
+    """A few words on what went wrong, or "" when there are too many mistakes to list"""
+    if not edits or len(edits) > 2:
+        return ""
+    parts = []
+    for kind, _, expected, typed in edits:
+        if kind == 'transpose':
+            parts.append(f"'{expected}' swapped")
+        elif kind == 'delete':
+            parts.append(f"missed '{expected}'")
+        elif kind == 'insert':
+            parts.append(f"extra '{typed}'")
+        else:
+            parts.append(f"'{typed}' for '{expected}'")
+    return ", ".join(parts)
+
+
+class ErrorAnalyzer:
+    """Running statistics of the player's spelling mistakes.
+
+    analyze() is called for every answer: correct answers only count the
+    patterns seen; wrong ones are aligned and their edits added to the
+    26x26 confusion matrix (expected letter x typed letter), the missed
+    and extra letter counts, and the per-pattern miss counters.
+    """
+
+    def __init__(self):
+        self.confusion = np.zeros((26, 26), dtype=np.int64)
+        self.missed_letters = np.zeros(26, dtype=np.int64)
+        self.extra_letters = np.zeros(26, dtype=np.int64)
+        self.edit_counts = dict.fromkeys(EDIT_KINDS, 0)
+        self.pattern_seen = dict.fromkeys(PATTERNS, 0)
+        self.pattern_missed = dict.fromkeys(PATTERNS, 0)
+        self.added_doubles = 0  # A letter doubled that should not be
+        self.answers = 0
+        self.wrong_answers = 0
+        self.pattern_cache = {}
+
+    def get_patterns(self, word):
+        spans = self.pattern_cache.get(word)
+        if spans is None:
+            if len(self.pattern_cache) > 10000:
+                self.pattern_cache.clear()
+            spans = self.pattern_cache[word] = find_patterns(word)
+        return spans
+
+    def analyze(self, target, typed):
+        """Add one answer to the statistics; returns its edits (empty when correct)"""
+        self.answers += 1
+        spans = self.get_patterns(target)
+        for name, _, _ in spans:
+            self.pattern_seen[name] += 1
+        if typed == target:
+            return []
+
+        self.wrong_answers += 1
+        edits = align(target, typed)
+        for edit in edits:
+            kind, position, expected, actual = edit
+            self.edit_counts[kind] += 1
+            if kind == 'substitute':
+                row, column = LETTER_INDEX.get(expected), LETTER_INDEX.get(actual)
+                if row is not None and column is not None:
+                    self.confusion[row, column] += 1
+            elif kind == 'delete':
+                if expected in LETTER_INDEX:
+                    self.missed_letters[LETTER_INDEX[expected]] += 1
+            elif kind == 'insert':
+                if actual in LETTER_INDEX:
+                    self.extra_letters[LETTER_INDEX[actual]] += 1
+                neighbours = target[max(position - 1, 0):position + 1]
+                if actual in neighbours and not any(name == 'double' and start <= position <= end
+                                                    for name, start, end in spans):
+                    self.added_doubles += 1
+
+        for name, start, end in spans:
+            if any(edit_touches(edit, start, end) for edit in edits):
+                self.pattern_missed[name] += 1
+        return edits
+
+    def get_miss_rate(self, pattern):
+        """Share of a pattern's appearances the player got wrong"""
+        seen = self.pattern_seen[pattern]
+        return self.pattern_missed[pattern] / seen if seen else 0.0
+
+    def get_weak_pattern(self, word):
+        """The pattern in word the player misses most, if they miss it often enough to mention"""
+        weakest, weakest_rate = None, WEAK_PATTERN_MIN_RATE
+        for name, _, _ in self.get_patterns(word):
+            rate = self.get_miss_rate(name)
+            if self.pattern_missed[name] >= WEAK_PATTERN_MIN_MISSES and rate >= weakest_rate:
+                weakest, weakest_rate = name, rate
+        return weakest
+
+    def get_letter_mistakes(self):
+        """Times each letter was missed, typed in excess or typed as another letter"""
+        return self.missed_letters + self.extra_letters + self.confusion.sum(axis=1)
+
+    def get_weak_letters(self, count=3):
+        """Up to count letters the player gets wrong most, each at least WEAK_LETTER_MIN_MISSES times"""
+        mistakes = self.get_letter_mistakes()
+        order = np.argsort(-mistakes, kind='stable')[:count]
+        return [ALPHABET[i] for i in order if mistakes[i] >= WEAK_LETTER_MIN_MISSES]
+
+    def get_weak_letter(self, word):
+        """(letter, letter usually typed instead or None) for the weak letter of word the player gets wrong most"""
+        mistakes = self.get_letter_mistakes()
+        weakest, weakest_count = None, WEAK_LETTER_MIN_MISSES - 1
+        for letter in set(word):
+            index = LETTER_INDEX.get(letter)
+            if index is not None and mistakes[index] > weakest_count:
+                weakest, weakest_count = index, mistakes[index]
+        if weakest is None:
+            return None
+        typed = int(np.argmax(self.confusion[weakest]))
+        if self.confusion[weakest, typed] < WEAK_LETTER_MIN_MISSES:
+            return ALPHABET[weakest], None
+        return ALPHABET[weakest], ALPHABET[typed]
+
+    def get_top_confusions(self, count=5):
+        """Most frequent (expected letter, typed letter, times) substitutions"""
+        flat = self.confusion.ravel()
+        order = np.argsort(-flat, kind='stable')[:count]
+        return [(ALPHABET[i // 26], ALPHABET[i % 26], int(flat[i])) for i in order if flat[i]]
+
+    def save(self, path):
+        """Write the statistics (atomically)"""
+        temp_path = f"{path}.tmp.npz"
+        np.savez(temp_path, confusion=self.confusion, missed_letters=self.missed_letters,
+                 extra_letters=self.extra_letters,
+                 edit_counts=np.array([self.edit_counts[kind] for kind in EDIT_KINDS]),
+                 pattern_seen=np.array([self.pattern_seen[name] for name in PATTERNS]),
+                 pattern_missed=np.array([self.pattern_missed[name] for name in PATTERNS]),
+                 totals=np.array([self.answers, self.wrong_answers, self.added_doubles]))
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Statistics restored from save(), or empty ones if the file is missing or unreadable"""
+        analyzer = cls()
+        try:
+            with np.load(path) as data:
+                confusion, missed, extra = data['confusion'], data['missed_letters'], data['extra_letters']
+                edit_counts, seen, missed_patterns = data['edit_counts'], data['pattern_seen'], data['pattern_missed']
+                totals = data['totals']
+        except (OSError, KeyError, ValueError):
+            return analyzer
+        if (confusion.shape != (26, 26) or len(edit_counts) != len(EDIT_KINDS)
+                or len(seen) != len(PATTERNS) or len(totals) != 3):
+            return analyzer
+        analyzer.confusion[:] = confusion
+        analyzer.missed_letters[:] = missed
+        analyzer.extra_letters[:] = extra
+        analyzer.edit_counts = dict(zip(EDIT_KINDS, edit_counts.tolist()))
+        analyzer.pattern_seen = dict(zip(PATTERNS, seen.tolist()))
+        analyzer.pattern_missed = dict(zip(PATTERNS, missed_patterns.tolist()))
+        analyzer.answers, analyzer.wrong_answers, analyzer.added_doubles = totals.tolist()
+        return analyzer
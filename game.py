@@ -3,241 +3,560 @@ Main Game Controller for Spelling Bee
 Handles game states, main loop, and coordination between components
 """
 
+import os
 import pygame
+import sqlite3
 import sys
+import time
 from word_manager import WordManager
-from audio_controller import AudioController
+from corpus import load_word_lists
+from spaced_repetition import LeitnerScheduler
+from app_paths import get_data_dir
+from audio_controller import AudioController, FALLBACK_PRONUNCIATION
 from ui_manager import UIManager
 from keyboard_display import KeyboardDisplay
 from background import ParallaxBackground
+from attempt_store import AttemptStore
+from analytics import AttemptAnalytics
+from error_analysis import ErrorAnalyzer
+from word_index import load_word_index_in_background
+from engine import (GameEngine, EFFECT_PRONOUNCE, EFFECT_PREFETCH, EFFECT_SOUND,
+                    EFFECT_SESSION_START, EFFECT_SESSION_END, EFFECT_ATTEMPT,
+                    FEEDBACK_EXCELLENT, FEEDBACK_CORRECT, FEEDBACK_WRONG, FEEDBACK_TIMEOUT)
+from profiler import FrameProfiler
 
 class SpellingBeeGame:
-    def __init__(self):
+    # Window events after which the screen must be repainted even if nothing changed
+    REDRAW_EVENTS = {getattr(pygame, name) for name in
+                     ('VIDEOEXPOSE', 'WINDOWEXPOSED', 'WINDOWSHOWN', 'WINDOWRESTORED', 'WINDOWSIZECHANGED')
+                     if hasattr(pygame, name)}
+    
+    def __init__(self, dirty_rects=False, animate_background=True, target_fps=60, vsync=False,
+                 render_on_demand=False, profile_path=None, corpus_path=None, spaced_repetition=False,
+                 history=True):
         # Game settings
         self.SCREEN_WIDTH = 1024
         self.SCREEN_HEIGHT = 768
-        self.FPS = 60
+        self.FPS = target_fps  # Render rate; the simulation always steps at SIMULATION_RATE
+        self.LOOKAHEAD_WORDS = 3  # Upcoming words whose audio is prepared in advance
+        
+        # Fixed-timestep simulation, decoupled from the render rate
+        self.SIMULATION_RATE = 60
+        self.sim_dt = 1.0 / self.SIMULATION_RATE
+        self.MAX_FRAME_TIME = 0.25  # Longest stall caught up on in one frame
+        self.accumulator = 0.0  # Unsimulated time carried over to the next frame
+        
+        # Dirty-rect rendering: only changed regions are repainted and presented,
+        # falling back to a full frame when more than this share of the screen changed
+        self.dirty_rects_enabled = dirty_rects
+        self.DIRTY_AREA_THRESHOLD = 0.5
+        self.last_rendered_screen = None
+        
+        # Render-on-demand: frames are drawn only when the visible scene changed,
+        # and the loop sleeps in event.wait() while nothing is going on
+        self.render_on_demand = render_on_demand
+        self.IDLE_TIMEOUT = 0.25  # Longest sleep between checks while idle (seconds)
+        # When only the scrolling background moves, it is redrawn at this rate rather than every frame
+        self.BACKGROUND_IDLE_FPS = 12
+        self.last_background_render = 0.0
+        self.woken_event = None  # Event that ended the last idle wait, handled before the queue
+        self.scene_changed = True
+        self.last_scene_key = None
+        self.frames_rendered = 0
+        self.frames_skipped = 0
+        
+        # Frame profiler: on from the start when a trace file is requested,
+        # otherwise switched on together with the F3 overlay
+        self.profiler = FrameProfiler(enabled=profile_path is not None,
+                                      frame_budget_ms=1000.0 / target_fps)
+        self.profile_path = profile_path
+        self.show_profiler = False
         
         # Initialize display
-        self.screen = pygame.display.set_mode((self.SCREEN_WIDTH, self.SCREEN_HEIGHT))
+        self.vsync_active = False
+        self.screen = self.create_display(vsync)
         pygame.display.set_caption("Spelling Bee - Educational Typing Game")
         self.clock = pygame.time.Clock()
         
-        # Game state
-        self.game_state = "menu"  # menu, playing, game_over
+        # Loop state; game state (menu, playing, game_over) is owned by the engine
         self.running = True
         
-        # Game mechanics
-        self.score = 0
-        self.lives = 3
-        self.current_word = ""
-        self.user_input = ""
-        self.word_revealed = False
-        self.feedback_timer = 0
-        self.feedback_message = ""
-        self.feedback_color = (255, 255, 255)
-        self.time_limit = 30  # 30 seconds per word
-        self.word_start_time = 0
-        self.time_remaining = self.time_limit
-        self.hint_used = False
-        self.hint_text = ""
-        
-        # Statistics tracking
-        self.words_attempted = 0
-        self.words_correct = 0
-        self.total_response_time = 0
-        self.session_start_time = pygame.time.get_ticks()
+        # How the engine's feedback kinds are colored
+        self.FEEDBACK_COLORS = {
+            FEEDBACK_EXCELLENT: (0, 255, 0),
+            FEEDBACK_CORRECT: (0, 255, 0),
+            FEEDBACK_WRONG: (255, 0, 0),
+            FEEDBACK_TIMEOUT: (255, 165, 0),  # Orange
+        }
+        
+        # Event handlers per game state, keyed by event type; the None entry applies in every state
+        self.event_handlers = {
+            None: {pygame.QUIT: self.handle_quit, pygame.KEYDOWN: self.handle_global_key,
+                   FALLBACK_PRONUNCIATION: self.handle_fallback_pronunciation},
+            "menu": {pygame.KEYDOWN: self.handle_menu_key},
+            "playing": {pygame.KEYDOWN: self.handle_playing_key},
+            "game_over": {pygame.KEYDOWN: self.handle_game_over_key},
+        }
+        
+        # Spaced repetition: missed and slow words come back for review, across sessions
+        self.review_schedule_path = None
+        review_scheduler = None
+        if spaced_repetition:
+            self.review_schedule_path = os.path.join(get_data_dir(), 'review_schedule.json')
+            review_scheduler = LeitnerScheduler.load(self.review_schedule_path)
+        
+        # Attempt history: every answer is saved to SQLite by a background writer thread,
+        # which also keeps the analytics shown on the game over screen up to date
+        self.analytics = None
+        self.attempt_store = self.open_attempt_store() if history else None
+        
+        # Letter confusions and missed spelling patterns, kept with the history
+        self.error_profile_path = os.path.join(get_data_dir(), 'error_profile.npz') if history else None
+        error_analyzer = ErrorAnalyzer.load(self.error_profile_path) if history else None
         
         # Initialize components
-        self.word_manager = WordManager()
+        self.word_manager = WordManager(lookahead=self.LOOKAHEAD_WORDS, word_lists=load_word_lists(corpus_path),
+                                        review_scheduler=review_scheduler)
+        
         self.audio_controller = AudioController()
         self.ui_manager = UIManager(self.screen)
-        self.keyboard_display = KeyboardDisplay(self.screen)
+        self.keyboard_display = KeyboardDisplay(self.screen, self.ui_manager.text_cache)
         self.background = ParallaxBackground(self.screen)
+        self.background.animated = animate_background
+        
+        # Audio calls run inside the frame; any that block for long are reported with their caller
+        self.profiler.instrument(self.audio_controller,
+                                 ('play_word_pronunciation', 'prefetch_pronunciations', 'stop_pronunciation',
+                                  'play_correct_sound', 'play_incorrect_sound', 'play_death_sound'),
+                                 "audio")
+        
+        # Game rules live in the engine; this class turns pygame input into engine
+        # calls and carries out the audio effects the engine asks for
+        self.engine = GameEngine(self.word_manager, pygame.time.get_ticks, error_analyzer=error_analyzer)
+        self.effect_handlers = {
+            EFFECT_PRONOUNCE: self.audio_controller.play_word_pronunciation,
+            EFFECT_PREFETCH: self.audio_controller.prefetch_pronunciations,
+            EFFECT_SOUND: self.play_sound_effect,
+            EFFECT_SESSION_START: self.begin_history_session,
+            EFFECT_SESSION_END: self.end_history_session,
+            EFFECT_ATTEMPT: self.record_attempt,
+        }
+        
+        # Prefix index of every playable word for typing feedback and hints, memory-mapped from
+        # the cache; when it has to be built first, the engine gets it from the builder thread
+        self.word_index = None
+        self.word_index_thread = None  # Builder thread, while the cache is being filled
+        try:
+            self.word_index_thread = load_word_index_in_background(self.word_manager, self.set_word_index)
+        except (OSError, ValueError) as e:
+            print(f"Word index unavailable, typing feedback limited to the current word: {e}")
         
         # Get first word
-        self.next_word()
-        
-    def next_word(self):
-        """Get next word from word manager"""
-        self.current_word = self.word_manager.get_next_word(self.score)
-        self.user_input = ""
-        self.word_revealed = False
-        self.word_start_time = pygame.time.get_ticks()
-        self.time_remaining = self.time_limit
-        self.hint_used = False
-        self.hint_text = ""
-        
-        # Play pronunciation
-        self.audio_controller.play_word_pronunciation(self.current_word)
-        
-    def show_hint(self):
-        """Show a hint for the current word"""
-        if not self.hint_used and not self.word_revealed:
-            # Show first letter and word length
-            self.hint_text = f"Hint: {self.current_word[0].upper()}{'_' * (len(self.current_word) - 1)} ({len(self.current_word)} letters)"
-            self.hint_used = True
-            # Reduce score slightly for using hint
-            self.score = max(0, self.score - 5)
+        self.engine.next_word()
+        self.apply_effects()
         
-    def handle_events(self):
-        """Handle pygame events"""
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                self.running = False
-                
-            elif event.type == pygame.KEYDOWN:
-                if self.game_state == "menu":
-                    if event.key == pygame.K_SPACE:
-                        self.game_state = "playing"
-                        
-                elif self.game_state == "playing":
-                    if event.key == pygame.K_RETURN:
-                        self.check_answer()
-                    elif event.key == pygame.K_BACKSPACE:
-                        self.user_input = self.user_input[:-1]
-                    elif event.key == pygame.K_SPACE:
-                        # Replay word pronunciation
-                        self.audio_controller.play_word_pronunciation(self.current_word)
-                    elif event.key == pygame.K_h:
-                        # Show hint
-                        self.show_hint()
-                    elif event.unicode.isprintable() and len(self.user_input) < 20:
-                        self.user_input += event.unicode.lower()
-                        
-                elif self.game_state == "game_over":
-                    if event.key == pygame.K_SPACE:
-                        self.restart_game()
-                        
-    def check_answer(self):
-        """Check if user input matches current word"""
-        response_time = (pygame.time.get_ticks() - self.word_start_time) / 1000.0
-        self.words_attempted += 1
-        
-        if self.user_input.lower().strip() == self.current_word.lower():
-            # Correct answer
-            self.words_correct += 1
-            self.total_response_time += response_time
-            points = 10 * self.word_manager.get_difficulty_multiplier(self.score)
-            
-            # Bonus for fast answers
-            if response_time < 5:
-                points += 5
-                self.feedback_message = "Excellent! Quick and correct!"
-            else:
-                self.feedback_message = "Correct!"
-                
-            self.score += points
-            self.feedback_color = (0, 255, 0)
+    @property
+    def game_state(self):
+        """Current engine state: menu, playing or game_over"""
+        return self.engine.state
+        
+    def set_word_index(self, word_index):
+        """Hand a loaded word index to the engine (may run on the index builder thread)"""
+        self.word_index = word_index
+        self.engine.word_index = word_index
+        
+    def apply_effects(self):
+        """Carry out the audio and history effects the engine queued"""
+        # Every audio call is made from here, so long calls are reported against their effect instead
+        profiler = self.profiler
+        try:
+            for kind, payload in self.engine.drain_effects():
+                profiler.call_site = f"effect {kind}"
+                self.effect_handlers[kind](payload)
+        finally:
+            profiler.call_site = None
+            
+    def play_sound_effect(self, name):
+        """Play one of the correct/incorrect/death sounds"""
+        if name == "correct":
             self.audio_controller.play_correct_sound()
-            self.word_revealed = True
+        elif name == "incorrect":
+            self.audio_controller.play_incorrect_sound()
+        elif name == "death":
+            self.audio_controller.play_death_sound()
             
-            # Move to next word after delay
-            pygame.time.set_timer(pygame.USEREVENT + 1, 1500)
+    def open_attempt_store(self):
+        """The attempt history database in the data directory, or None if it cannot be opened"""
+        try:
+            self.analytics = AttemptAnalytics(get_data_dir('analytics'))
+            return AttemptStore(os.path.join(get_data_dir(), 'history.sqlite3'), on_commit=self.analytics.sync)
+        except (OSError, sqlite3.Error) as e:
+            print(f"Attempt history disabled: {e}")
+            return None
             
-        else:
-            # Wrong answer
-            self.lives -= 1
-            self.feedback_message = f"Wrong! The word was: {self.current_word}"
-            self.feedback_color = (255, 0, 0)
-            self.audio_controller.play_incorrect_sound()
-            self.word_revealed = True
+    def begin_history_session(self, payload=None):
+        """Start a session in the attempt history"""
+        if self.attempt_store is not None:
+            self.attempt_store.begin_session()
             
-            if self.lives <= 0:
-                self.game_state = "game_over"
-                self.audio_controller.play_death_sound()
-            else:
-                # Move to next word after delay
-                pygame.time.set_timer(pygame.USEREVENT + 1, 2000)
+    def end_history_session(self, stats):
+        """Save a finished session's score and counters"""
+        if self.attempt_store is not None:
+            score, attempted, correct = stats[:3]
+            self.attempt_store.end_session(score, attempted, correct)
+            
+    def record_attempt(self, attempt):
+        """Queue one answer for the attempt history"""
+        if self.attempt_store is not None:
+            self.attempt_store.record_attempt(*attempt)
+            
+    def handle_events(self):
+        """Drain the event queue once and dispatch each event to the current state's handler"""
+        global_handlers = self.event_handlers[None]
+        events = pygame.event.get()
+        if self.woken_event is not None:
+            # It was taken off the queue first, so it comes before anything that arrived with it
+            events.insert(0, self.woken_event)
+            self.woken_event = None
+        for event in events:
+            if event.type in self.REDRAW_EVENTS:
+                # The window contents were lost or uncovered
+                self.scene_changed = True
                 
-        self.feedback_timer = pygame.time.get_ticks()
-        
-    def restart_game(self):
-        """Restart the game"""
-        self.score = 0
-        self.lives = 3
-        self.game_state = "playing"
-        self.word_manager.reset()
-        
-        # Reset statistics
-        self.words_attempted = 0
-        self.words_correct = 0
-        self.total_response_time = 0
-        self.session_start_time = pygame.time.get_ticks()
-        
-        self.next_word()
-        
-    def update(self):
-        """Update game logic"""
-        # Handle custom events
-        for event in pygame.event.get():
-            if event.type == pygame.USEREVENT + 1:
-                if self.game_state == "playing":
-                    self.next_word()
-                pygame.time.set_timer(pygame.USEREVENT + 1, 0)  # Cancel timer
+            # Looked up per event, since a handler may change the game state;
+            # a global handler returning True consumes the event
+            handler = global_handlers.get(event.type)
+            if handler is not None and handler(event):
+                continue
+            handler = self.event_handlers[self.game_state].get(event.type)
+            if handler is not None:
+                handler(event)
                 
+        # Play whatever the input triggered (pronunciations, sound effects)
+        self.apply_effects()
+        
+    def handle_quit(self, event):
+        """Close the game"""
+        self.running = False
+        return True
+        
+    def handle_fallback_pronunciation(self, event):
+        """Speech failed on the worker thread: play the letter-tone pronunciation from here"""
+        self.audio_controller.play_fallback_pronunciation(event.word)
+        return True
+        
+    def handle_global_key(self, event):
+        """Keys that work in every state: F3 toggles the profiler overlay"""
+        if event.key == pygame.K_F3:
+            self.show_profiler = not self.show_profiler
+            self.profiler.enabled = self.show_profiler or self.profile_path is not None
+            self.scene_changed = True
+            return True
+        return False
+        
+    def handle_menu_key(self, event):
+        """Menu: space starts playing"""
+        if event.key == pygame.K_SPACE:
+            self.engine.start()
+            
+    def handle_playing_key(self, event):
+        """Playing: typing, submitting, replaying the word and hints"""
+        if event.key == pygame.K_RETURN:
+            self.engine.submit()
+        elif event.key == pygame.K_BACKSPACE:
+            self.engine.backspace()
+        elif event.key == pygame.K_SPACE:
+            # Replay word pronunciation
+            self.engine.replay()
+        elif event.key == pygame.K_h:
+            # Show hint
+            self.engine.request_hint()
+        elif event.unicode:
+            self.engine.type_text(event.unicode)
+            
+    def handle_game_over_key(self, event):
+        """Game over: space starts a new game"""
+        if event.key == pygame.K_SPACE:
+            self.engine.restart()
+            
+    def create_display(self, vsync):
+        """Open the window, with vsync when requested and supported"""
+        size = (self.SCREEN_WIDTH, self.SCREEN_HEIGHT)
+        if vsync:
+            try:
+                # SDL only honours vsync for renderer-backed displays
+                screen = pygame.display.set_mode(size, pygame.SCALED, vsync=1)
+                self.vsync_active = True
+                return screen
+            except pygame.error as e:
+                print(f"VSync unavailable: {e}")
+        return pygame.display.set_mode(size)
+        
+    def get_refresh_rate(self):
+        """Refresh rate of the primary display, or 60 when it cannot be queried"""
+        try:
+            rates = pygame.display.get_desktop_refresh_rates()
+        except (AttributeError, pygame.error):
+            rates = []
+        return rates[0] if rates and rates[0] > 0 else 60
+        
+    def save_review_schedule(self):
+        """Keep the spaced-repetition schedule for the next session"""
+        try:
+            self.word_manager.review_scheduler.save(self.review_schedule_path)
+        except OSError as e:
+            print(f"Could not save review schedule: {e}")
+            
+    def save_error_profile(self):
+        """Keep the spelling-mistake statistics for the next session"""
+        try:
+            self.engine.error_analyzer.save(self.error_profile_path)
+        except OSError as e:
+            print(f"Could not save error profile: {e}")
+        
+    def update(self, dt=None):
+        """Advance game logic by one fixed simulation step"""
+        if dt is None:
+            dt = self.sim_dt
+            
         # Update background animation
-        self.background.update()
-        
-        # Update timer for current word
-        if self.game_state == "playing" and not self.word_revealed:
-            elapsed_time = (pygame.time.get_ticks() - self.word_start_time) / 1000.0
-            self.time_remaining = max(0, self.time_limit - elapsed_time)
-            
-            # Check if time is up
-            if self.time_remaining <= 0:
-                self.lives -= 1
-                self.feedback_message = f"Time's up! The word was: {self.current_word}"
-                self.feedback_color = (255, 165, 0)  # Orange
-                self.audio_controller.play_incorrect_sound()
-                self.word_revealed = True
+        self.background.update(dt)
+        
+        # Timed transitions and the word timer
+        self.engine.update()
+        self.apply_effects()
+        
+    def get_game_ui_state(self):
+        """Arguments for UIManager.draw_game_ui for the current frame"""
+        state = self.engine
+        return (state.score, state.lives, state.user_input,
+                state.current_word if state.word_revealed else "",
+                state.feedback_message, self.FEEDBACK_COLORS.get(state.feedback_kind, (255, 255, 255)),
+                state.time_remaining, self.word_manager.difficulty_level,
+                state.hint_text, state.input_status)
                 
-                if self.lives <= 0:
-                    self.game_state = "game_over"
-                    self.audio_controller.play_death_sound()
-                else:
-                    pygame.time.set_timer(pygame.USEREVENT + 1, 2000)
-                    
-                self.feedback_timer = pygame.time.get_ticks()
-        
-        # Clear old feedback
-        if pygame.time.get_ticks() - self.feedback_timer > 3000:
-            self.feedback_message = ""
-            
+    def get_game_over_stats(self):
+        """Arguments for UIManager.draw_game_over for the current frame"""
+        # The analytics report is replaced by the history writer thread; reading it never waits
+        report = self.analytics.report if self.analytics is not None else None
+        return self.engine.get_session_stats() + (report,)
+        
     def render(self):
         """Render all game elements"""
+        self.ui_manager.text_cache.begin_frame()
+        
+        # The overlay changes every frame and covers other widgets, so it always gets a full frame
+        if self.dirty_rects_enabled and not self.show_profiler:
+            self.render_dirty()
+            return
+            
+        self.draw_frame()
+        if self.show_profiler:
+            with self.profiler.phase("overlay"):
+                self.ui_manager.draw_debug_overlay(self.get_overlay_lines())
+            # Dirty tracking knows nothing about the overlay; repaint fully once it is hidden
+            self.last_rendered_screen = None
+        with self.profiler.phase("present"):
+            pygame.display.flip()
+        
+    def get_overlay_lines(self):
+        """Profiler summary plus text cache counters for the F3 overlay"""
+        text_stats = self.ui_manager.text_cache.get_stats()
+        return self.profiler.get_overlay_lines() + [
+            f"text cache: {text_stats['hit_rate']:.1%} hits, {text_stats['frame_misses']} rendered last frame, "
+            f"{text_stats['entries']} entries"]
+        
+    def draw_frame(self):
+        """Draw every game element to the screen surface (respecting its clip)"""
         # Draw background
-        self.background.draw()
+        with self.profiler.phase("background"):
+            self.background.draw()
         
         if self.game_state == "menu":
-            self.ui_manager.draw_menu()
+            with self.profiler.phase("ui"):
+                self.ui_manager.draw_menu()
             
         elif self.game_state == "playing":
             # Draw game UI
-            self.ui_manager.draw_game_ui(self.score, self.lives, self.user_input, 
-                                       self.current_word if self.word_revealed else "",
-                                       self.feedback_message, self.feedback_color,
-                                       self.time_remaining, self.word_manager.difficulty_level,
-                                       self.hint_text)
+            with self.profiler.phase("ui"):
+                self.ui_manager.draw_game_ui(*self.get_game_ui_state())
             
             # Draw keyboard
-            self.keyboard_display.draw(self.user_input)
+            with self.profiler.phase("keyboard"):
+                self.keyboard_display.draw(self.engine.user_input)
             
         elif self.game_state == "game_over":
-            # Calculate performance stats
-            accuracy = (self.words_correct / max(1, self.words_attempted)) * 100
-            avg_response_time = self.total_response_time / max(1, self.words_correct) if self.words_correct > 0 else 0
-            session_time = (pygame.time.get_ticks() - self.session_start_time) / 1000.0
+            with self.profiler.phase("ui"):
+                self.ui_manager.draw_game_over(*self.get_game_over_stats())
+            
+    def collect_dirty_rects(self):
+        """Screen regions that changed since the last frame, or None when a full redraw is needed"""
+        # Screen switches and the game over statistics repaint everything
+        screen_key = self.game_state
+        if self.game_state == "game_over":
+            screen_key = self.ui_manager.get_game_over_content(*self.get_game_over_stats())
+        if screen_key != self.last_rendered_screen:
+            self.last_rendered_screen = screen_key
+            self.ui_manager.reset_dirty_tracking()
+            self.keyboard_display.reset_dirty_tracking()
+            return None
+            
+        rects = self.background.get_dirty_rects()
+        if self.game_state == "playing":
+            rects += self.ui_manager.get_dirty_rects(self.ui_manager.layout_game_ui(*self.get_game_ui_state()))
+            rects += self.keyboard_display.get_dirty_rects(self.engine.user_input)
             
-            self.ui_manager.draw_game_over(self.score, self.words_attempted, self.words_correct, 
-                                         accuracy, avg_response_time, session_time)
+        # Merge overlapping regions so nothing is painted twice
+        screen_rect = self.screen.get_rect()
+        merged = []
+        for rect in rects:
+            rect = rect.clip(screen_rect)
+            if not rect.width or not rect.height:
+                continue
+            for index in range(len(merged) - 1, -1, -1):
+                if rect.colliderect(merged[index]):
+                    rect.union_ip(merged.pop(index))
+            merged.append(rect)
             
-        pygame.display.flip()
+        dirty_area = sum(rect.width * rect.height for rect in merged)
+        if dirty_area > self.DIRTY_AREA_THRESHOLD * screen_rect.width * screen_rect.height:
+            return None
+        return merged
+        
+    def render_dirty(self):
+        """Repaint and present only the regions that changed"""
+        rects = self.collect_dirty_rects()
+        if rects is None:
+            # Too much changed; a full frame is cheaper
+            self.draw_frame()
+            with self.profiler.phase("present"):
+                pygame.display.flip()
+            return
+            
+        for rect in rects:
+            self.screen.set_clip(rect)
+            self.draw_frame()
+        self.screen.set_clip(None)
+        
+        if rects:
+            with self.profiler.phase("present"):
+                pygame.display.update(rects)
+        
+    def get_scene_key(self):
+        """Everything the next frame would show, reduced to what is visibly different"""
+        key = [self.game_state]
+        if self.game_state == "playing":
+            ui_state = list(self.get_game_ui_state())
+            # The timer only shows whole seconds and turns red at 5
+            time_remaining = self.engine.time_remaining
+            ui_state[6] = (int(time_remaining), time_remaining <= 5)
+            key.append(tuple(ui_state))
+        elif self.game_state == "game_over":
+            key.append(self.ui_manager.get_game_over_content(*self.get_game_over_stats()))
+        return tuple(key)
+        
+    def scene_needs_render(self):
+        """True if input, timers or feedback changed what is on screen, or the background is due a redraw"""
+        if self.show_profiler:
+            return True
+        now = time.perf_counter()
+        scene_key = self.get_scene_key()
+        if not self.scene_changed and scene_key == self.last_scene_key:
+            # Only the background may have moved; scroll it at a low frame rate
+            if now - self.last_background_render < 1.0 / self.BACKGROUND_IDLE_FPS:
+                return False
+            if self.background.get_layer_positions() == self.background.drawn_positions:
+                return False
+        self.scene_changed = False
+        self.last_scene_key = scene_key
+        self.last_background_render = now
+        return True
+        
+    def get_idle_timeout(self):
+        """Seconds until the scene can next change without any input"""
+        timeouts = [self.IDLE_TIMEOUT]
+        if self.background.animated:
+            # Next low-rate background frame
+            timeouts.append(self.last_background_render + 1.0 / self.BACKGROUND_IDLE_FPS - time.perf_counter())
+        if self.game_state == "playing" and not self.engine.word_revealed:
+            # Next whole-second tick of the countdown
+            time_remaining = self.engine.time_remaining
+            timeouts.append(time_remaining - int(time_remaining) or 1.0)
+        next_task_in = self.engine.time_until_next_transition()
+        if next_task_in is not None:
+            # Next word or feedback expiry
+            timeouts.append(next_task_in / 1000.0)
+        return max(0.001, min(timeouts))
+        
+    def wait_for_activity(self, timeout):
+        """Block until an event arrives or timeout seconds pass; the event is handled first next frame"""
+        event = pygame.event.wait(max(1, int(timeout * 1000)))
+        if event.type != pygame.NOEVENT:
+            self.woken_event = event
+            
+    def advance_frame(self, frame_time):
+        """Handle input, run the simulation steps covering frame_time seconds and draw the frame.
+        
+        Returns False when render-on-demand skipped drawing because nothing changed.
+        """
+        self.accumulator += frame_time
+        
+        self.profiler.begin_frame()
+        with self.profiler.phase("events"):
+            self.handle_events()
+        with self.profiler.phase("update"):
+            while self.accumulator >= self.sim_dt:
+                self.update(self.sim_dt)
+                self.accumulator -= self.sim_dt
+                
+        # Draw moving elements between the last two simulation steps
+        self.background.interpolate(self.accumulator / self.sim_dt)
+        
+        if self.render_on_demand and not self.scene_needs_render():
+            self.profiler.end_frame()
+            self.frames_skipped += 1
+            return False
+            
+        self.render()
+        self.profiler.end_frame()
+        self.frames_rendered += 1
+        return True
         
     def run(self):
-        """Main game loop"""
+        """Main game loop: fixed-step simulation with interpolated, paced rendering"""
+        # With vsync, flip() already waits for the display, so the clock only
+        # paces targets below the refresh rate; the loose cap above it is a
+        # safety net for drivers that accept vsync but ignore it
+        cap_fps = self.FPS
+        refresh_rate = self.get_refresh_rate()
+        if self.vsync_active and self.FPS >= refresh_rate:
+            cap_fps = refresh_rate * 2
+            
+        previous_time = time.perf_counter()
         while self.running:
-            self.handle_events()
-            self.update()
-            self.render()
-            self.clock.tick(self.FPS)
+            now = time.perf_counter()
+            frame_time = min(now - previous_time, self.MAX_FRAME_TIME)
+            previous_time = now
+            
+            if self.advance_frame(frame_time):
+                self.clock.tick(cap_fps)
+            else:
+                # Nothing visible changed: sleep until input or the next scheduled change
+                self.wait_for_activity(self.get_idle_timeout())
+                self.clock.tick()
+                
+        if self.profile_path:
+            self.profiler.export(self.profile_path)
+        if self.review_schedule_path:
+            self.save_review_schedule()
+        if self.error_profile_path:
+            self.save_error_profile()
+        if self.attempt_store is not None:
+            # A session left mid-game still gets its counters
+            if self.game_state == "playing":
+                self.end_history_session(self.engine.get_session_stats())
+            self.attempt_store.close()
+            # The writer synced the analytics one last time as it stopped; keep their totals for the next start
+            if self.analytics is not None and self.analytics.loaded and not self.attempt_store.thread.is_alive():
+                self.analytics.save_summary()
+        self.audio_controller.shutdown()
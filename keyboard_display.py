@@ -3,9 +3,16 @@ Keyboard Display - Visual keyboard for learning aid
 """
 
 import pygame
+from collections import Counter
+from text_cache import TextCache
 
 class KeyboardDisplay:
-    def __init__(self, screen):
+    # Key highlight states
+    IDLE = 0
+    TYPED = 1
+    LAST_TYPED = 2
+    
+    def __init__(self, screen, text_cache=None):
         self.screen = screen
         self.screen_width = screen.get_width()
         self.screen_height = screen.get_height()
@@ -28,63 +35,156 @@ class KeyboardDisplay:
         self.GRAY = (200, 200, 200)
         self.GREEN = (144, 238, 144)
         self.BLUE = (173, 216, 230)
+        self.TRANSPARENT = (255, 0, 255)  # Colorkey for the gaps between keys
         
         # Font
         self.font = pygame.font.Font(None, 24)
+        self.text_cache = text_cache if text_cache is not None else TextCache()
         
         # Calculate keyboard position
         self.keyboard_y = self.screen_height - 200
+        self.key_rects = self.layout_keys()
+        self.keyboard_rect = self.key_rects['q'].unionall(list(self.key_rects.values()))
         
-    def draw(self, user_input):
-        """Draw the virtual keyboard with highlights"""
-        # Draw keyboard background
-        total_width = len(self.keyboard_rows[0]) * (self.key_width + self.key_spacing)
-        keyboard_x = (self.screen_width - total_width) // 2
+        # Every key pre-rendered in every state
+        self.atlas, self.atlas_rects = self.build_atlas()
+        
+        # Typed letters, kept up to date incrementally as the input changes
+        self.tracked_input = ""
+        self.typed_counts = Counter()
+        self.key_states = {key: self.IDLE for key in self.key_rects}
+        
+        # Keys to re-blit into the cached keyboard, and keys whose screen area changed
+        self.stale_keys = set()
+        self.dirty_keys = set()
+        self.keyboard_surface = self.build_keyboard_surface()
         
+    def layout_keys(self):
+        """Screen rectangle of every key, with ' ' for the space bar"""
+        key_rects = {}
         for row_idx, row in enumerate(self.keyboard_rows):
             # Calculate row offset for centered appearance
             row_width = len(row) * (self.key_width + self.key_spacing)
             row_x = (self.screen_width - row_width) // 2
             
             for key_idx, key in enumerate(row):
-                # Calculate key position
                 key_x = row_x + key_idx * (self.key_width + self.key_spacing)
                 key_y = self.keyboard_y + row_idx * (self.key_height + self.key_spacing)
+                key_rects[key] = pygame.Rect(key_x, key_y, self.key_width, self.key_height)
                 
-                # Determine key color based on user input
-                key_color = self.GRAY
-                text_color = self.BLACK
-                
-                # Highlight if key was typed
-                if key in user_input.lower():
-                    key_color = self.GREEN
-                    
-                # Highlight current key (last typed)
-                if user_input and key == user_input[-1].lower():
-                    key_color = self.BLUE
-                    
-                # Draw key
-                key_rect = pygame.Rect(key_x, key_y, self.key_width, self.key_height)
-                pygame.draw.rect(self.screen, key_color, key_rect)
-                pygame.draw.rect(self.screen, self.BLACK, key_rect, 2)
-                
-                # Draw key label
-                key_text = self.font.render(key.upper(), True, text_color)
-                text_rect = key_text.get_rect()
-                text_rect.center = key_rect.center
-                self.screen.blit(key_text, text_rect)
-                
-        # Draw space bar
         space_width = 200
         space_x = (self.screen_width - space_width) // 2
         space_y = self.keyboard_y + len(self.keyboard_rows) * (self.key_height + self.key_spacing) + 10
+        key_rects[' '] = pygame.Rect(space_x, space_y, space_width, self.key_height)
+        return key_rects
+        
+    def get_state_color(self, key, state):
+        """Fill color of a key in a highlight state"""
+        if state == self.LAST_TYPED:
+            return self.BLUE
+        if state == self.TYPED:
+            # The space bar lights up blue whenever the input holds a space
+            return self.BLUE if key == ' ' else self.GREEN
+        return self.GRAY
+        
+    def build_atlas(self):
+        """Render every key in every state into one surface; returns (atlas, rects)"""
+        states = (self.IDLE, self.TYPED, self.LAST_TYPED)
+        keys = list(self.key_rects)
+        width = sum(self.key_rects[key].width for key in keys)
+        atlas = pygame.Surface((width, self.key_height * len(states)))
+        
+        atlas_rects = {}
+        for state_idx, state in enumerate(states):
+            x = 0
+            for key in keys:
+                rect = pygame.Rect(x, state_idx * self.key_height, self.key_rects[key].width, self.key_height)
+                pygame.draw.rect(atlas, self.get_state_color(key, state), rect)
+                pygame.draw.rect(atlas, self.BLACK, rect, 2)
+                
+                # Draw key label
+                label = "SPACE (Replay)" if key == ' ' else key.upper()
+                key_text = self.text_cache.render(label, self.font, self.BLACK)
+                atlas.blit(key_text, key_text.get_rect(center=rect.center))
+                
+                atlas_rects[(key, state)] = rect
+                x += rect.width
+                
+        if pygame.display.get_surface() is not None:
+            atlas = atlas.convert()
+        return atlas, atlas_rects
+        
+    def build_keyboard_surface(self):
+        """Compose the whole keyboard from the atlas onto one colorkeyed surface"""
+        surface = pygame.Surface(self.keyboard_rect.size)
+        surface.fill(self.TRANSPARENT)
+        surface.set_colorkey(self.TRANSPARENT)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        for key in self.key_rects:
+            self.blit_key(surface, key)
+        self.stale_keys.clear()
+        return surface
+        
+    def blit_key(self, surface, key):
+        """Copy a key's sprite for its current state into the keyboard surface"""
+        position = self.key_rects[key].move(-self.keyboard_rect.x, -self.keyboard_rect.y)
+        surface.blit(self.atlas, position, self.atlas_rects[(key, self.key_states[key])])
+        
+    def sync_input(self, user_input):
+        """Bring typed-letter tracking up to date with the input, one keystroke at a time when possible"""
+        old_input = self.tracked_input
+        if user_input == old_input:
+            return
+            
+        if user_input[:-1] == old_input:
+            # One character typed
+            self.typed_counts[user_input[-1].lower()] += 1
+        elif old_input[:-1] == user_input:
+            # One character deleted
+            self.typed_counts[old_input[-1].lower()] -= 1
+        else:
+            # New word or bulk edit
+            self.typed_counts = Counter(user_input.lower())
+        self.tracked_input = user_input
+        
+        # Only the removed/added letters and the last-typed keys can change state
+        last_key = user_input[-1].lower() if user_input else None
+        old_last_key = old_input[-1].lower() if old_input else None
+        candidates = set(old_input.lower()) ^ set(user_input.lower())
+        candidates.update((last_key, old_last_key))
+        for key in candidates:
+            if key not in self.key_rects:
+                continue
+            if key == last_key:
+                state = self.LAST_TYPED
+            elif self.typed_counts[key] > 0:
+                state = self.TYPED
+            else:
+                state = self.IDLE
+            if state != self.key_states[key]:
+                self.key_states[key] = state
+                self.stale_keys.add(key)
+                self.dirty_keys.add(key)
+                
+    def get_dirty_rects(self, user_input):
+        """Rectangles of keys whose highlight changed since the previous call"""
+        self.sync_input(user_input)
+        dirty = [self.key_rects[key] for key in self.dirty_keys]
+        self.dirty_keys.clear()
+        return dirty
+        
+    def reset_dirty_tracking(self):
+        """Forget pending key changes, e.g. because the whole screen is being redrawn"""
+        self.dirty_keys.clear()
+        
+    def draw(self, user_input):
+        """Draw the virtual keyboard with highlights"""
+        self.sync_input(user_input)
         
-        space_color = self.BLUE if ' ' in user_input else self.GRAY
-        space_rect = pygame.Rect(space_x, space_y, space_width, self.key_height)
-        pygame.draw.rect(self.screen, space_color, space_rect)
-        pygame.draw.rect(self.screen, self.BLACK, space_rect, 2)
+        # Re-blit only keys whose state changed, then the keyboard in one blit
+        for key in self.stale_keys:
+            self.blit_key(self.keyboard_surface, key)
+        self.stale_keys.clear()
         
-        space_text = self.font.render("SPACE (Replay)", True, self.BLACK)
-        text_rect = space_text.get_rect()
-        text_rect.center = space_rect.center
-        self.screen.blit(space_text, text_rect)
+        self.screen.blit(self.keyboard_surface, self.keyboard_rect)
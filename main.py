@@ -4,13 +4,39 @@ Spelling Bee Game - Main Entry Point
 Educational word pronunciation typing game with progressive difficulty
 """
 
+import argparse
 import pygame
 import sys
 import os
 from game import SpellingBeeGame
 
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Spelling Bee - Educational Typing Game")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="repaint and present only changed screen regions (for slow machines and thin clients)")
+    parser.add_argument("--no-scroll", action="store_true",
+                        help="keep the background still; a scrolling backdrop makes every frame a full redraw")
+    parser.add_argument("--fps", type=int, default=60,
+                        help="target render frame rate; game timers are unaffected (default: 60)")
+    parser.add_argument("--vsync", action="store_true",
+                        help="synchronize presentation with the display refresh")
+    parser.add_argument("--render-on-demand", action="store_true",
+                        help="only draw frames when something on screen changed and sleep while idle")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="time every frame phase and write the trace to PATH on exit (.csv or .json); "
+                             "F3 shows the live overlay")
+    parser.add_argument("--corpus", metavar="PATH",
+                        help="play words from a corpus built with 'python corpus.py build' instead of the built-in lists")
+    parser.add_argument("--spaced-repetition", action="store_true",
+                        help="bring missed and slow words back for review, remembered between sessions")
+    parser.add_argument("--no-history", action="store_true",
+                        help="do not save answers to the attempt history database")
+    return parser.parse_args()
+
 def main():
     """Initialize pygame and start the game"""
+    args = parse_args()
     try:
         # Initialize pygame
         pygame.init()
@@ -24,7 +50,15 @@ def main():
             print("Game will continue without audio")
         
         # Create and run the game
-        game = SpellingBeeGame()
+        game = SpellingBeeGame(dirty_rects=args.dirty_rects,
+                               animate_background=not args.no_scroll,
+                               target_fps=args.fps,
+                               vsync=args.vsync,
+                               render_on_demand=args.render_on_demand,
+                               profile_path=args.profile,
+                               corpus_path=args.corpus,
+                               spaced_repetition=args.spaced_repetition,
+                               history=not args.no_history)
         game.run()
         
     except Exception as e:
@@ -0,0 +1,218 @@
+"""
+Profiler - Per-phase frame timings with rolling percentiles, long-call detection and trace export
+"""
+
+import csv
+import functools
+import json
+import os
+import sys
+import time
+from collections import deque
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * fraction))
+    return sorted_values[index]
+
+
+class _NullPhase:
+    """Context manager used for phases while profiling is off"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class _Phase:
+    """Times one named phase of the current frame"""
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.add_sample(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class FrameProfiler:
+    """Collects how long each phase of every frame took.
+
+    Phases are timed with `with profiler.phase("name"):` between
+    begin_frame() and end_frame().  The last history_size samples of each
+    phase feed the p50/p95/p99/max summary; the per-frame trace and any
+    long blocking calls are kept for export.  Methods wrapped with
+    instrument() are timed individually and, when a call takes longer than
+    long_call_ms, the frame is flagged along with the caller's file and line,
+    or with call_site when the caller has set it (e.g. to the engine effect
+    a dispatcher is applying, where the line would always be the same).
+    """
+
+    NULL_PHASE = _NullPhase()
+
+    def __init__(self, enabled=False, history_size=600, trace_size=36000,
+                 frame_budget_ms=1000.0 / 60, long_call_ms=4.0):
+        self.enabled = enabled
+        self.frame_budget_ms = frame_budget_ms
+        self.long_call_ms = long_call_ms
+
+        # Rolling samples per phase, in milliseconds
+        self.history_size = history_size
+        self.samples = {}
+        self.phase_order = []
+
+        # One entry per frame: {'frame', 'total', <phase>: ms, 'long_calls': [...]}
+        self.trace = deque(maxlen=trace_size)
+        self.long_calls = deque(maxlen=1000)
+        self.long_frames = 0
+        self.frame_index = 0
+
+        self.call_site = None
+
+        self._frame = None
+        self._frame_start = 0.0
+
+    def begin_frame(self):
+        """Start timing a new frame"""
+        if not self.enabled:
+            return
+        self._frame = {'frame': self.frame_index}
+        self._frame_start = time.perf_counter()
+
+    def end_frame(self):
+        """Finish the current frame and record its total time"""
+        if self._frame is None:
+            return
+        frame = self._frame
+        self._frame = None
+        total = (time.perf_counter() - self._frame_start) * 1000.0
+        frame['total'] = total
+        self._record('total', total)
+        if total > self.frame_budget_ms or 'long_calls' in frame:
+            self.long_frames += 1
+        self.trace.append(frame)
+        self.frame_index += 1
+
+    def phase(self, name):
+        """Context manager that adds the time spent inside it to phase name"""
+        if self._frame is None:
+            return self.NULL_PHASE
+        return _Phase(self, name)
+
+    def add_sample(self, name, seconds):
+        """Add seconds to phase name for the current frame"""
+        if self._frame is None:
+            return
+        ms = seconds * 1000.0
+        # A phase entered several times in one frame (e.g. once per dirty rect) accumulates
+        self._frame[name] = self._frame.get(name, 0.0) + ms
+        self._record(name, ms)
+
+    def _record(self, name, ms):
+        history = self.samples.get(name)
+        if history is None:
+            history = self.samples[name] = deque(maxlen=self.history_size)
+            self.phase_order.append(name)
+        history.append(ms)
+
+    def instrument(self, obj, method_names, category):
+        """Replace obj's methods with timed wrappers that report calls blocking the loop"""
+        for method_name in method_names:
+            method = getattr(obj, method_name)
+            setattr(obj, method_name, self._wrap_call(method, f"{category}.{method_name}"))
+
+    def _wrap_call(self, method, label):
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            if self._frame is None:
+                return method(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                ms = (time.perf_counter() - start) * 1000.0
+                if ms >= self.long_call_ms:
+                    call_site = self.call_site
+                    if call_site is None:
+                        caller = sys._getframe(1)
+                        call_site = (f"{os.path.basename(caller.f_code.co_filename)}:"
+                                     f"{caller.f_lineno} in {caller.f_code.co_name}")
+                    self.flag_long_call(label, ms, call_site)
+        return timed
+
+    def flag_long_call(self, label, ms, call_site):
+        """Mark the current frame as long because of a blocking call"""
+        entry = {'frame': self.frame_index, 'call': label, 'ms': round(ms, 3), 'call_site': call_site}
+        self.long_calls.append(entry)
+        if self._frame is not None:
+            self._frame.setdefault('long_calls', []).append(entry)
+        print(f"Long call: {label} took {ms:.1f} ms at {call_site}")
+
+    def get_stats(self):
+        """p50/p95/p99/max in milliseconds for every phase over the rolling window"""
+        stats = {}
+        for name in self.phase_order:
+            values = sorted(self.samples[name])
+            stats[name] = {
+                'count': len(values),
+                'p50': percentile(values, 0.50),
+                'p95': percentile(values, 0.95),
+                'p99': percentile(values, 0.99),
+                'max': values[-1] if values else 0.0,
+            }
+        return stats
+
+    def get_overlay_lines(self):
+        """Text lines summarizing the rolling stats for the debug overlay"""
+        lines = [f"{'phase':<12}{'p50':>7}{'p95':>7}{'p99':>7}{'max':>7}  ms"]
+        for name, s in self.get_stats().items():
+            lines.append(f"{name:<12}{s['p50']:>7.2f}{s['p95']:>7.2f}{s['p99']:>7.2f}{s['max']:>7.2f}")
+        lines.append(f"long frames: {self.long_frames}/{self.frame_index}")
+        if self.long_calls:
+            last = self.long_calls[-1]
+            lines.append(f"last long call: {last['call']} {last['ms']:.1f} ms @ {last['call_site']}")
+        return lines
+
+    def export(self, path):
+        """Write the trace to path: CSV (one row per frame) for .csv, JSON otherwise"""
+        if path.endswith('.csv'):
+            self.export_csv(path)
+        else:
+            self.export_json(path)
+        print(f"Profiler trace written to {path}")
+
+    def export_json(self, path):
+        """Write summary stats, long calls and the per-frame trace as JSON"""
+        data = {
+            'frame_budget_ms': self.frame_budget_ms,
+            'frames': self.frame_index,
+            'long_frames': self.long_frames,
+            'stats': self.get_stats(),
+            'long_calls': list(self.long_calls),
+            'trace': list(self.trace),
+        }
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=1)
+
+    def export_csv(self, path):
+        """Write one row per frame with a column per phase"""
+        columns = ['frame'] + self.phase_order + ['long_calls']
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            for frame in self.trace:
+                row = [frame['frame']]
+                row.extend(round(frame.get(name, 0.0), 4) for name in self.phase_order)
+                row.append('; '.join(f"{c['call']}@{c['call_site']}" for c in frame.get('long_calls', ())))
+                writer.writerow(row)
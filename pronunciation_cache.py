@@ -0,0 +1,163 @@
+"""
+Pronunciation Cache - Renders each word once to disk and keeps decoded sounds in a bounded LRU
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import pygame
+
+
+class PronunciationCache:
+    """Two-level cache of spoken words.
+
+    Rendered audio is stored on disk keyed by (word, voice, rate, volume) so
+    repeat words across sessions skip synthesis entirely.  Decoded
+    ``pygame.mixer.Sound`` objects are kept in an in-memory LRU bounded by
+    bytes, so a replay costs a single ``Sound.play()``.
+    """
+
+    FILE_EXTENSION = '.wav'
+
+    def __init__(self, cache_dir, max_memory_bytes=16 * 1024 * 1024, max_disk_bytes=128 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+
+        self._sounds = OrderedDict()  # key -> (Sound, size in bytes)
+        self._lock = threading.Lock()
+        self.memory_bytes = 0
+
+        # Counters
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.renders = 0
+
+    @staticmethod
+    def make_key(word, voice, rate, volume):
+        """Build the cache key for a word spoken with the given voice settings"""
+        return (word.lower(), str(voice), int(rate), round(float(volume), 3))
+
+    def path_for(self, key):
+        """Disk location of the rendered audio for key"""
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, digest + self.FILE_EXTENSION)
+
+    def get(self, key):
+        """Return a ready-to-play Sound for key, or None if it was never rendered"""
+        with self._lock:
+            entry = self._sounds.get(key)
+            if entry is not None:
+                self._sounds.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+        path = self.path_for(key)
+        if os.path.exists(path):
+            sound = self._load(key, path)
+            if sound is not None:
+                self.disk_hits += 1
+                # Refresh the file's age so disk pruning keeps recently used words
+                os.utime(path)
+                return sound
+
+        self.misses += 1
+        return None
+
+    def render(self, key, render_to_file):
+        """Render key with render_to_file(path), store it and return the loaded Sound"""
+        path = self.path_for(key)
+        temp_path = f"{path}.{threading.get_ident()}.tmp{self.FILE_EXTENSION}"
+        try:
+            render_to_file(temp_path)
+            if not os.path.exists(temp_path) or os.path.getsize(temp_path) == 0:
+                return None
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        self.renders += 1
+        sound = self._load(key, path)
+        self.prune_disk()
+        return sound
+
+    def contains(self, key):
+        """Return True if key is cached in memory or on disk"""
+        with self._lock:
+            if key in self._sounds:
+                return True
+        return os.path.exists(self.path_for(key))
+
+    def prune_disk(self):
+        """Delete least recently used files until the disk cache fits its byte cap"""
+        try:
+            entries = []
+            for name in os.listdir(self.cache_dir):
+                if name.endswith(self.FILE_EXTENSION) and '.tmp' not in name:
+                    stat = os.stat(os.path.join(self.cache_dir, name))
+                    entries.append((stat.st_mtime, stat.st_size, name))
+        except OSError:
+            return
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+                total -= size
+            except OSError:
+                pass
+
+    def clear_memory(self):
+        """Drop all decoded sounds (files on disk are kept)"""
+        with self._lock:
+            self._sounds.clear()
+            self.memory_bytes = 0
+
+    def get_stats(self):
+        """Hit/miss/eviction counters and memory usage"""
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'renders': self.renders,
+            'entries': len(self._sounds),
+            'memory_bytes': self.memory_bytes,
+            'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+        }
+
+    def _load(self, key, path):
+        try:
+            sound = pygame.mixer.Sound(path)
+        except pygame.error as e:
+            print(f"Could not load cached pronunciation {path}: {e}")
+            return None
+        self._insert(key, sound)
+        return sound
+
+    def _sound_size(self, sound):
+        frequency, size, channels = pygame.mixer.get_init()
+        return int(sound.get_length() * frequency) * channels * (abs(size) // 8)
+
+    def _insert(self, key, sound):
+        size = self._sound_size(sound)
+        with self._lock:
+            old = self._sounds.pop(key, None)
+            if old is not None:
+                self.memory_bytes -= old[1]
+            self._sounds[key] = (sound, size)
+            self.memory_bytes += size
+
+            # Evict least recently used sounds, never the one just inserted
+            while self.memory_bytes > self.max_memory_bytes and len(self._sounds) > 1:
+                _, (_, evicted_size) = self._sounds.popitem(last=False)
+                self.memory_bytes -= evicted_size
+                self.evictions += 1
@@ -0,0 +1,70 @@
+"""
+Scheduler - Heap of timed callbacks that replaces pygame timer events for game transitions
+"""
+
+import heapq
+import itertools
+
+
+class Scheduler:
+    """Runs callbacks once their due time (in clock milliseconds) has passed.
+
+    Tasks are named; scheduling a name that is already pending replaces it,
+    the way pygame.time.set_timer replaces the timer for an event type.
+    Cancelled or replaced entries stay in the heap and are skipped when popped.
+    """
+
+    def __init__(self, clock):
+        self.clock = clock
+        self._heap = []
+        self._sequence = itertools.count()
+        self._pending = {}
+
+    def schedule(self, name, delay_ms, callback):
+        """Run callback after delay_ms, replacing any pending task with the same name"""
+        self.cancel(name)
+        entry = [self.clock() + delay_ms, next(self._sequence), name, callback]
+        self._pending[name] = entry
+        heapq.heappush(self._heap, entry)
+
+    def cancel(self, name):
+        """Drop the pending task with this name, if any"""
+        entry = self._pending.pop(name, None)
+        if entry is not None:
+            entry[3] = None
+
+    def cancel_all(self):
+        """Drop every pending task"""
+        self._heap.clear()
+        self._pending.clear()
+
+    def is_pending(self, name):
+        """Return True if a task with this name is waiting to run"""
+        return name in self._pending
+
+    def run_due(self, now=None):
+        """Run every task whose due time has passed, earliest first; returns how many ran"""
+        if now is None:
+            now = self.clock()
+        ran = 0
+        while self._heap and self._heap[0][0] <= now:
+            _, _, name, callback = heapq.heappop(self._heap)
+            if callback is None:
+                continue
+            del self._pending[name]
+            callback()
+            ran += 1
+        return ran
+
+    def time_until_next(self, now=None):
+        """Milliseconds until the next pending task is due, or None if nothing is pending"""
+        while self._heap and self._heap[0][3] is None:
+            heapq.heappop(self._heap)
+        if not self._heap:
+            return None
+        if now is None:
+            now = self.clock()
+        return max(0, self._heap[0][0] - now)
+
+    def __len__(self):
+        return len(self._pending)
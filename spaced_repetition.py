@@ -0,0 +1,169 @@
+"""
+Spaced Repetition - Leitner-box learner model that brings missed and slow words back on a schedule
+"""
+
+import heapq
+import itertools
+import json
+import os
+
+
+class WordRecord:
+    """What the learner model knows about one word"""
+
+    __slots__ = ('word', 'level', 'box', 'due', 'attempts', 'lapses', 'last_response_time')
+
+    def __init__(self, word, level=1, box=1, due=0, attempts=0, lapses=0, last_response_time=None):
+        self.word = word
+        self.level = level
+        self.box = box
+        self.due = due
+        self.attempts = attempts
+        self.lapses = lapses
+        self.last_response_time = last_response_time
+
+
+class LeitnerScheduler:
+    """Leitner boxes over a heap of review words keyed by due turn.
+
+    Time is counted in turns (answered words), so the schedule follows the
+    player's pace rather than the wall clock.  Only missed or slow words are
+    enrolled.  A miss sends a word back to box 1; a correct but slow answer
+    keeps it in its box; a quick correct answer moves it up one box, or
+    retires it from the top box.  Each box has a longer review interval.
+
+    Words keep the level they were first dealt at, with one heap per level,
+    so pop_due() can leave out words above the level being played.  It
+    returns the most overdue eligible word in O(levels * log n); superseded
+    heap entries are skipped lazily when they reach the top.
+    """
+
+    # Turns until a word in box 1, 2, ... comes back
+    DEFAULT_INTERVALS = (3, 8, 20, 50, 120)
+
+    def __init__(self, intervals=DEFAULT_INTERVALS, slow_seconds=8.0):
+        self.intervals = tuple(intervals)
+        self.slow_seconds = slow_seconds
+        self.turn = 0
+        self.records = {}
+        self._heaps = {}  # level -> [(due turn, sequence, word)]
+        self._sequence = itertools.count()
+        self._out = {}   # word -> due turn, for words popped but not answered yet
+
+    def __len__(self):
+        return len(self.records)
+
+    def __contains__(self, word):
+        return word in self.records
+
+    def record_attempt(self, word, correct, response_time, level=1):
+        """Update the word's box from one answer and schedule its next review.
+
+        level is only used when the word is enrolled; it stays with the word.
+        """
+        self._out.pop(word, None)
+        self.turn += 1
+        quick = correct and (response_time is None or response_time <= self.slow_seconds)
+        record = self.records.get(word)
+        if record is None:
+            if quick:
+                return
+            record = self.records[word] = WordRecord(word, level)
+        record.attempts += 1
+        record.last_response_time = response_time
+
+        if not correct:
+            record.box = 1
+            record.lapses += 1
+        elif quick:
+            if record.box == len(self.intervals):
+                # Learned; its heap entries are skipped as stale
+                del self.records[word]
+                return
+            record.box += 1
+        self.schedule(record, self.turn + self.intervals[record.box - 1])
+
+    def schedule(self, record, due):
+        """Set a record's due turn and push it onto its level's heap"""
+        record.due = due
+        heap = self._heaps.setdefault(record.level, [])
+        heapq.heappush(heap, (due, next(self._sequence), record.word))
+
+    def get_top(self, heap):
+        """Current top entry of a heap after dropping superseded ones, or None"""
+        while heap:
+            due, _, word = heap[0]
+            record = self.records.get(word)
+            if record is not None and record.due == due and word not in self._out:
+                return heap[0]
+            # Rescheduled or retired since this entry was pushed
+            heapq.heappop(heap)
+        return None
+
+    def pop_due(self, max_level=None):
+        """Take the most overdue review word at or below max_level, or None if nothing is due yet"""
+        best = None
+        for level, heap in self._heaps.items():
+            if max_level is not None and level > max_level:
+                continue
+            top = self.get_top(heap)
+            if top is not None and top[0] <= self.turn and (best is None or top < best[1]):
+                best = (heap, top)
+        if best is None:
+            return None
+        due, _, word = heapq.heappop(best[0])
+        self._out[word] = due
+        return word
+
+    def put_back(self, word):
+        """Return a popped word that was never shown; False if the word did not come from here"""
+        due = self._out.pop(word, None)
+        if due is None:
+            return False
+        self.schedule(self.records[word], due)
+        return True
+
+    def peek_due_turn(self):
+        """Turn at which the next review falls due, or None"""
+        tops = [top for top in map(self.get_top, self._heaps.values()) if top is not None]
+        return min(tops)[0] if tops else None
+
+    def get_stats(self):
+        """Words per box and how many reviews are due now"""
+        boxes = [0] * len(self.intervals)
+        due = 0
+        for record in self.records.values():
+            boxes[record.box - 1] += 1
+            if record.due <= self.turn:
+                due += 1
+        return {'words': len(self.records), 'turn': self.turn, 'boxes': boxes, 'due': due}
+
+    def save(self, path):
+        """Write the learner model as JSON (atomically)"""
+        data = {
+            'turn': self.turn,
+            'words': [[r.word, r.box, r.due, r.attempts, r.lapses, r.last_response_time, r.level]
+                      for r in self.records.values()],
+        }
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path, **options):
+        """Scheduler restored from save(), or a fresh one if the file is missing or unreadable"""
+        scheduler = cls(**options)
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return scheduler
+        scheduler.turn = data.get('turn', 0)
+        for word, box, due, attempts, lapses, last_response_time, *level in data.get('words', []):
+            # Schedules saved before levels were recorded review their words at every level
+            record = WordRecord(word, level[0] if level else 1, min(max(box, 1), len(scheduler.intervals)),
+                                due, attempts, lapses, last_response_time)
+            scheduler.records[word] = record
+            scheduler.schedule(record, due)
+        return scheduler
@@ -0,0 +1,251 @@
+"""
+Speech Worker - Runs text-to-speech on a background thread so the game loop never waits on speech
+"""
+
+import itertools
+import queue
+import threading
+import time
+from collections import deque
+
+
+class Utterance:
+    """A single speech request and its queued -> started -> finished timestamps"""
+
+    def __init__(self, utterance_id, text, generation):
+        self.id = utterance_id
+        self.text = text
+        self.generation = generation
+        self.queued_at = time.perf_counter()
+        self.started_at = None
+        self.finished_at = None
+        self.cancelled = False
+
+    @property
+    def queue_latency(self):
+        """Seconds between queueing and the engine starting to speak"""
+        if self.started_at is None:
+            return None
+        return self.started_at - self.queued_at
+
+    @property
+    def speak_duration(self):
+        """Seconds the engine spent speaking"""
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+    @property
+    def total_latency(self):
+        """Seconds from queueing until speech finished"""
+        if self.finished_at is None:
+            return None
+        return self.finished_at - self.queued_at
+
+
+class SpeechWorker:
+    """Owns the TTS engine on a dedicated thread and serves a command queue.
+
+    The engine is created inside the worker thread because pyttsx3 engines
+    must be driven from the thread that created them.  Commands are
+    speak, cancel and replace-current; none of them block the caller.
+
+    When a PronunciationCache is given, each word is rendered to a file once
+    and later requests just play the cached Sound.  Prefetch commands render
+    upcoming words into the cache while the worker is otherwise idle.
+    """
+
+    # Command priorities: lower runs first
+    PRIORITY_STOP = 0
+    PRIORITY_SPEAK = 1
+    PRIORITY_PREFETCH = 2
+
+    # How often playback of a cached Sound is checked for cancellation
+    PLAYBACK_POLL_SECONDS = 0.01
+
+    def __init__(self, engine_factory, on_error=None, history_size=100, cache=None, channel=None):
+        self.engine_factory = engine_factory
+        self.on_error = on_error
+        self.cache = cache
+        self.channel = channel
+        self.available = False
+        self.voice_settings = None
+
+        self._commands = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._ids = itertools.count(1)
+        self._pending_prefetch = set()
+        self._generation = 0
+        self._current = None
+        self._ready = threading.Event()
+        self._thread = None
+        self._engine = None
+
+        # Finished (or cancelled) utterances, newest last
+        self.history = deque(maxlen=history_size)
+
+    def start(self, timeout=5.0):
+        """Start the worker thread and wait for the engine to initialize"""
+        self._thread = threading.Thread(target=self._run, name="speech-worker", daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout)
+        return self.available
+
+    def speak(self, text):
+        """Queue text to be spoken after anything already queued"""
+        utterance = Utterance(next(self._ids), text, self._generation)
+        self._put(self.PRIORITY_SPEAK, "speak", utterance)
+        return utterance
+
+    def prefetch(self, text):
+        """Render text into the cache in the background without playing it"""
+        if self.cache is None or text in self._pending_prefetch:
+            return
+        self._pending_prefetch.add(text)
+        self._put(self.PRIORITY_PREFETCH, "prefetch", text)
+
+    def cancel(self):
+        """Stop the current utterance and drop everything still queued"""
+        # Bumping the generation invalidates every utterance queued so far;
+        # the worker checks it before speaking and from the word callback.
+        self._generation += 1
+
+    def replace_current(self, text):
+        """Cancel whatever is playing or queued and speak text instead"""
+        self.cancel()
+        return self.speak(text)
+
+    def stop(self, timeout=1.0):
+        """Shut down the worker thread"""
+        self.cancel()
+        self._put(self.PRIORITY_STOP, "stop", None)
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def is_busy(self):
+        """Return True while an utterance is being spoken"""
+        return self._current is not None
+
+    def get_latency_stats(self):
+        """Summarize queued -> started -> finished latency over recent utterances"""
+        spoken = [u for u in self.history if not u.cancelled and u.total_latency is not None]
+        stats = {
+            'utterances': len(spoken),
+            'cancelled': sum(1 for u in self.history if u.cancelled),
+        }
+        for name in ('queue_latency', 'speak_duration', 'total_latency'):
+            values = sorted(getattr(u, name) for u in spoken)
+            if values:
+                stats[name] = {
+                    'avg': sum(values) / len(values),
+                    'max': values[-1],
+                    'p95': values[min(len(values) - 1, int(len(values) * 0.95))],
+                }
+        return stats
+
+    def _put(self, priority, command, payload):
+        # The sequence number keeps FIFO order within a priority
+        self._commands.put((priority, next(self._sequence), command, payload))
+
+    def _is_stale(self, utterance):
+        return utterance.generation < self._generation
+
+    def _on_started_word(self, name, location, length):
+        # Called by the engine while speaking; the only safe place to stop it
+        current = self._current
+        if current is not None and self._is_stale(current):
+            self._engine.stop()
+
+    def _prefetch(self, text):
+        """Render text into the cache unless it is already there"""
+        self._pending_prefetch.discard(text)
+        key = self.cache.make_key(text, *self.voice_settings)
+        if self.cache.contains(key):
+            return
+        try:
+            self.cache.render(key, lambda path: self._render_to_file(text, path))
+        except Exception as e:
+            print(f"TTS prefetch error: {e}")
+
+    def _get_cached_sound(self, text):
+        """Look text up in the cache, rendering it to disk on a miss"""
+        if self.cache is None:
+            return None
+        key = self.cache.make_key(text, *self.voice_settings)
+        sound = self.cache.get(key)
+        if sound is None:
+            sound = self.cache.render(key, lambda path: self._render_to_file(text, path))
+        return sound
+
+    def _render_to_file(self, text, path):
+        self._engine.save_to_file(text, path)
+        self._engine.runAndWait()
+
+    def _play_sound(self, sound, utterance):
+        """Play a cached Sound and wait (on this thread) until it ends or is cancelled"""
+        if self.channel is not None:
+            channel = self.channel
+            channel.play(sound)
+        else:
+            channel = sound.play()
+        if channel is None:
+            return
+        while channel.get_busy():
+            if self._is_stale(utterance):
+                channel.stop()
+                break
+            time.sleep(self.PLAYBACK_POLL_SECONDS)
+
+    def _run(self):
+        try:
+            self._engine = self.engine_factory()
+            self._engine.connect('started-word', self._on_started_word)
+            self.voice_settings = (
+                self._engine.getProperty('voice'),
+                self._engine.getProperty('rate'),
+                self._engine.getProperty('volume'),
+            )
+            self.available = True
+        except Exception as e:
+            print(f"TTS not available: {e}")
+            self.available = False
+        finally:
+            self._ready.set()
+
+        if not self.available:
+            return
+
+        while True:
+            _, _, command, utterance = self._commands.get()
+            if command == "stop":
+                break
+            if command == "prefetch":
+                self._prefetch(utterance)
+                continue
+
+            if self._is_stale(utterance):
+                utterance.cancelled = True
+                self.history.append(utterance)
+                continue
+
+            self._current = utterance
+            try:
+                # A cache miss renders here, so "started" is when audio begins
+                sound = self._get_cached_sound(utterance.text)
+                utterance.started_at = time.perf_counter()
+                if sound is not None:
+                    if not self._is_stale(utterance):
+                        self._play_sound(sound, utterance)
+                else:
+                    self._engine.say(utterance.text)
+                    self._engine.runAndWait()
+            except Exception as e:
+                print(f"TTS error: {e}")
+                if self.on_error:
+                    self.on_error(utterance.text)
+            if utterance.started_at is None:
+                utterance.started_at = time.perf_counter()
+            utterance.finished_at = time.perf_counter()
+            utterance.cancelled = self._is_stale(utterance)
+            self._current = None
+            self.history.append(utterance)
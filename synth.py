@@ -0,0 +1,143 @@
+"""
+Synth - Vectorized NumPy tone generation and a cache of ready-to-play mixer Sounds
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+import pygame
+
+WAVEFORMS = ('sine', 'square', 'saw')
+
+# Peak level of generated tones, as a fraction of full scale
+DEFAULT_AMPLITUDE = 0.25
+
+
+def get_mixer_format():
+    """Return (sample_rate, size, channels) of the initialized mixer"""
+    init = pygame.mixer.get_init()
+    if init is None:
+        raise pygame.error("mixer not initialized")
+    return init
+
+
+def oscillator(waveform, frequency, duration, sample_rate, phase=0.0):
+    """Generate one channel of a waveform in the range [-1, 1] as float32"""
+    frames = int(duration * sample_rate)
+    # Phase in cycles; the fractional part drives every waveform shape
+    cycles = phase + frequency * np.arange(frames, dtype=np.float64) / sample_rate
+    if waveform == 'sine':
+        samples = np.sin(2 * np.pi * cycles)
+    elif waveform == 'square':
+        samples = np.where(cycles % 1.0 < 0.5, 1.0, -1.0)
+    elif waveform == 'saw':
+        samples = 2.0 * (cycles % 1.0) - 1.0
+    else:
+        raise ValueError(f"Unknown waveform: {waveform}")
+    return samples.astype(np.float32)
+
+
+def adsr_envelope(frames, sample_rate, attack=0.005, decay=0.0, sustain=1.0, release=0.02):
+    """Build an attack/decay/sustain/release gain curve for frames samples"""
+    attack_end = min(frames, int(attack * sample_rate))
+    decay_end = min(frames, attack_end + int(decay * sample_rate))
+    release_start = max(decay_end, frames - int(release * sample_rate))
+    points = [0, attack_end, decay_end, release_start, frames]
+    gains = [0.0, 1.0, sustain, sustain, 0.0]
+    return np.interp(np.arange(frames), points, gains).astype(np.float32)
+
+
+def to_sound(samples, volume=None):
+    """Convert mono float samples in [-1, 1] to a Sound in the mixer's format"""
+    _, size, channels = get_mixer_format()
+    samples = np.clip(samples, -1.0, 1.0)
+
+    if abs(size) == 32:
+        # SDL's 32-bit mixer format is float
+        data = samples.astype(np.float32)
+    else:
+        bits = abs(size)
+        scale = 2 ** (bits - 1) - 1
+        data = (samples * scale).astype({8: np.int8, 16: np.int16}[bits])
+        if size > 0:
+            # Unsigned formats are offset to the middle of their range
+            data = (data.astype(np.int32) + scale + 1).astype({8: np.uint8, 16: np.uint16}[bits])
+
+    if channels > 1:
+        data = np.repeat(data[:, np.newaxis], channels, axis=1)
+    sound = pygame.sndarray.make_sound(np.ascontiguousarray(data))
+    if volume is not None:
+        sound.set_volume(volume)
+    return sound
+
+
+def render_tone(frequency, duration, waveform='sine', sample_rate=None, amplitude=DEFAULT_AMPLITUDE):
+    """Render a single enveloped tone as mono float samples"""
+    if sample_rate is None:
+        sample_rate = get_mixer_format()[0]
+    samples = oscillator(waveform, frequency, duration, sample_rate)
+    samples *= adsr_envelope(len(samples), sample_rate)
+    return samples * amplitude
+
+
+def render_sequence(frequencies, note_duration, gap, waveform='sine', sample_rate=None,
+                    amplitude=DEFAULT_AMPLITUDE):
+    """Mix a series of enveloped notes, one every note_duration + gap seconds, into one buffer"""
+    if sample_rate is None:
+        sample_rate = get_mixer_format()[0]
+    step = int((note_duration + gap) * sample_rate)
+    note_frames = int(note_duration * sample_rate)
+    if not frequencies or note_frames <= 0:
+        return np.zeros(0, dtype=np.float32)
+
+    total_frames = step * (len(frequencies) - 1) + note_frames
+    buffer = np.zeros(total_frames, dtype=np.float32)
+    envelope = adsr_envelope(note_frames, sample_rate)
+
+    # Notes with the same pitch share one rendered waveform
+    notes = {}
+    for index, frequency in enumerate(frequencies):
+        note = notes.get(frequency)
+        if note is None:
+            note = notes[frequency] = oscillator(waveform, frequency, note_duration, sample_rate)[:note_frames] * envelope
+        start = index * step
+        buffer[start:start + note_frames] += note
+    return buffer * amplitude
+
+
+class ToneBank:
+    """Cache of generated Sounds keyed by (frequency, duration, waveform, volume)"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._sounds = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, frequency, duration, waveform='sine', volume=1.0):
+        """Return a cached Sound for the tone, generating it on first use"""
+        key = (frequency, duration, waveform, volume)
+        return self._get_or_render(key, volume, lambda: render_tone(frequency, duration, waveform))
+
+    def get_sequence(self, frequencies, note_duration, gap, waveform='sine', volume=1.0):
+        """Return a cached Sound of a whole note sequence, rendering it on first use"""
+        key = (tuple(frequencies), note_duration, gap, waveform, volume)
+        return self._get_or_render(key, volume, lambda: render_sequence(frequencies, note_duration, gap, waveform))
+
+    def get_stats(self):
+        """Hit/miss counters"""
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._sounds)}
+
+    def _get_or_render(self, key, volume, render):
+        sound = self._sounds.get(key)
+        if sound is not None:
+            self._sounds.move_to_end(key)
+            self.hits += 1
+            return sound
+
+        self.misses += 1
+        sound = to_sound(render(), volume)
+        self._sounds[key] = sound
+        if len(self._sounds) > self.max_entries:
+            self._sounds.popitem(last=False)
+        return sound
@@ -0,0 +1,63 @@
+"""
+Text Cache - Keeps rendered text surfaces so unchanged labels are not rasterized every frame
+"""
+
+from collections import OrderedDict
+
+import pygame
+
+
+class TextCache:
+    """LRU cache of rendered text keyed by (text, font, color, antialias)"""
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._surfaces = OrderedDict()
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.frame_misses = 0
+        self._frame_start_misses = 0
+
+    def render(self, text, font, color, antialias=True):
+        """Return the rendered surface for text, rasterizing it only on a miss"""
+        key = (text, font, tuple(color), antialias)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        if pygame.display.get_surface() is not None:
+            # Match the display pixel format so blits need no conversion
+            surface = surface.convert_alpha()
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.max_entries:
+            self._surfaces.popitem(last=False)
+            self.evictions += 1
+        return surface
+
+    def begin_frame(self):
+        """Mark the start of a frame; frame_misses then counts the previous frame's rasterizations"""
+        self.frame_misses = self.misses - self._frame_start_misses
+        self._frame_start_misses = self.misses
+
+    def clear(self):
+        """Drop all cached surfaces"""
+        self._surfaces.clear()
+
+    def get_stats(self):
+        """Hit/miss/eviction counters and hit rate"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self._surfaces),
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'frame_misses': self.frame_misses,
+        }
@@ -3,6 +3,8 @@ UI Manager - Handles all user interface rendering
 """
 
 import pygame
+from text_cache import TextCache
+from engine import INPUT_OTHER_WORD, INPUT_OFF_TRACK
 
 class UIManager:
     def __init__(self, screen):
@@ -15,6 +17,16 @@ class UIManager:
         self.large_font = pygame.font.Font(None, 48)
         self.medium_font = pygame.font.Font(None, 36)
         self.small_font = pygame.font.Font(None, 24)
+        self.debug_font = None  # Looked up on first use; SysFont scans the installed fonts
+        
+        # Rendered text is cached; most labels are identical from frame to frame
+        self.text_cache = TextCache()
+        
+        # Pre-composited static layers: name -> (inputs, surface, rect)
+        self.layers = {}
+        
+        # Dynamic widget content and area from the last frame, for dirty-rect rendering
+        self.widget_states = {}
         
         # Colors
         self.WHITE = (255, 255, 255)
@@ -25,33 +37,91 @@ class UIManager:
         self.YELLOW = (255, 255, 0)
         self.GRAY = (128, 128, 128)
         self.LIGHT_BLUE = (173, 216, 230)
+        self.ORANGE = (220, 120, 0)
+        
+        # Color of typed letters past the last one matching the word, by engine INPUT_* status
+        self.INPUT_MISMATCH_COLORS = {INPUT_OTHER_WORD: self.ORANGE, INPUT_OFF_TRACK: self.RED}
+        
+        self.DIFFICULTY_NAMES = {1: "Easy", 2: "Basic", 3: "Intermediate", 4: "Advanced", 5: "Expert"}
         
-    def draw_text_centered(self, text, font, color, y_pos):
-        """Draw text centered horizontally on screen"""
-        text_surface = font.render(text, True, color)
+    def draw_text_centered(self, text, font, color, y_pos, surface=None):
+        """Draw text centered horizontally on screen (or on surface)"""
+        target = surface or self.screen
+        text_surface = self.text_cache.render(text, font, color)
         text_rect = text_surface.get_rect()
         text_rect.centerx = self.screen_width // 2
         text_rect.y = y_pos
-        self.screen.blit(text_surface, text_rect)
+        target.blit(text_surface, text_rect)
         return text_rect
         
-    def draw_text(self, text, font, color, x, y):
-        """Draw text at specific position"""
-        text_surface = font.render(text, True, color)
-        self.screen.blit(text_surface, (x, y))
+    def draw_text(self, text, font, color, x, y, surface=None):
+        """Draw text at specific position on screen (or on surface)"""
+        target = surface or self.screen
+        text_surface = self.text_cache.render(text, font, color)
+        target.blit(text_surface, (x, y))
         return text_surface.get_rect(topleft=(x, y))
         
+    def get_layer(self, name, inputs, build):
+        """Return (surface, rect) of a baked static layer, rebuilding it only when inputs change.
+        
+        build(surface) draws the layer's content onto a transparent
+        screen-sized surface; the result is cropped to what was drawn and
+        converted to the display format so each frame costs a single blit.
+        """
+        cached = self.layers.get(name)
+        if cached is not None and cached[0] == inputs:
+            return cached[1], cached[2]
+            
+        surface = pygame.Surface((self.screen_width, self.screen_height), pygame.SRCALPHA)
+        build(surface)
+        rect = surface.get_bounding_rect()
+        surface = surface.subsurface(rect).copy()
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+        self.layers[name] = (inputs, surface, rect)
+        return surface, rect
+        
+    def draw_layer(self, name, inputs, build):
+        """Blit a baked static layer to the screen"""
+        surface, rect = self.get_layer(name, inputs, build)
+        self.screen.blit(surface, rect)
+        return rect
+        
+    def invalidate_layers(self):
+        """Drop all baked layers so they are rebuilt on next use"""
+        self.layers.clear()
+        
+    def draw_overlay(self, surface):
+        """Fill a layer with the semi-transparent backdrop used by full-screen menus"""
+        surface.fill((self.BLACK[0], self.BLACK[1], self.BLACK[2], 128))
+        
+    def draw_debug_overlay(self, lines):
+        """Draw diagnostic text lines on a dark panel in the top-left corner"""
+        if self.debug_font is None:
+            self.debug_font = pygame.font.SysFont("monospace", 14)
+            
+        # Values change every frame, so they are rendered directly instead of through the text cache
+        line_height = self.debug_font.get_linesize()
+        surfaces = [self.debug_font.render(line, True, self.YELLOW) for line in lines]
+        width = max(surface.get_width() for surface in surfaces) + 12
+        panel = pygame.Surface((width, line_height * len(lines) + 12), pygame.SRCALPHA)
+        self.draw_overlay(panel)
+        self.screen.blit(panel, (8, 8))
+        for index, surface in enumerate(surfaces):
+            self.screen.blit(surface, (14, 14 + index * line_height))
+            
     def draw_menu(self):
         """Draw main menu screen"""
+        self.draw_layer("menu", None, self.build_menu_layer)
+        
+    def build_menu_layer(self, surface):
+        """Bake the menu overlay, title and instructions"""
         # Semi-transparent overlay
-        overlay = pygame.Surface((self.screen_width, self.screen_height))
-        overlay.set_alpha(128)
-        overlay.fill(self.BLACK)
-        self.screen.blit(overlay, (0, 0))
+        self.draw_overlay(surface)
         
         # Title
-        self.draw_text_centered("SPELLING BEE", self.title_font, self.YELLOW, 150)
-        self.draw_text_centered("Educational Typing Game", self.medium_font, self.WHITE, 230)
+        self.draw_text_centered("SPELLING BEE", self.title_font, self.YELLOW, 150, surface)
+        self.draw_text_centered("Educational Typing Game", self.medium_font, self.WHITE, 230, surface)
         
         # Instructions
         instructions = [
@@ -70,10 +140,10 @@ class UIManager:
         y_pos = 320
         for instruction in instructions:
             if instruction:
-                self.draw_text_centered(instruction, self.small_font, self.WHITE, y_pos)
+                self.draw_text_centered(instruction, self.small_font, self.WHITE, y_pos, surface)
             y_pos += 30
             
-    def draw_game_ui(self, score, lives, user_input, current_word, feedback_message, feedback_color, time_remaining=None, difficulty_level=1, hint_text=""):
+    def draw_game_ui(self, score, lives, user_input, current_word, feedback_message, feedback_color, time_remaining=None, difficulty_level=1, hint_text="", input_status=None):
         """Draw game playing UI"""
         # Score and lives display
         score_text = f"Score: {score}"
@@ -89,8 +159,7 @@ class UIManager:
             pygame.draw.circle(self.screen, color, (heart_x + i * 25, 35), 8)
             
         # Draw difficulty level
-        difficulty_names = {1: "Easy", 2: "Basic", 3: "Intermediate", 4: "Advanced", 5: "Expert"}
-        difficulty_text = f"Level: {difficulty_names.get(difficulty_level, 'Unknown')}"
+        difficulty_text = f"Level: {self.DIFFICULTY_NAMES.get(difficulty_level, 'Unknown')}"
         self.draw_text(difficulty_text, self.small_font, self.YELLOW, 20, 60)
         
         # Draw timer if provided
@@ -99,25 +168,21 @@ class UIManager:
             time_text = f"Time: {int(time_remaining)}s"
             self.draw_text(time_text, self.medium_font, time_color, self.screen_width - 150, 60)
             
-        # Instructions
-        instruction_text = "Listen and type the word you hear (SPACE to replay, H for hint)"
-        self.draw_text_centered(instruction_text, self.small_font, self.LIGHT_BLUE, 100)
+        # Static instructions, input box and controls reminder
+        self.draw_layer("game_chrome", None, self.build_game_chrome_layer)
         
         # Show hint if available
         if hint_text:
             self.draw_text_centered(hint_text, self.small_font, self.YELLOW, 120)
         
-        # User input display
-        input_bg_rect = pygame.Rect(self.screen_width // 2 - 200, 200, 400, 60)
-        pygame.draw.rect(self.screen, self.WHITE, input_bg_rect)
-        pygame.draw.rect(self.screen, self.BLACK, input_bg_rect, 3)
-        
-        # Display user input with cursor
-        display_text = user_input + "|"
-        input_surface = self.large_font.render(display_text, True, self.BLACK)
-        input_rect = input_surface.get_rect()
-        input_rect.center = input_bg_rect.center
-        self.screen.blit(input_surface, input_rect)
+        # Display user input with cursor; letters past the matching part are colored by how far off they are
+        pieces = self.get_input_pieces(user_input, input_status)
+        x, y = self.get_input_text_rect(pieces).topleft
+        for text, color in pieces:
+            if text:
+                piece_surface = self.text_cache.render(text, self.large_font, color)
+                self.screen.blit(piece_surface, (x, y))
+                x += piece_surface.get_width()
         
         # Show current word if revealed
         if current_word:
@@ -128,27 +193,115 @@ class UIManager:
         if feedback_message:
             self.draw_text_centered(feedback_message, self.medium_font, feedback_color, 350)
             
+    def layout_game_ui(self, score, lives, user_input, current_word, feedback_message, feedback_color, time_remaining=None, difficulty_level=1, hint_text="", input_status=None):
+        """Content and screen area of each dynamic game UI widget, without drawing anything"""
+        lives_rect = self.get_text_rect(f"Lives: {lives}", self.medium_font, self.screen_width - 150, 20)
+        widgets = {
+            'score': (score, self.get_text_rect(f"Score: {score}", self.medium_font, 20, 20)),
+            'lives': (lives, lives_rect.union(self.get_hearts_rect())),
+            'level': (difficulty_level, self.get_text_rect(
+                f"Level: {self.DIFFICULTY_NAMES.get(difficulty_level, 'Unknown')}", self.small_font, 20, 60)),
+        }
+        
+        if time_remaining is not None:
+            time_text = f"Time: {int(time_remaining)}s"
+            widgets['timer'] = ((time_text, time_remaining <= 5),
+                                self.get_text_rect(time_text, self.medium_font, self.screen_width - 150, 60))
+        if hint_text:
+            widgets['hint'] = (hint_text, self.get_centered_text_rect(hint_text, self.small_font, 120))
+            
+        widgets['input'] = ((user_input, input_status),
+                            self.get_input_text_rect(self.get_input_pieces(user_input, input_status)))
+        
+        if current_word:
+            word_text = f"Word: {current_word}"
+            widgets['word'] = (word_text, self.get_centered_text_rect(word_text, self.medium_font, 280))
+        if feedback_message:
+            widgets['feedback'] = ((feedback_message, tuple(feedback_color)),
+                                   self.get_centered_text_rect(feedback_message, self.medium_font, 350))
+        return widgets
+        
+    def get_dirty_rects(self, widgets):
+        """Areas of widgets whose content changed since the previous call"""
+        dirty = []
+        for name in widgets.keys() | self.widget_states.keys():
+            current = widgets.get(name)
+            previous = self.widget_states.get(name)
+            if current is not None and previous is not None and current[0] == previous[0]:
+                continue
+            # Both the old and the new extent of a changed widget must be repainted
+            for state in (previous, current):
+                if state is not None:
+                    dirty.append(state[1])
+        self.widget_states = widgets
+        return dirty
+        
+    def reset_dirty_tracking(self):
+        """Forget widget state, e.g. after a full redraw of another screen"""
+        self.widget_states = {}
+        
+    def get_text_rect(self, text, font, x, y):
+        """Area draw_text would cover, measured without rendering"""
+        return pygame.Rect((x, y), font.size(text))
+        
+    def get_centered_text_rect(self, text, font, y_pos):
+        """Area draw_text_centered would cover, measured without rendering"""
+        rect = pygame.Rect((0, y_pos), font.size(text))
+        rect.centerx = self.screen_width // 2
+        return rect
+        
+    def get_hearts_rect(self):
+        """Area covered by the three life hearts"""
+        heart_x = self.screen_width - 100
+        return pygame.Rect(heart_x - 8, 35 - 8, 2 * 25 + 17, 17)
+        
+    def get_input_pieces(self, user_input, input_status):
+        """(text, color) pieces of the typed text and cursor: the part matching the word, the rest, the cursor"""
+        matched, kind = input_status if input_status is not None else (len(user_input), None)
+        return [(user_input[:matched], self.BLACK),
+                (user_input[matched:], self.INPUT_MISMATCH_COLORS.get(kind, self.BLACK)),
+                ("|", self.BLACK)]
+        
+    def get_input_text_rect(self, pieces):
+        """Area of the input pieces, drawn side by side and centered in the input box"""
+        sizes = [self.large_font.size(text) for text, _ in pieces if text]
+        rect = pygame.Rect(0, 0, sum(width for width, _ in sizes), max(height for _, height in sizes))
+        rect.center = self.get_input_box_rect().center
+        return rect
+        
+    def get_input_box_rect(self):
+        """Screen rectangle of the answer input box"""
+        return pygame.Rect(self.screen_width // 2 - 200, 200, 400, 60)
+        
+    def build_game_chrome_layer(self, surface):
+        """Bake the in-game content that never changes"""
+        # Instructions
+        instruction_text = "Listen and type the word you hear (SPACE to replay, H for hint)"
+        self.draw_text_centered(instruction_text, self.small_font, self.LIGHT_BLUE, 100, surface)
+        
+        # User input box
+        input_bg_rect = self.get_input_box_rect()
+        pygame.draw.rect(surface, self.WHITE, input_bg_rect)
+        pygame.draw.rect(surface, self.BLACK, input_bg_rect, 3)
+        
         # Controls reminder
         controls_text = "ENTER to submit • SPACE to replay • BACKSPACE to delete"
-        self.draw_text_centered(controls_text, self.small_font, self.GRAY, self.screen_height - 50)
+        self.draw_text_centered(controls_text, self.small_font, self.GRAY, self.screen_height - 50, surface)
         
-    def draw_game_over(self, final_score, words_attempted=0, words_correct=0, accuracy=0, avg_response_time=0, session_time=0):
-        """Draw game over screen with performance statistics"""
-        # Semi-transparent overlay
-        overlay = pygame.Surface((self.screen_width, self.screen_height))
-        overlay.set_alpha(128)
-        overlay.fill(self.BLACK)
-        self.screen.blit(overlay, (0, 0))
+    def draw_game_over(self, final_score, words_attempted=0, words_correct=0, accuracy=0, avg_response_time=0, session_time=0,
+                       history=None):
+        """Draw game over screen with performance statistics and, given an analytics report, long-term progress"""
+        content = self.get_game_over_content(final_score, words_attempted, words_correct,
+                                             accuracy, avg_response_time, session_time, history)
         
-        # Game Over text
-        self.draw_text_centered("GAME OVER", self.title_font, self.RED, 120)
-        
-        # Final score
-        score_text = f"Final Score: {final_score}"
-        self.draw_text_centered(score_text, self.large_font, self.WHITE, 180)
+        # The screen is re-baked only when one of the displayed lines changes
+        self.draw_layer("game_over", content,
+                        lambda surface: self.build_game_over_layer(surface, *content))
         
+    def get_game_over_content(self, final_score, words_attempted=0, words_correct=0, accuracy=0, avg_response_time=0, session_time=0,
+                              history=None):
+        """Lines shown on the game over screen as (final_score, stats, message, benefits, progress)"""
         # Performance statistics
-        y_pos = 230
         stats = [
             f"Words Attempted: {words_attempted}",
             f"Words Correct: {words_correct}",
@@ -157,10 +310,6 @@ class UIManager:
             f"Session Duration: {session_time/60:.1f} minutes"
         ]
         
-        for stat in stats:
-            self.draw_text_centered(stat, self.medium_font, self.LIGHT_BLUE, y_pos)
-            y_pos += 35
-        
         # Performance message based on accuracy and score
         if accuracy >= 90 and final_score >= 300:
             message = "Outstanding! You're a true Spelling Bee master!"
@@ -173,12 +322,6 @@ class UIManager:
         else:
             message = "Keep practicing! You're learning and getting better!"
             
-        self.draw_text_centered(message, self.medium_font, self.YELLOW, y_pos + 20)
-        
-        # Educational value summary
-        educational_text = "Educational Benefits Achieved:"
-        self.draw_text_centered(educational_text, self.small_font, self.WHITE, y_pos + 70)
-        
         benefits = []
         if words_correct > 5:
             benefits.append("✓ Vocabulary Expansion")
@@ -189,10 +332,60 @@ class UIManager:
         if session_time > 60:
             benefits.append("✓ Sustained Learning Focus")
             
+        return (final_score, tuple(stats), message, tuple(benefits), self.get_progress_lines(history))
+        
+    def get_progress_lines(self, report):
+        """Long-term progress from an analytics.AttemptAnalytics report, as a few short lines"""
+        if not report or not report['sessions']:
+            return ()
+        lines = [f"All sessions: {report['accuracy']:.0f}% of {report['attempts']:,} words, "
+                 f"median {report['response_time_p50']:.1f}s, 90% under {report['response_time_p90']:.1f}s"]
+        if report['levels']:
+            lines.append("By level: " + "  ".join(f"{level['name'].title()} {level['accuracy']:.0f}%"
+                                                   for level in report['levels']))
+        if report['previous_accuracy'] is not None:
+            lines.append(f"Last {report['curve_window']} sessions: {report['recent_accuracy']:.0f}% "
+                         f"(before that: {report['previous_accuracy']:.0f}%)")
+        if report['hardest_words']:
+            lines.append("Hardest words: " + ", ".join(word['word'] for word in report['hardest_words'][:4]))
+        return tuple(lines)
+        
+    def build_game_over_layer(self, surface, final_score, stats, message, benefits, progress=()):
+        """Bake the game over overlay and statistics"""
+        # Semi-transparent overlay
+        self.draw_overlay(surface)
+        
+        # Game Over text
+        self.draw_text_centered("GAME OVER", self.title_font, self.RED, 120, surface)
+        
+        # Final score
+        score_text = f"Final Score: {final_score}"
+        self.draw_text_centered(score_text, self.large_font, self.WHITE, 180, surface)
+        
+        # Performance statistics
+        y_pos = 230
+        for stat in stats:
+            self.draw_text_centered(stat, self.medium_font, self.LIGHT_BLUE, y_pos, surface)
+            y_pos += 35
+            
+        self.draw_text_centered(message, self.medium_font, self.YELLOW, y_pos + 20, surface)
+        
+        # Educational value summary
+        educational_text = "Educational Benefits Achieved:"
+        self.draw_text_centered(educational_text, self.small_font, self.WHITE, y_pos + 70, surface)
+        
         benefit_y = y_pos + 100
-        for benefit in benefits:
-            self.draw_text_centered(benefit, self.small_font, self.GREEN, benefit_y)
-            benefit_y += 25
+        if progress:
+            # Benefits share one line to leave room for the progress block
+            self.draw_text_centered("   ".join(benefits), self.small_font, self.GREEN, benefit_y, surface)
+            progress_y = benefit_y + 40
+            for line in progress:
+                self.draw_text_centered(line, self.small_font, self.LIGHT_BLUE, progress_y, surface)
+                progress_y += 24
+        else:
+            for benefit in benefits:
+                self.draw_text_centered(benefit, self.small_font, self.GREEN, benefit_y, surface)
+                benefit_y += 25
         
         # Restart instruction
-        self.draw_text_centered("Press SPACE to play again", self.medium_font, self.WHITE, self.screen_height - 80)
+        self.draw_text_centered("Press SPACE to play again", self.medium_font, self.WHITE, self.screen_height - 80, surface)
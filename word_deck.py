@@ -0,0 +1,95 @@
+"""
+Word Deck - Constant-time random sampling without replacement from one level's word list
+"""
+
+from array import array
+from collections import deque
+
+
+class WordDeck:
+    """Deals every word of a list once per cycle in random order.
+
+    The deck shuffles indices rather than the words themselves, so words
+    can come from any sequence, including a memory-mapped corpus level that
+    decodes a word only when it is dealt.  Drawing swaps a random remaining
+    index to the end of the pool and pops it, so each draw is O(1) whatever
+    the list size.  When the pool runs out it is refilled with a copy of
+    every index, except that the last min_gap words dealt are held back
+    until min_gap more draws have happened, so a word never comes up again
+    within min_gap draws across the boundary.
+    """
+
+    def __init__(self, words, rng, min_gap=1):
+        self.words = words
+        self.size = len(words)
+        self.rng = rng
+        self.min_gap = max(0, min(min_gap, self.size - 1))
+        self.all_indices = array('L', range(self.size))
+        self.pool = array('L')
+        self.draws = 0
+        self.cycles = 0
+
+        # Most recent draws, oldest first: (draw number, index, word)
+        self.recent = deque(maxlen=self.min_gap)
+        # Indices held back at the last refill, oldest first: (draw number they rejoin the pool, index)
+        self.deferred = deque()
+
+    def __len__(self):
+        return self.size
+
+    def remaining(self):
+        """Words still to be dealt in the current cycle"""
+        return len(self.pool) + len(self.deferred)
+
+    def draw(self):
+        """Deal a random word that has not been dealt yet this cycle"""
+        if not self.size:
+            raise IndexError("draw from an empty word deck")
+        while self.deferred and self.deferred[0][0] <= self.draws:
+            self.pool.append(self.deferred.popleft()[1])
+        if not self.pool:
+            if self.deferred:
+                # Very short lists: the gap cannot be kept, release the oldest word early
+                self.pool.append(self.deferred.popleft()[1])
+            else:
+                self.refill()
+
+        pool = self.pool
+        position = self.rng.randrange(len(pool))
+        pool[position], pool[-1] = pool[-1], pool[position]
+        index = pool.pop()
+        word = self.words[index]
+
+        if self.min_gap:
+            self.recent.append((self.draws, index, word))
+        self.draws += 1
+        return word
+
+    def refill(self):
+        """Start a new cycle with every word, holding back the most recent draws"""
+        # Copy the index array and swap-remove the few held indices, rather than filtering every one
+        pool = array('L', self.all_indices)
+        moved = {}
+        for _, index, _ in self.recent:
+            position = moved.get(index, index)
+            last = pool[-1]
+            pool[position] = last
+            moved[last] = position
+            pool.pop()
+        self.pool = pool
+        self.deferred = deque((drawn_at + self.min_gap + 1, index) for drawn_at, index, _ in self.recent)
+        self.cycles += 1
+
+    def put_back(self, word):
+        """Return one of the last min_gap dealt words to the current cycle (e.g. an unshown look-ahead word)"""
+        for entry in self.recent:
+            if entry[2] == word:
+                break
+        else:
+            return
+        index = entry[1]
+        if any(held == index for _, held in self.deferred):
+            # Already waiting to rejoin this cycle
+            return
+        self.recent.remove(entry)
+        self.pool.append(index)
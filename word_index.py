@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Word Index - Compact trie over the playable words, saved to the cache directory and memory-mapped,
+for prefix lookups and prefix counts within a keystroke, and nearest-word search for feedback
+
+File layout (native byte order, recorded in the header):
+    8 bytes   magic b"SBWINDEX"
+    4 bytes   uint32 format version
+    4 bytes   uint32 length of the JSON header
+    ...       JSON header: source key, node, edge and word counts, byte order
+    ...       edge_start: node_count + 1 uint32; the edges of node n are edge_start[n]:edge_start[n + 1]
+    ...       edge_char:  edge_count uint32 code points, sorted within each node
+    ...       edge_child: edge_count uint32 node numbers
+    ...       counts:     node_count uint32, words at or below each node
+    ...       terminal:   node_count bytes, 1 where a word ends
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+from app_paths import get_cache_dir
+from corpus import align, load_word_lists
+from word_manager import LEVEL_NAMES
+
+MAGIC = b"SBWINDEX"
+FORMAT_VERSION = 1
+PREAMBLE = struct.Struct("<8sII")
+
+# Nearest-word search gives up after visiting this many trie nodes, to stay within a frame
+NEAREST_MAX_NODES = 20000
+
+
+def build_arrays(words):
+    """Trie arrays (edge_start, edge_char, edge_child, counts, terminal) for an iterable of words"""
+    children = [[]]  # node -> [(code point, child node)], in code point order
+    counts = array('I', [0])
+    terminal = bytearray(1)
+    for word in sorted(set(words)):
+        node = 0
+        counts[0] += 1
+        for char in word:
+            kids = children[node]
+            code = ord(char)
+            # Words arrive sorted, so a matching child can only be the last one added
+            if kids and kids[-1][0] == code:
+                node = kids[-1][1]
+            else:
+                child = len(children)
+                children.append([])
+                counts.append(0)
+                terminal.append(0)
+                kids.append((code, child))
+                node = child
+            counts[node] += 1
+        terminal[node] = 1
+
+    edge_start = array('I', [0])
+    edge_char = array('I')
+    edge_child = array('I')
+    for kids in children:
+        for code, child in kids:
+            edge_char.append(code)
+            edge_child.append(child)
+        edge_start.append(len(edge_char))
+    return edge_start, edge_char, edge_child, counts, terminal
+
+
+class WordIndex:
+    """Read-only trie over a word list, backed by a memory-mapped file written by save().
+
+    find() walks one edge per letter with a binary search among the node's
+    edges, so prefix queries cost O(len(prefix) * log(alphabet)) whatever
+    the number of words.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, header_size = PREAMBLE.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a word index")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{path} has word index format {version}, expected {FORMAT_VERSION}")
+        self.header = json.loads(self._map[PREAMBLE.size:PREAMBLE.size + header_size].decode('utf-8'))
+        if self.header['byteorder'] != sys.byteorder:
+            raise ValueError(f"{path} was written with {self.header['byteorder']}-endian byte order")
+
+        self.source_key = self.header['source_key']
+        self.node_count = self.header['node_count']
+        self.edge_count = self.header['edge_count']
+        self.word_count = self.header['word_count']
+
+        view = memoryview(self._map)
+        position = align(PREAMBLE.size + header_size, 4)
+        sections = []
+        for length, format_code in ((self.node_count + 1, 'I'), (self.edge_count, 'I'), (self.edge_count, 'I'),
+                                    (self.node_count, 'I'), (self.node_count, 'B')):
+            size = length * (4 if format_code == 'I' else 1)
+            sections.append(view[position:position + size].cast(format_code))
+            position += size
+        self.edge_start, self.edge_char, self.edge_child, self.counts, self.terminal = sections
+
+    @staticmethod
+    def save(path, words, source_key=""):
+        """Build the trie for words and write it atomically"""
+        edge_start, edge_char, edge_child, counts, terminal = build_arrays(words)
+        header = json.dumps({'source_key': source_key, 'node_count': len(counts), 'edge_count': len(edge_char),
+                             'word_count': counts[0], 'byteorder': sys.byteorder}).encode('utf-8')
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header)))
+            f.write(header)
+            f.write(b'\0' * (align(PREAMBLE.size + len(header), 4) - PREAMBLE.size - len(header)))
+            for section in (edge_start, edge_char, edge_child, counts):
+                section.tofile(f)
+            f.write(terminal)
+        os.replace(temp_path, path)
+
+    def find(self, prefix):
+        """Node reached by spelling prefix from the root, or -1 if no word starts with it"""
+        edge_start, edge_char = self.edge_start, self.edge_char
+        node = 0
+        for char in prefix:
+            low, high = edge_start[node], edge_start[node + 1]
+            code = ord(char)
+            position = bisect_left(edge_char, code, low, high)
+            if position == high or edge_char[position] != code:
+                return -1
+            node = self.edge_child[position]
+        return node
+
+    def count_prefix(self, prefix):
+        """How many indexed words start with prefix"""
+        node = self.find(prefix)
+        return self.counts[node] if node >= 0 else 0
+
+    def __contains__(self, word):
+        node = self.find(word)
+        return node >= 0 and bool(self.terminal[node])
+
+    def __len__(self):
+        return self.word_count
+
+    def iter_words(self, prefix=""):
+        """Indexed words starting with prefix, in code point order"""
+        node = self.find(prefix)
+        if node < 0:
+            return
+        stack = [(node, prefix)]
+        while stack:
+            node, word = stack.pop()
+            if self.terminal[node]:
+                yield word
+            first, last = self.edge_start[node], self.edge_start[node + 1]
+            for edge in range(last - 1, first - 1, -1):
+                stack.append((self.edge_child[edge], word + chr(self.edge_char[edge])))
+
+    def nearest(self, word, max_distance=2, limit=5, max_nodes=NEAREST_MAX_NODES):
+        """Up to limit (distance, word) pairs of the closest words within max_distance edits of word.
+
+        Searches one edit away first and only widens the search when nothing
+        was found: most typos are a single edit, and each extra edit
+        multiplies the branches that survive pruning.
+        """
+        found = []
+        for distance in range(1, max_distance + 1):
+            found = self.search(word, distance, max_nodes)
+            if found:
+                break
+        return found[:limit]
+
+    def search(self, word, max_distance, max_nodes=NEAREST_MAX_NODES):
+        """Every (distance, word) pair within max_distance edits of word, closest first.
+
+        Walks the trie carrying the optimal-string-alignment DP row of each
+        node (edits plus adjacent swaps), computed only within max_distance
+        of the diagonal, and prunes branches whose row minimum exceeds
+        max_distance.  Stops after visiting max_nodes nodes.
+        """
+        found = []
+        length = len(word)
+        beyond = max_distance + 1  # Any distance too large to matter
+        first_row = [min(column, beyond) for column in range(length + 1)]
+        # (node, prefix, its last letter, DP row of the prefix, DP row of the prefix without its last letter)
+        stack = [(0, "", "", first_row, None)]
+        visited = 0
+        edge_start, edge_char, edge_child, terminal = self.edge_start, self.edge_char, self.edge_child, self.terminal
+        while stack and visited < max_nodes:
+            node, prefix, last_char, previous, before = stack.pop()
+            depth = len(prefix) + 1
+            low, high = max(1, depth - max_distance), min(length, depth + max_distance)
+            for edge in range(edge_start[node], edge_start[node + 1]):
+                visited += 1
+                char = chr(edge_char[edge])
+                row = [beyond] * (length + 1)
+                row[0] = min(depth, beyond)
+                best = row[0]
+                for column in range(low, high + 1):
+                    target_char = word[column - 1]
+                    cost = previous[column - 1] + (target_char != char)
+                    if row[column - 1] + 1 < cost:
+                        cost = row[column - 1] + 1
+                    if previous[column] + 1 < cost:
+                        cost = previous[column] + 1
+                    if (before is not None and column > 1 and target_char == last_char
+                            and word[column - 2] == char and before[column - 2] + 1 < cost):
+                        cost = before[column - 2] + 1
+                    row[column] = cost if cost < beyond else beyond
+                    if cost < best:
+                        best = cost
+                if best > max_distance:
+                    continue
+                child = edge_child[edge]
+                if terminal[child] and row[length] <= max_distance:
+                    found.append((row[length], prefix + char))
+                stack.append((child, prefix + char, char, row, previous))
+        found.sort()
+        return found
+
+    def close(self):
+        """Release the memory map (the index stops working)"""
+        for section in (self.edge_start, self.edge_char, self.edge_child, self.counts, self.terminal):
+            section.release()
+        self._map.close()
+
+
+def get_playable_words(word_manager):
+    """Every word the word manager can deal, level by level"""
+    for level in range(1, len(LEVEL_NAMES) + 1):
+        yield from word_manager.get_word_list(level)
+
+
+def get_source_key(word_manager):
+    """Identifies the words behind an index: a corpus file's size and time, or a hash of in-memory lists"""
+    digest = hashlib.blake2b(digest_size=12)
+    corpus_path = getattr(word_manager.word_lists, 'path', None)
+    if corpus_path is not None:
+        stat = os.stat(corpus_path)
+        digest.update(f"{os.path.abspath(corpus_path)}:{stat.st_size}:{stat.st_mtime_ns}".encode('utf-8'))
+        # Levels missing from the corpus come from the built-in lists
+        for level, name in enumerate(LEVEL_NAMES, start=1):
+            if name not in word_manager.word_lists or not len(word_manager.word_lists[name]):
+                digest.update(f"builtin:{level}".encode('utf-8'))
+    else:
+        for word in get_playable_words(word_manager):
+            digest.update(word.encode('utf-8'))
+            digest.update(b'\n')
+    return digest.hexdigest()
+
+
+def get_index_path(source_key, cache_dir=None):
+    """Cache file of the index for a source key"""
+    return os.path.join(cache_dir or get_cache_dir('word_index'), f"index-{source_key}.bin")
+
+
+def open_cached_index(path):
+    """The index saved at path, or None if it is missing or unreadable"""
+    try:
+        return WordIndex(path)
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def build_index(word_manager, path, source_key):
+    """Build, save and open the index of the word manager's words"""
+    start = time.perf_counter()
+    WordIndex.save(path, get_playable_words(word_manager), source_key)
+    index = WordIndex(path)
+    print(f"Built word index of {index.word_count} words in {time.perf_counter() - start:.2f}s")
+    return index
+
+
+def load_word_index(word_manager, cache_dir=None):
+    """Index of the word manager's words, from the cache when it matches, else built and cached"""
+    source_key = get_source_key(word_manager)
+    path = get_index_path(source_key, cache_dir)
+    return open_cached_index(path) or build_index(word_manager, path, source_key)
+
+
+def load_word_index_in_background(word_manager, on_ready, cache_dir=None):
+    """Pass the index to on_ready: right away when the cache matches, else from a thread that builds it.
+
+    Building takes seconds for a large corpus, so it never runs on the caller's
+    thread; on_ready is then called on the builder thread.  Returns the thread, or None.
+    """
+    source_key = get_source_key(word_manager)
+    path = get_index_path(source_key, cache_dir)
+    index = open_cached_index(path)
+    if index is not None:
+        on_ready(index)
+        return None
+
+    def build():
+        try:
+            on_ready(build_index(word_manager, path, source_key))
+        except (OSError, ValueError) as e:
+            print(f"Could not build word index: {e}")
+
+    thread = threading.Thread(target=build, name="word-index", daemon=True)
+    thread.start()
+    return thread
+
+
+def main():
+    from word_manager import WordManager
+    parser = argparse.ArgumentParser(description="Query the word index of the built-in lists or a corpus")
+    parser.add_argument('words', nargs='+', help="prefixes or misspellings to look up")
+    parser.add_argument('--corpus', help="corpus file built with corpus.py")
+    parser.add_argument('--distance', type=int, default=2, help="largest edit distance for nearest words")
+    args = parser.parse_args()
+
+    index = load_word_index(WordManager(word_lists=load_word_lists(args.corpus)))
+    print(f"{index.word_count} words, {index.node_count} nodes")
+    for text in args.words:
+        text = text.lower()
+        start = time.perf_counter()
+        count = index.count_prefix(text)
+        nearest = index.nearest(text, args.distance)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"  {text}: {'a word, ' if text in index else ''}{count} words start with it; "
+              f"nearest: {', '.join(word for _, word in nearest) or '-'} ({elapsed_ms:.2f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,13 +3,48 @@ Word Manager - Handles word selection and difficulty progression
 """
 
 import random
+from collections import deque
 from words import WORD_LISTS
+from word_deck import WordDeck
+
+# Word list names for difficulty levels 1-5
+LEVEL_NAMES = ('easy', 'basic', 'intermediate', 'advanced', 'expert')
 
 class WordManager:
-    def __init__(self):
-        self.used_words = set()
+    def __init__(self, lookahead=0, seed=None, word_lists=None, review_scheduler=None):
+        # Word lists by level name: a dict of lists like WORD_LISTS, or a corpus.Corpus
+        # whose levels are decoded lazily; levels it lacks come from the built-in lists
+        if word_lists is None:
+            word_lists = WORD_LISTS
+        if isinstance(word_lists, dict):
+            # Decks deal by position, so a repeated entry would be dealt twice per cycle
+            word_lists = {name: list(dict.fromkeys(words)) for name, words in word_lists.items()}
+        self.word_lists = word_lists
         self.difficulty_level = 1
         
+        # Each level deals its words from its own shuffled deck, so levels run
+        # out independently; the RNG is seedable for reproducible sessions
+        self.rng = random.Random(seed)
+        self.decks = {}
+        
+        # Optional spaced-repetition model (e.g. spaced_repetition.LeitnerScheduler):
+        # words it has due for review, up to the current level, are dealt before
+        # new words from the decks
+        self.review_scheduler = review_scheduler
+        self.MAX_REVIEW_SKIPS = 20  # Deck draws tried for a word not under review
+        
+        # Letters the player often gets wrong (see ErrorAnalyzer.get_weak_letters);
+        # a dealt word containing none of them is given back to its deck and
+        # another drawn, up to PRACTICE_REDRAWS times, so they come up more often
+        self.practice_letters = frozenset()
+        self.PRACTICE_REDRAWS = 2
+        
+        # Look-ahead queue of words already selected for the upcoming turns,
+        # so their pronunciations can be prepared before they are needed
+        self.lookahead = lookahead
+        self.upcoming = deque()
+        self.upcoming_level = None
+        
     def get_difficulty_level(self, score):
         """Calculate difficulty level based on score"""
         if score < 50:
@@ -29,38 +64,94 @@ class WordManager:
         multipliers = {1: 1, 2: 1.2, 3: 1.5, 4: 2.0, 5: 2.5}
         return multipliers.get(level, 1)
         
+    def get_word_list(self, level):
+        """Get the word list for a difficulty level, falling back to the built-in list if it is missing or empty"""
+        name = LEVEL_NAMES[min(max(level, 1), len(LEVEL_NAMES)) - 1]
+        if name in self.word_lists and len(self.word_lists[name]):
+            return self.word_lists[name]
+        return WORD_LISTS[name]
+        
+    def get_deck(self, level):
+        """The shuffled deck dealing words for a level, created on first use"""
+        deck = self.decks.get(level)
+        if deck is None:
+            # Words still queued or on screen must not come straight back after a reshuffle
+            deck = self.decks[level] = WordDeck(self.get_word_list(level), self.rng, min_gap=self.lookahead + 1)
+        return deck
+        
+    def select_word(self, level):
+        """Pick a due review word, else a random word from the given level not dealt this cycle, preferring practice letters"""
+        deck = self.get_deck(level)
+        scheduler = self.review_scheduler
+        if scheduler is None and not self.practice_letters:
+            return deck.draw()
+        if scheduler is not None:
+            word = scheduler.pop_due(level)
+            if word is not None:
+                return word
+        redraws = self.PRACTICE_REDRAWS if self.practice_letters and len(deck) > 1 else 0
+        tries = min(len(deck), self.MAX_REVIEW_SKIPS)
+        for attempt in range(tries):
+            word = deck.draw()
+            # Words under review come back on their own schedule; don't also deal them as new words
+            if scheduler is not None and word in scheduler:
+                continue
+            if redraws and attempt < tries - 1 and self.practice_letters.isdisjoint(word):
+                redraws -= 1
+                deck.put_back(word)
+                continue
+            break
+        return word
+        
+    def record_attempt(self, word, correct, response_time):
+        """Tell the review scheduler how an answer went"""
+        if self.review_scheduler is not None:
+            self.review_scheduler.record_attempt(word, correct, response_time, self.difficulty_level)
+        
     def get_next_word(self, score):
         """Get next word based on current score/difficulty"""
         level = self.get_difficulty_level(score)
         self.difficulty_level = level
         
-        # Get word list for current difficulty
-        if level == 1:
-            word_list = WORD_LISTS['easy']
-        elif level == 2:
-            word_list = WORD_LISTS['basic']
-        elif level == 3:
-            word_list = WORD_LISTS['intermediate']
-        elif level == 4:
-            word_list = WORD_LISTS['advanced']
-        else:
-            word_list = WORD_LISTS['expert']
+        if not self.lookahead:
+            return self.select_word(level)
             
-        # Find unused words in current difficulty
-        available_words = [word for word in word_list if word not in self.used_words]
+        self.refresh_upcoming(score)
+        word = self.upcoming.popleft()
+        self.fill_upcoming()
+        return word
         
-        # If all words used, reset used words for this level
-        if not available_words:
-            self.used_words = set()
-            available_words = word_list
+    def refresh_upcoming(self, score):
+        """Make sure the look-ahead queue holds words for the level of score"""
+        level = self.get_difficulty_level(score)
+        if level != self.upcoming_level:
+            self.invalidate_upcoming()
+            self.upcoming_level = level
+        self.fill_upcoming()
+        
+    def fill_upcoming(self):
+        """Top the look-ahead queue up to its configured length"""
+        if self.upcoming_level is None:
+            return
+        while len(self.upcoming) < self.lookahead:
+            self.upcoming.append(self.select_word(self.upcoming_level))
             
-        # Select random word
-        word = random.choice(available_words)
-        self.used_words.add(word)
+    def invalidate_upcoming(self):
+        """Drop queued words, returning them to the review scheduler or their level's deck"""
+        if self.upcoming_level is not None:
+            deck = self.get_deck(self.upcoming_level)
+            for word in self.upcoming:
+                if self.review_scheduler is None or not self.review_scheduler.put_back(word):
+                    deck.put_back(word)
+        self.upcoming.clear()
+        self.upcoming_level = None
         
-        return word
+    def peek_upcoming(self):
+        """Words that will be returned by the next calls to get_next_word"""
+        return list(self.upcoming)
         
     def reset(self):
-        """Reset word manager for new game"""
-        self.used_words = set()
+        """Reset word manager for new game; the review scheduler keeps what the player has learned"""
+        self.invalidate_upcoming()
+        self.decks = {}
         self.difficulty_level = 1